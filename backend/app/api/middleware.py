@@ -0,0 +1,43 @@
+"""Contains middleware of the application."""
+from starlette.datastructures import Headers
+from starlette.middleware.gzip import GZipMiddleware, GZipResponder
+from starlette.types import Message, Receive, Scope, Send
+
+# Compressed streams are buffered, so events wouldn't be sent as they finish
+STREAMED_MEDIA_TYPES = ("text/event-stream", "application/x-ndjson")
+
+
+class StreamAwareGZipResponder(GZipResponder):
+    """Compresses the response unless it's streamed."""
+
+    __passthrough: bool = False
+
+    async def send_with_gzip(self, message: Message) -> None:  # noqa: D102
+        if message["type"] == "http.response.start":
+            content_type = Headers(raw=message["headers"]).get("content-type", "")
+            self.__passthrough = content_type.startswith(STREAMED_MEDIA_TYPES)
+
+        if self.__passthrough:
+            await self.send(message)
+        else:
+            await super().send_with_gzip(message)
+
+
+class CompressionMiddleware(GZipMiddleware):
+    """Compresses responses using gzip if the client accepts it.
+
+    Streamed events of `/upload/stream` and `/upload/batch` aren't compressed.
+    """
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        """Compress the response, unless the client doesn't accept gzip."""
+        if scope["type"] == "http" and "gzip" in Headers(scope=scope).get(
+            "Accept-Encoding", ""
+        ):
+            responder = StreamAwareGZipResponder(
+                self.app, self.minimum_size, compresslevel=self.compresslevel
+            )
+            await responder(scope, receive, send)
+            return
+
+        await self.app(scope, receive, send)
@@ -0,0 +1,47 @@
+"""Contains response classes for the routes module."""
+from typing import Any
+
+from fastapi import Request
+from fastapi.responses import JSONResponse, Response
+
+from app.grobid.models import dumps, packb
+from app.grobid.models.encoder import MSGPACK_SUPPORTED
+
+MSGPACK_MEDIA_TYPES = ("application/msgpack", "application/x-msgpack")
+
+
+class ModelResponse(JSONResponse):
+    """JSON response which encodes TEI models directly.
+
+    Returned responses skip FastAPI's `jsonable_encoder`, the models and their
+    containers are encoded by `dumps`.
+    """
+
+    def render(self, content: Any) -> bytes:  # noqa: D102
+        return dumps(content)
+
+
+class MessagePackResponse(Response):
+    """MessagePack response, the refs of each paragraph are stored as columns."""
+
+    media_type = MSGPACK_MEDIA_TYPES[0]
+
+    def render(self, content: Any) -> bytes:  # noqa: D102
+        return packb(content)
+
+
+def negotiate(request: Request, content: Any) -> Response:
+    """Encode content as MessagePack if the client accepts it, otherwise JSON.
+
+    Args:
+        request: request of the client
+        content: models and their containers
+
+    Returns:
+        MessagePackResponse if msgpack is installed and accepted, or ModelResponse
+    """
+    accept = request.headers.get("accept", "")
+    if MSGPACK_SUPPORTED and any(media in accept for media in MSGPACK_MEDIA_TYPES):
+        return MessagePackResponse(content)
+
+    return ModelResponse(content)
@@ -5,23 +5,27 @@ Todo:
     * add more endpoints
 """
 
-import dataclasses
+from typing import Any, AsyncIterator, Optional
 
-import en_core_web_sm
 import fastapi
 import httpx
-from fastapi import APIRouter, HTTPException, UploadFile, status
+from fastapi import APIRouter, HTTPException, Request, UploadFile, status
 from fastapi.param_functions import Depends
+from fastapi.responses import StreamingResponse
 
+from app.api.responses import negotiate
+from app.clients import get_http_client
 from app.config import Settings, get_settings
-from app.document import PDF
-
-# from app.api.models import UploadResponse
-from app.grobid.client import Client, GrobidClientError
-from app.grobid.models.form import File, Form
-from app.grobid.tei import TEI, GrobidParserError
-from app.nlp.summary import Bart, TextRank
-from app.nlp.techniques import Phrase, Word
+from app.grobid.models import dumps
+from app.jobs import JobQueue, JobQueueFull, get_jobs
+from app.pipeline import get_models, read_zip
+from app.processor import (
+    BatchProcessor,
+    Engine,
+    ProcessingError,
+    Processor,
+    get_processor,
+)
 
 router = APIRouter()
 
@@ -29,133 +33,322 @@ router = APIRouter()
 @router.on_event("startup")
 def load_globals():
     """Load instances once."""
-    global model
-    model = en_core_web_sm.load()
+    get_models()
+
+
+async def read_upload(file: UploadFile) -> bytes:
+    """Read uploaded PDF.
+
+    Args:
+        file: file which is uploaded
+    Returns:
+        Uploaded bytes
+    Raises:
+        HTTPException: the file isn't a PDF
+    """
+    if file.content_type != "application/pdf":
+        raise HTTPException(
+            status.HTTP_415_UNSUPPORTED_MEDIA_TYPE, detail="Invalid document type"
+        )
+
+    upload = await file.read()
+    # Release the spooled copy, the bytes are used for the rest of the pipeline
+    await file.close()
+    return upload
 
 
 @router.post("/upload")
 async def recieve_file(
-    file: UploadFile = fastapi.File(...), settings: Settings = Depends(get_settings)
+    request: Request,
+    file: UploadFile = fastapi.File(...),
+    engine: Engine = Engine.grobid,
+    processor: Processor = Depends(get_processor),
 ):
     """Parse uploaded file.
 
+    Results of each stage are cached using the DOI of the PDF, or its hash. Blocking
+    stages are run by the executor. The response is MessagePack if it's accepted by
+    the client, otherwise JSON.
+
     Args:
+        request: request of the client, used for content negotiation
         file: file which is uploaded
-        settings: app settings
+        engine: GROBID, or the faster best-effort local extractor
+        processor: runs the pipeline stages
     Returns:
         Article object
     Raises:
         HTTPException: the file cannot be parsed
     """
-    if file.content_type != "application/pdf":
-        raise HTTPException(
-            status.HTTP_415_UNSUPPORTED_MEDIA_TYPE, detail="Invalid document type"
-        )
+    upload = await read_upload(file)
 
-    contents = await file.read()
-    # Use PyMuPDF to open and fix the PDF
     try:
-        with PDF(contents) as pdf:
-            contents = pdf.bytes_
-            uid = pdf.uid  # noqa
-    except RuntimeError as exc:
-        raise HTTPException(status.HTTP_415_UNSUPPORTED_MEDIA_TYPE, detail=str(exc))
-
-    form = Form(
-        file=File(
-            payload=contents, file_name=file.filename, mime_type=file.content_type
+        return negotiate(
+            request, await processor.response(upload, file.filename, engine)
         )
-    )
+    except ProcessingError as exc:
+        raise HTTPException(exc.status_code, detail=exc.detail)
 
-    try:
-        client = Client(
-            api_url=settings.grobid_api_url,
-            form=form,
-            timeout=settings.grobid_api_timeout,
-        )
-        response = await client.asyncio_request()
-    except GrobidClientError as exc:
-        raise HTTPException(status.HTTP_503_SERVICE_UNAVAILABLE, detail=str(exc))
 
-    tei = TEI(response.content, model)
+@router.post("/upload/preview")
+async def preview_file(
+    request: Request,
+    file: UploadFile = fastapi.File(...),
+    processor: Processor = Depends(get_processor),
+):
+    """Parse the metadata of the uploaded file.
+
+    Uses GROBID's header service, which is much faster than parsing the full text.
+
+    Args:
+        request: request of the client, used for content negotiation
+        file: file which is uploaded
+        processor: runs the pipeline stages
+    Returns:
+        Bibliography, keywords and abstract of the article
+    Raises:
+        HTTPException: the file cannot be parsed
+    """
+    upload = await read_upload(file)
 
     try:
-        article = tei.parse()
-    except GrobidParserError as exc:
-        raise HTTPException(status.HTTP_400_BAD_REQUEST, detail=str(exc))
+        return negotiate(request, await processor.preview(upload, file.filename))
+    except ProcessingError as exc:
+        raise HTTPException(exc.status_code, detail=exc.detail)
+
+
+def encode_event(event: str, data: Any, sse: bool = False) -> str:
+    """Encode streamed event.
+
+    Args:
+        event: name of the event
+        data: serializable result
+        sse: use Server-Sent Events instead of newline-delimited JSON
+
+    Returns:
+        Encoded event
+    """
+    if sse:
+        return f"event: {event}\ndata: {dumps(data).decode()}\n\n"
 
+    return dumps(dict(event=event, data=data)).decode() + "\n"
+
+
+@router.post("/upload/stream")
+async def stream_file(
+    request: Request,
+    file: UploadFile = fastapi.File(...),
+    engine: Engine = Engine.grobid,
+    processor: Processor = Depends(get_processor),
+):
+    """Parse uploaded file, streaming the result of each stage as it finishes.
+
+    Events are `article`, `common_words`, `phrase_ranks`, `sentences` and `summary`,
+    in order. Server-Sent Events are used if accepted by the client, otherwise
+    newline-delimited JSON.
+
+    Args:
+        request: used for the accepted media types
+        file: file which is uploaded
+        engine: GROBID, or the faster best-effort local extractor
+        processor: runs the pipeline stages
+    Returns:
+        Streaming response with an event per stage, or an `error` event if a stage
+        after the article fails
+    Raises:
+        HTTPException: the file cannot be parsed into an article
+    """
+    upload = await read_upload(file)
+
+    events = processor.process(upload, file.filename, engine)
+    # Errors before the article is ready are still returned as status codes
     try:
-        article_dict = dataclasses.asdict(article)
-    except TypeError:
-        return HTTPException(
-            status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail="Couldn't serialise Article object",
+        first_event = await anext(events)
+    except ProcessingError as exc:
+        raise HTTPException(exc.status_code, detail=exc.detail)
+
+    sse = "text/event-stream" in request.headers.get("accept", "")
+
+    async def stream() -> AsyncIterator[str]:
+        event, data = first_event
+        yield encode_event(event.value, data, sse)
+        try:
+            async for event, data in events:
+                yield encode_event(event.value, data, sse)
+        except ProcessingError as exc:
+            error = dict(status_code=exc.status_code, detail=exc.detail)
+            yield encode_event("error", error, sse)
+
+    media_type = "text/event-stream" if sse else "application/x-ndjson"
+    return StreamingResponse(stream(), media_type=media_type)
+
+
+@router.post("/upload/batch")
+async def recieve_batch(
+    files: list[UploadFile] = fastapi.File(...),
+    engine: Engine = Engine.grobid,
+    settings: Settings = Depends(get_settings),
+    processor: Processor = Depends(get_processor),
+):
+    """Parse many uploaded files, or zip files of PDFs.
+
+    Up to `BATCH_CONCURRENCY` files are sent to GROBID at once, and the texts of the
+    parsed articles are run through spaCy together. Results are streamed as
+    newline-delimited JSON as soon as each file finishes, in any order.
+
+    Args:
+        files: PDF or zip files which are uploaded
+        engine: GROBID, or the faster best-effort local extractor
+        settings: app settings
+        processor: runs the pipeline stages
+    Returns:
+        Streaming response with a line per PDF, containing the filename, status code
+        and either the `/upload` response or detail of the error
+    Raises:
+        HTTPException: there are too many files
+    """
+    uploads: list[tuple[bytes, str | None]] = []
+    errors: list[dict[str, Any]] = []
+    for file in files:
+        contents = await file.read()
+        match file.content_type:
+            case "application/pdf":
+                uploads.append((contents, file.filename))
+            case "application/zip" | "application/x-zip-compressed":
+                try:
+                    uploads += await processor.executor.run_thread(read_zip, contents)
+                except RuntimeError as exc:
+                    errors.append(
+                        dict(
+                            filename=file.filename,
+                            status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+                            detail=str(exc),
+                        )
+                    )
+            case _:
+                errors.append(
+                    dict(
+                        filename=file.filename,
+                        status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+                        detail="Invalid document type",
+                    )
+                )
+
+    if len(uploads) > settings.batch_max_files:
+        raise HTTPException(
+            status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"Batch is limited to {settings.batch_max_files} PDFs",
         )
 
-    article_text = []
-    ranked_article_sentences: list[str] = []
-    for section in article.sections:
-        section_text = section.to_str()
-        if section_text:
-            article_text.append(section_text)
-            sentences = TextRank(section_text, model).sentences
-            ranked_article_sentences += sentences
-
-    article_text_str = " ".join(article_text)
-
-    # Phrase counts
-    if article.abstract:
-        phrase = Phrase(article.abstract.to_str(), model)
-    else:
-        phrase = Phrase(article_text_str, model)
-    phrase_ranks = phrase.ranks
-
-    # Common words
-    # NOTE: uses full text
-    common_words = []
-    try:
-        word = Word(article_text_str, model)
-        common_words = word.words_threshold_n(5)
-    except RuntimeError:
-        pass
+    batch_processor = BatchProcessor(processor, settings.batch_concurrency)
+
+    async def lines() -> AsyncIterator[str]:
+        for error in errors:
+            yield dumps(error).decode() + "\n"
+        async for result in batch_processor.batch(uploads, engine):
+            yield dumps(result).decode() + "\n"
+
+    return StreamingResponse(lines(), media_type="application/x-ndjson")
+
+
+@router.post("/archive/reparse")
+async def reparse_archive(
+    grobid_version: Optional[str] = None,
+    settings: Settings = Depends(get_settings),
+    processor: Processor = Depends(get_processor),
+):
+    """Parse the archived TEI again with the current parser, without GROBID.
+
+    Cached articles are replaced and cached responses are removed. Results are
+    streamed as newline-delimited JSON, one line per PDF as soon as it's parsed.
+
+    Args:
+        grobid_version: only parse TEI produced by this version of GROBID
+        settings: app settings
+        processor: runs the pipeline stages
+    Returns:
+        Streamed title, key and status code of each article
+    Raises:
+        HTTPException: TEI isn't archived
+    """
+    if processor.archive is None:
+        raise HTTPException(status.HTTP_404_NOT_FOUND, detail="TEI isn't archived")
+
+    keys = await processor.executor.run_thread(processor.archive.keys, grobid_version)
+    batch_processor = BatchProcessor(processor, settings.batch_concurrency)
+
+    async def lines() -> AsyncIterator[str]:
+        async for result in batch_processor.reparse_many(keys):
+            yield dumps(result).decode() + "\n"
+
+    return StreamingResponse(lines(), media_type="application/x-ndjson")
+
+
+@router.post("/jobs", status_code=status.HTTP_202_ACCEPTED)
+async def create_job(
+    file: UploadFile = fastapi.File(...),
+    engine: Engine = Engine.grobid,
+    processor: Processor = Depends(get_processor),
+    jobs: JobQueue = Depends(get_jobs),
+):
+    """Queue uploaded file to be parsed in the background.
+
+    Args:
+        file: file which is uploaded
+        engine: GROBID, or the faster best-effort local extractor
+        processor: runs the pipeline stages
+        jobs: queue of background jobs
+    Returns:
+        Job ID and status
+    Raises:
+        HTTPException: the file isn't a PDF or the queue is full
+    """
+    upload = await read_upload(file)
 
-    summary = ranked_article_sentences
     try:
-        bart = Bart(
-            api_token=settings.huggingface_api_token,
-            text=" ".join(ranked_article_sentences),
-            timeout=settings.huggingface_api_timeout,
-        )
-        summary_text = await bart.summary
-        summary = [sentence.text for sentence in model(summary_text).sents]
-    except httpx.HTTPStatusError:
-        pass
-    except RuntimeError:
-        pass
-
-    # TODO: use UploadResponse when pydantic is updated to v1.9
-    return dict(
-        article=article_dict,
-        common_words=common_words,
-        phrase_ranks=phrase_ranks,
-        summary=summary,
-    )
+        job = jobs.submit(processor, upload, file.filename, engine)
+    except JobQueueFull as exc:
+        raise HTTPException(status.HTTP_503_SERVICE_UNAVAILABLE, detail=str(exc))
+
+    return job.to_dict()
+
+
+@router.get("/jobs/{job_id}")
+async def get_job(job_id: str, jobs: JobQueue = Depends(get_jobs)):
+    """Get status and results of a job.
+
+    Results of each stage are available as soon as the stage finishes.
+
+    Args:
+        job_id: ID returned when the job was created
+        jobs: queue of background jobs
+    Returns:
+        Job ID, status, results of the finished stages and error if it failed
+    Raises:
+        HTTPException: the job doesn't exist
+    """
+    if (job := jobs.get(job_id)) is None:
+        raise HTTPException(status.HTTP_404_NOT_FOUND, detail="Job not found")
+
+    return job.to_dict()
 
 
 @router.get("/validate_url/")
-async def validate_pdf_url(url: str):
+async def validate_pdf_url(
+    url: str, client: httpx.AsyncClient = Depends(get_http_client)
+):
     """Check to see if URL of a PDF is valid.
 
     Args:
         url: url to be validated
+        client: shared HTTP client
     Returns:
         Status code and detail of request
     Raises:
         HTTPException: URL of a PDF is invalid
     """
     try:
-        async with httpx.AsyncClient() as client:
-            res = await client.head(url)
+        res = await client.head(url)
 
         if res.status_code != 200:
             raise HTTPException(
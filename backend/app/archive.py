@@ -0,0 +1,183 @@
+"""Archives the TEI produced by GROBID.
+
+Unlike the result cache, TEI is never evicted, so changes to the TEI parser or the NLP
+stages can be applied to every processed PDF without running GROBID again, see
+`app.reparse`. TEI is compressed and stored with the GROBID version and form options
+which produced it.
+
+Example::
+
+    archive = TEIArchive("tei.sqlite3")
+    archive.put(ArchivedTEI(key, content, grobid_version="0.7.1"))
+    for key in archive.keys():
+        content = archive.get(key).content
+
+"""
+import json
+import sqlite3
+import threading
+import time
+import zlib
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Any
+
+from fastapi.param_functions import Depends
+
+from app.config import Settings, get_settings
+
+
+@dataclass
+class ArchivedTEI:
+    """Represents TEI produced by GROBID for a PDF."""
+
+    key: str
+    content: bytes
+    grobid_version: str | None = None
+    # Form data of the request, without the PDF
+    options: dict[str, Any] = field(default_factory=dict)
+    filename: str | None = None
+    created: float = field(default_factory=time.time)
+    # Error of the parser, TEI which can't be parsed is requested from GROBID again
+    parse_error: str | None = None
+
+
+class TEIArchive:
+    """SQLite database of TEI, keyed by the cache key of the PDF."""
+
+    compresslevel: int
+    __connection: sqlite3.Connection
+    __lock: threading.Lock
+
+    def __init__(self, path: str, compresslevel: int = 6) -> None:
+        """Open or create the database.
+
+        Args:
+            path: path to the SQLite database file
+            compresslevel: zlib compression level of the TEI, from 0 (none) to 9
+                (smallest)
+        """
+        self.compresslevel = compresslevel
+        self.__lock = threading.Lock()
+        self.__connection = sqlite3.connect(path, check_same_thread=False)
+        with self.__connection:
+            self.__connection.execute(
+                "CREATE TABLE IF NOT EXISTS tei ("
+                "key TEXT PRIMARY KEY, content BLOB NOT NULL, grobid_version TEXT, "
+                "options TEXT NOT NULL, filename TEXT, created REAL NOT NULL, "
+                "parse_error TEXT)"
+            )
+
+    def __len__(self) -> int:
+        """Return number of archived TEI."""
+        with self.__lock:
+            (count,) = self.__connection.execute("SELECT COUNT(*) FROM tei").fetchone()
+        return count
+
+    def get(self, key: str) -> ArchivedTEI | None:
+        """Return archived TEI of the PDF or None if missing.
+
+        Args:
+            key: cache key of the PDF
+
+        Returns:
+            ArchivedTEI object
+        """
+        with self.__lock:
+            row = self.__connection.execute(
+                "SELECT key, content, grobid_version, options, filename, created, "
+                "parse_error FROM tei WHERE key = ?",
+                (key,),
+            ).fetchone()
+        if row is None:
+            return None
+
+        key, content, grobid_version, options, filename, created, parse_error = row
+        return ArchivedTEI(
+            key,
+            zlib.decompress(content),
+            grobid_version,
+            json.loads(options),
+            filename,
+            created,
+            parse_error,
+        )
+
+    def put(self, tei: ArchivedTEI) -> None:
+        """Store TEI, replacing the TEI of the same PDF.
+
+        Args:
+            tei: ArchivedTEI object
+        """
+        with self.__lock, self.__connection:
+            self.__connection.execute(
+                "INSERT OR REPLACE INTO tei "
+                "(key, content, grobid_version, options, filename, created, "
+                "parse_error) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (
+                    tei.key,
+                    zlib.compress(tei.content, self.compresslevel),
+                    tei.grobid_version,
+                    json.dumps(tei.options, sort_keys=True),
+                    tei.filename,
+                    tei.created,
+                    tei.parse_error,
+                ),
+            )
+
+    def set_parse_error(self, key: str, parse_error: str | None) -> None:
+        """Record whether the archived TEI of the PDF can be parsed.
+
+        Args:
+            key: cache key of the PDF
+            parse_error: error of the parser, or None if the TEI was parsed
+        """
+        with self.__lock, self.__connection:
+            self.__connection.execute(
+                "UPDATE tei SET parse_error = ? WHERE key = ?", (parse_error, key)
+            )
+
+    def keys(self, grobid_version: str | None = None) -> list[str]:
+        """List keys of the archived TEI, oldest first.
+
+        Args:
+            grobid_version: only list TEI produced by this version of GROBID
+
+        Returns:
+            Cache keys of the PDFs
+        """
+        query = "SELECT key FROM tei"
+        params: tuple[str, ...] = ()
+        if grobid_version is not None:
+            query += " WHERE grobid_version = ?"
+            params = (grobid_version,)
+
+        with self.__lock:
+            rows = self.__connection.execute(
+                f"{query} ORDER BY created", params
+            ).fetchall()
+        return [key for (key,) in rows]
+
+    def close(self) -> None:
+        """Close the database connection."""
+        self.__connection.close()
+
+
+@lru_cache
+def build_archive(path: str) -> TEIArchive | None:
+    """Open archive once per path, then from cache.
+
+    Args:
+        path: path to the database, empty if TEI isn't archived
+
+    Returns:
+        TEIArchive object or None if disabled
+    """
+    if not path:
+        return None
+    return TEIArchive(path)
+
+
+def get_archive(settings: Settings = Depends(get_settings)) -> TEIArchive | None:
+    """Get the TEI archive configured by the app settings."""
+    return build_archive(settings.tei_archive_path)
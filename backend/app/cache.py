@@ -0,0 +1,291 @@
+"""Caches the results of the PDF processing pipeline.
+
+Results are stored per stage (GROBID TEI, parsed Article and the final response), so a
+hit on a later stage skips every stage before it.
+
+Example::
+
+    cache = ResultCache(MemoryCache(maxsize=128))
+    key = cache_key(pdf.uid, contents)
+    if (response := cache.get(Stage.response, key)) is None:
+        ...
+        cache.put(Stage.response, key, response)
+
+"""
+from __future__ import annotations
+
+import hashlib
+import pickle
+import sqlite3
+import threading
+import time
+import zlib
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from enum import Enum
+from functools import lru_cache
+from typing import Any
+
+from fastapi.param_functions import Depends
+
+from app.config import Settings, get_settings
+
+
+class Stage(str, Enum):
+    """Represents the cacheable pipeline stages."""
+
+    tei = "tei"
+    article = "article"
+    response = "response"
+    # Partial article parsed from GROBID's header service
+    header = "header"
+
+
+def cache_key(uid: str | None, contents: bytes) -> str:
+    """Create cache key for a document.
+
+    Args:
+        uid: document UID, i.e. DOI, or arXiv identifier or ISBN prefixed by their
+            scheme
+        contents: uploaded PDF bytes, hashed when UID is missing
+
+    Returns:
+        Cache key
+    """
+    if uid:
+        # DOIs aren't prefixed by their scheme
+        if uid.startswith(("arxiv:", "isbn:")):
+            return uid.lower()
+        return f"doi:{uid.lower()}"
+
+    return f"sha256:{hashlib.sha256(contents).hexdigest()}"
+
+
+class Cache(ABC):
+    """Interface for cache backends."""
+
+    @abstractmethod
+    def get(self, key: str) -> Any | None:
+        """Return cached value or None if missing."""
+
+    @abstractmethod
+    def put(self, key: str, value: Any) -> None:
+        """Store value."""
+
+    @abstractmethod
+    def delete(self, key: str) -> None:
+        """Remove value if it exists."""
+
+    @abstractmethod
+    def clear(self) -> None:
+        """Remove all values."""
+
+
+class NullCache(Cache):
+    """Cache which never stores anything."""
+
+    def get(self, key: str) -> Any | None:  # noqa: D102
+        return None
+
+    def put(self, key: str, value: Any) -> None:  # noqa: D102
+        pass
+
+    def delete(self, key: str) -> None:  # noqa: D102
+        pass
+
+    def clear(self) -> None:  # noqa: D102
+        pass
+
+
+class MemoryCache(Cache):
+    """In-process least recently used cache.
+
+    Values are stored as is, so they must not be mutated after being cached.
+    """
+
+    maxsize: int
+    __data: OrderedDict[str, Any]
+    __lock: threading.Lock
+
+    def __init__(self, maxsize: int = 128) -> None:
+        """Create empty cache.
+
+        Args:
+            maxsize: maximum number of values before evicting the least recently used
+        """
+        self.maxsize = maxsize
+        self.__data = OrderedDict()
+        self.__lock = threading.Lock()
+
+    def __len__(self) -> int:
+        """Return number of cached values."""
+        return len(self.__data)
+
+    def get(self, key: str) -> Any | None:  # noqa: D102
+        with self.__lock:
+            if key not in self.__data:
+                return None
+            self.__data.move_to_end(key)
+            return self.__data[key]
+
+    def put(self, key: str, value: Any) -> None:  # noqa: D102
+        with self.__lock:
+            self.__data[key] = value
+            self.__data.move_to_end(key)
+            while len(self.__data) > self.maxsize:
+                self.__data.popitem(last=False)
+
+    def delete(self, key: str) -> None:  # noqa: D102
+        with self.__lock:
+            self.__data.pop(key, None)
+
+    def clear(self) -> None:  # noqa: D102
+        with self.__lock:
+            self.__data.clear()
+
+
+class SQLiteCache(Cache):
+    """On-disk least recently used cache.
+
+    Values are pickled and compressed, so the database must only be written by this
+    application.
+    """
+
+    maxsize: int
+    compresslevel: int
+    __connection: sqlite3.Connection
+    __lock: threading.Lock
+
+    def __init__(self, path: str, maxsize: int = 1024, compresslevel: int = 6) -> None:
+        """Open or create the database.
+
+        Args:
+            path: path to the SQLite database file
+            maxsize: maximum number of values before evicting the least recently used
+            compresslevel: zlib compression level of the pickled values, from 0 (none)
+                to 9 (smallest)
+        """
+        self.maxsize = maxsize
+        self.compresslevel = compresslevel
+        self.__lock = threading.Lock()
+        self.__connection = sqlite3.connect(path, check_same_thread=False)
+        with self.__connection:
+            self.__connection.execute(
+                "CREATE TABLE IF NOT EXISTS cache ("
+                "key TEXT PRIMARY KEY, value BLOB NOT NULL, accessed REAL NOT NULL)"
+            )
+
+    def __len__(self) -> int:
+        """Return number of cached values."""
+        with self.__lock:
+            (count,) = self.__connection.execute(
+                "SELECT COUNT(*) FROM cache"
+            ).fetchone()
+        return count
+
+    def get(self, key: str) -> Any | None:  # noqa: D102
+        with self.__lock, self.__connection:
+            row = self.__connection.execute(
+                "SELECT value FROM cache WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            self.__connection.execute(
+                "UPDATE cache SET accessed = ? WHERE key = ?", (time.time(), key)
+            )
+
+        try:
+            return pickle.loads(zlib.decompress(row[0]))
+        except (
+            zlib.error,
+            pickle.UnpicklingError,
+            AttributeError,
+            ImportError,
+            EOFError,
+        ):
+            # Stale entry from an incompatible version of the models
+            return None
+
+    def put(self, key: str, value: Any) -> None:  # noqa: D102
+        blob = zlib.compress(
+            pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL), self.compresslevel
+        )
+        with self.__lock, self.__connection:
+            self.__connection.execute(
+                "INSERT OR REPLACE INTO cache (key, value, accessed) VALUES (?, ?, ?)",
+                (key, blob, time.time()),
+            )
+            self.__connection.execute(
+                "DELETE FROM cache WHERE key IN ("
+                "SELECT key FROM cache ORDER BY accessed DESC LIMIT -1 OFFSET ?)",
+                (self.maxsize,),
+            )
+
+    def delete(self, key: str) -> None:  # noqa: D102
+        with self.__lock, self.__connection:
+            self.__connection.execute("DELETE FROM cache WHERE key = ?", (key,))
+
+    def clear(self) -> None:  # noqa: D102
+        with self.__lock, self.__connection:
+            self.__connection.execute("DELETE FROM cache")
+
+    def close(self) -> None:
+        """Close the database connection."""
+        self.__connection.close()
+
+
+class ResultCache:
+    """Stores pipeline results, namespaced by stage."""
+
+    backend: Cache
+
+    def __init__(self, backend: Cache) -> None:
+        """Wrap cache backend.
+
+        Args:
+            backend: cache used to store the values
+        """
+        self.backend = backend
+
+    def get(self, stage: Stage, key: str) -> Any | None:
+        """Return cached stage result or None if missing."""
+        return self.backend.get(f"{stage.value}:{key}")
+
+    def put(self, stage: Stage, key: str, value: Any) -> None:
+        """Store stage result."""
+        self.backend.put(f"{stage.value}:{key}", value)
+
+    def delete(self, stage: Stage, key: str) -> None:
+        """Remove stale stage result."""
+        self.backend.delete(f"{stage.value}:{key}")
+
+
+@lru_cache
+def build_cache(backend: str, size: int, path: str) -> ResultCache:
+    """Create cache once per configuration, then from cache.
+
+    Args:
+        backend: name of the cache backend ("memory", "sqlite" or "none")
+        size: maximum number of cached values
+        path: path to the database, only used by the "sqlite" backend
+
+    Returns:
+        ResultCache object
+
+    Raises:
+        ValueError: if backend is unknown
+    """
+    match backend:
+        case "memory":
+            return ResultCache(MemoryCache(maxsize=size))
+        case "sqlite":
+            return ResultCache(SQLiteCache(path, maxsize=size))
+        case "none":
+            return ResultCache(NullCache())
+        case _:
+            raise ValueError(f"Unknown cache backend {backend!r}")
+
+
+def get_cache(settings: Settings = Depends(get_settings)) -> ResultCache:
+    """Get the result cache configured by the app settings."""
+    return build_cache(settings.cache_backend, settings.cache_size, settings.cache_path)
@@ -0,0 +1,92 @@
+"""Shares HTTP clients between requests.
+
+Each upstream service (GROBID, Hugging Face) gets its own `httpx.AsyncClient`, so the
+connection pool and keep-alive sockets are reused across requests. Clients are created
+on first use and closed on app shutdown.
+
+Example::
+
+    @router.get("/")
+    async def route(client: httpx.AsyncClient = Depends(get_grobid_client)):
+        response = await client.get(url)
+
+"""
+from importlib.util import find_spec
+
+import httpx
+from fastapi import Request
+from fastapi.param_functions import Depends
+
+from app.config import Settings, get_settings
+
+# HTTP/2 requires the optional h2 package
+HTTP2_SUPPORTED = find_spec("h2") is not None
+
+
+class ClientRegistry:
+    """Application lifetime HTTP clients, one per service."""
+
+    __clients: dict[str, httpx.AsyncClient]
+
+    def __init__(self) -> None:
+        """Create empty registry."""
+        self.__clients = {}
+
+    def get(self, name: str, settings: Settings) -> httpx.AsyncClient:
+        """Get client of the service, creating it if missing or closed.
+
+        Args:
+            name: name of the service
+            settings: app settings used for the connection pool limits
+
+        Returns:
+            httpx.AsyncClient object
+        """
+        client = self.__clients.get(name)
+        if client is None or client.is_closed:
+            client = httpx.AsyncClient(
+                http2=settings.http2 and HTTP2_SUPPORTED,
+                limits=httpx.Limits(
+                    max_connections=settings.http_max_connections,
+                    max_keepalive_connections=settings.http_max_keepalive_connections,
+                    keepalive_expiry=settings.http_keepalive_expiry,
+                ),
+            )
+            self.__clients[name] = client
+
+        return client
+
+    async def aclose(self) -> None:
+        """Close all clients."""
+        while self.__clients:
+            _, client = self.__clients.popitem()
+            await client.aclose()
+
+
+def get_registry(request: Request) -> ClientRegistry:
+    """Get the client registry of the app."""
+    return request.app.state.clients
+
+
+def get_grobid_client(
+    registry: ClientRegistry = Depends(get_registry),
+    settings: Settings = Depends(get_settings),
+) -> httpx.AsyncClient:
+    """Get the client used for GROBID's API."""
+    return registry.get("grobid", settings)
+
+
+def get_huggingface_client(
+    registry: ClientRegistry = Depends(get_registry),
+    settings: Settings = Depends(get_settings),
+) -> httpx.AsyncClient:
+    """Get the client used for Hugging Face's Inference API."""
+    return registry.get("huggingface", settings)
+
+
+def get_http_client(
+    registry: ClientRegistry = Depends(get_registry),
+    settings: Settings = Depends(get_settings),
+) -> httpx.AsyncClient:
+    """Get the client used for any other service."""
+    return registry.get("default", settings)
@@ -1,20 +1,69 @@
 """Represents the app settings."""
 from functools import lru_cache
+from typing import Any, Literal, Union
 
-from pydantic import BaseSettings
+from pydantic import BaseSettings, validator
 from pydantic.networks import AnyHttpUrl
 
 
 class Settings(BaseSettings):
     """App settings."""
 
-    # Required
-    grobid_api_url: AnyHttpUrl
+    # Required, comma separated if there are many instances
+    grobid_api_url: Union[AnyHttpUrl, list[AnyHttpUrl]]
 
     # Optional
     huggingface_api_token: str = ""
     grobid_api_timeout: int = 15
+    grobid_concurrency: int = 10
+    grobid_retries: int = 3
+    grobid_retry_backoff: float = 0.5
+    grobid_circuit_failures: int = 5
+    grobid_circuit_reset: float = 30.0
+    grobid_health_interval: float = 10.0
     huggingface_api_timeout: int = 60
+    cache_backend: Literal["memory", "sqlite", "none"] = "memory"
+    cache_size: int = 128
+    cache_path: str = "cache.sqlite3"
+    thread_pool_size: int = 4
+    process_pool_size: int = 0
+    http_max_connections: int = 100
+    http_max_keepalive_connections: int = 20
+    http_keepalive_expiry: float = 5.0
+    http2: bool = True
+    tei_parser: Literal["soup", "lxml"] = "soup"
+    spacy_batch_size: int = 32
+    spacy_n_process: int = 1
+    bart_fast_tokenizer: bool = True
+    summariser: Literal["huggingface", "local", "none"] = "huggingface"
+    summariser_model: str = "sshleifer/distilbart-cnn-12-6"
+    summariser_workers: int = 1
+    summariser_batch_size: int = 4
+    summariser_quantize: bool = True
+    job_queue_size: int = 100
+    job_workers: int = 4
+    job_max_results: int = 1000
+    batch_concurrency: int = 4
+    batch_max_files: int = 200
+    pdf_garbage: int = 3
+    pdf_deflate: bool = True
+    pdf_uid_pages: int = 2
+    grobid_fallback: bool = False
+    tei_archive_path: str = ""
+
+    @validator("grobid_api_url", pre=True)
+    def split_urls(cls, value: Any) -> Any:  # noqa: N805
+        """Split comma separated URLs of the GROBID instances."""
+        if isinstance(value, str) and "," in value:
+            return [url.strip() for url in value.split(",") if url.strip()]
+        return value
+
+    @property
+    def grobid_api_urls(self) -> list[str]:
+        """List the URLs of the GROBID instances."""
+        if isinstance(self.grobid_api_url, list):
+            return list(self.grobid_api_url)
+        return [self.grobid_api_url]
 
     class Config:
         """Use .env for environment variables."""
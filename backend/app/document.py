@@ -10,41 +10,77 @@ Example::
 from __future__ import annotations
 
 import re
+import threading
 from functools import cached_property
+from typing import Any, Iterator
 from urllib import parse
 
 import fitz
 from fitz.fitz import EmptyFileError, FileDataError
 
+# Warnings of MuPDF are global to the process, documents are opened by one thread at a
+# time so that they only get their own warnings
+_warnings_lock = threading.Lock()
+
 
 class PDF:
     """Open and try to fix PDF document."""
 
     __doc: fitz.Document
-    __doi_pattern = re.compile(r"\b(10[.][0-9]{4,}(?:[.][0-9]+)*/(?:(?!['&\'])\S)+)\b")
-
-    def __init__(self, file: bytes | str):
+    __stream: bytes
+    __warnings: str
+    garbage: int
+    deflate: bool
+    uid_pages: int
+    __uid_pattern = re.compile(
+        r"\b(?P<doi>10[.][0-9]{4,}(?:[.][0-9]+)*/(?:(?![\"&'<>])\S)+)\b"
+        r"|\barXiv:\s*(?P<arxiv>[0-9]{4}[.][0-9]{4,5}|[a-z-]+(?:[.][A-Z]{2})?/[0-9]{7})"
+        r"|\bISBN(?:-1[03])?:?\s*(?P<isbn>(?:97[89][- ]?)?(?:[0-9][- ]?){9}[0-9X])\b",
+        re.IGNORECASE,
+    )
+
+    def __init__(
+        self,
+        file: bytes | str,
+        garbage: int = 0,
+        deflate: bool = False,
+        uid_pages: int = 2,
+    ):
         """Open the document.
 
         Args:
-            file : PDF file as a buffered binary stream
+            file : PDF file as a buffered binary stream, MuPDF reads it without
+                copying
+            garbage : level of garbage collection when a repaired document is
+                serialised, from 0 (none) to 4 (deduplicate streams)
+            deflate : whether to compress the streams of a repaired document
+            uid_pages : number of pages searched for the UID
 
         Raises:
+            RuntimeError: if pdf cannot be read
             PermissionError: if pdf is encrypted
 
         """
+        self.garbage = garbage
+        self.deflate = deflate
+        self.uid_pages = uid_pages
         try:
-            fitz.TOOLS.mupdf_warnings()  # empty the warnings
-            self.__doc = fitz.open(stream=file, filetype="pdf")
-            warnings = fitz.TOOLS.mupdf_warnings()
-            if warnings:
-                raise RuntimeError(warnings)
+            with _warnings_lock:
+                fitz.TOOLS.mupdf_warnings()  # empty the warnings
+                self.__doc = fitz.open(stream=file, filetype="pdf")
+                # Broken xref tables and objects are reported as warnings
+                self.__warnings = fitz.TOOLS.mupdf_warnings()
+            self.__stream = file
         except (FileNotFoundError, FileDataError, EmptyFileError, ValueError):
             raise RuntimeError("PDF file could not be read")
 
         if self.__doc.needs_pass or self.__doc.is_encrypted:
             raise PermissionError("Document is encrypted")
 
+        if not self.__doc.page_count:
+            self.close_doc()
+            raise RuntimeError("PDF file could not be read")
+
     def __enter__(self) -> PDF:
         """Return self on enter."""
         return self
@@ -64,48 +100,99 @@ class PDF:
     def uid(self) -> str | None:
         """Extract Document UID.
 
-        Currently supports DOI.
+        Supports DOI, arXiv identifiers prefixed by "arxiv:" and ISBNs prefixed by
+        "isbn:".
 
-        Checks for crossmark/dx.doi.org links on the first page. Then attempts to find
-        manually using regex pattern.
+        Checks the metadata and XMP metadata, then the links and text of the first
+        page, stopping at the first DOI. If there isn't a DOI, the first arXiv
+        identifier or ISBN is used. The following pages, up to `uid_pages`, often cite
+        other documents, so only their Crossmark links are checked, as they identify
+        the document itself.
 
         Returns:
             Document UID or None
         """
-        page = self.__doc[0]
-        for link in page.links(kinds=[fitz.LINK_URI]):
-            parsed_uri = parse.urlparse(link["uri"])
-            match parsed_uri.netloc:
-                case "crossmark.crossref.org":
-                    query = dict(parse.parse_qsl(parsed_uri.query))
-                    if "doi" in query:
-                        return query["doi"]
-                case "dx.doi.org":
-                    return parsed_uri.path[1:]
-
-        # Brute force
-        blocks = page.get_text("blocks")
-        for block in blocks:
-            # Removes newlines and spaces
-            # If first character is upper case, prepend space
-            lines = ""
-            for line in block[4].strip().splitlines():
-                stripped = line.strip()
-                if stripped:
-                    if stripped[0].isupper():
-                        stripped = " " + stripped
-                    lines += stripped
-            m = self.__doi_pattern.search(lines)
-            if m:
-                return m.group(0)
+        fallback: str | None = None
+        for text in self.__uid_texts():
+            for m in self.__uid_pattern.finditer(text):
+                match m.lastgroup:
+                    case "doi":
+                        return m.group("doi")
+                    case "arxiv" if fallback is None:
+                        fallback = f"arxiv:{m.group('arxiv')}"
+                    case "isbn" if fallback is None:
+                        fallback = f"isbn:{re.sub(r'[- ]', '', m.group('isbn'))}"
+
+        return fallback
+
+    def __uid_texts(self) -> Iterator[str]:
+        """Yield the texts searched for the UID, cheapest first."""
+        yield "\n".join(value for value in self.__doc.metadata.values() if value)
+        yield self.__doc.get_xml_metadata()
+
+        for page in self.__doc.pages(0, min(self.uid_pages, self.__doc.page_count)):
+            # Identifiers of the following pages may be of cited documents
+            first = page.number == 0
+            uris = []
+            for link in page.links(kinds=[fitz.LINK_URI]):
+                parsed_uri = parse.urlparse(link["uri"])
+                match parsed_uri.netloc:
+                    case "crossmark.crossref.org":
+                        query = dict(parse.parse_qsl(parsed_uri.query))
+                        if "doi" in query:
+                            uris.append(query["doi"])
+                    case "dx.doi.org" | "doi.org" if first:
+                        uris.append(parse.unquote(parsed_uri.path[1:]))
+                    case "arxiv.org" if first and parsed_uri.path.startswith("/abs/"):
+                        uris.append(f"arXiv:{parsed_uri.path[5:]}")
+            yield "\n".join(uris)
+            if not first:
+                continue
+
+            # Removes newlines and spaces of each block
+            # If first character of a line is upper case, prepend space
+            blocks = []
+            for block in page.get_text("blocks"):
+                if block[6] != 0:  # image
+                    continue
+                lines = (line.strip() for line in block[4].splitlines())
+                blocks.append(
+                    "".join(
+                        " " + line if line[0].isupper() else line
+                        for line in lines
+                        if line
+                    )
+                )
+            yield "\n".join(blocks)
+
+    def text_blocks(self) -> Iterator[tuple[int, dict[str, Any]]]:
+        """Yield the text blocks of every page.
+
+        Yields:
+            Page number and block, as returned by `get_text("dict")`
+        """
+        flags = fitz.TEXTFLAGS_DICT & ~fitz.TEXT_PRESERVE_IMAGES
+        for page in self.__doc:
+            for block in page.get_text("dict", flags=flags)["blocks"]:
+                if block["type"] == 0:
+                    yield page.number, block
+
+    @property
+    def is_repaired(self) -> bool:
+        """Whether MuPDF repaired the document or reported errors when opening it."""
+        return self.__doc.is_repaired or bool(self.__warnings)
 
     @property
     def bytes_(self) -> bytes:
         """MUPDF object to bytes.
 
-        Advantage of this method is that fitz.open() can repair corrupt PDFs
+        Advantage of this method is that fitz.open() can repair corrupt PDFs. The
+        document is only serialised again if it was repaired, MuPDF can't save
+        repaired documents incrementally.
 
         Returns:
-            Original PDF
+            Repaired PDF, or the original buffer
         """
-        return self.__doc.tobytes()
+        if self.is_repaired:
+            return self.__doc.tobytes(garbage=self.garbage, deflate=self.deflate)
+        return self.__stream
@@ -0,0 +1,118 @@
+"""Runs blocking pipeline stages outside of the event loop.
+
+The thread pool is used for reading PDFs and TEI (PyMuPDF, lxml), so they don't block
+the event loop. The process pool is used for the NLP stages, with the spaCy model loaded
+once per worker.
+
+Example::
+
+    executor = Executor(thread_pool_size=4, process_pool_size=2)
+    contents, uid = await executor.run_thread(read_pdf, upload)
+    result = await executor.run_process(analyse, section_texts)
+
+"""
+import asyncio
+import multiprocessing
+from concurrent.futures import Executor as PoolExecutor
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from functools import partial
+from typing import Any, Callable, TypeVar
+
+from fastapi.param_functions import Depends
+
+from app.config import Settings, get_settings
+from app.pipeline import get_models
+
+T = TypeVar("T")
+
+
+class Executor:
+    """Thread and process pools used by the routes."""
+
+    thread_pool: ThreadPoolExecutor
+    process_pool: ProcessPoolExecutor | None = None
+
+    def __init__(self, thread_pool_size: int, process_pool_size: int = 0) -> None:
+        """Create the pools.
+
+        Args:
+            thread_pool_size: number of threads
+            process_pool_size: number of processes. Zero runs process stages in the
+                thread pool instead.
+        """
+        self.thread_pool = ThreadPoolExecutor(
+            max_workers=thread_pool_size, thread_name_prefix="pipeline"
+        )
+        if process_pool_size > 0:
+            # Forking a process with a loaded model or running threads isn't safe
+            self.process_pool = ProcessPoolExecutor(
+                max_workers=process_pool_size,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=get_models,
+            )
+
+    @staticmethod
+    async def __run(
+        pool: PoolExecutor, func: Callable[..., T], *args: Any, **kwargs: Any
+    ) -> T:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(pool, partial(func, *args, **kwargs))
+
+    async def run_thread(self, func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        """Run function in the thread pool.
+
+        Args:
+            func: blocking function
+            *args: positional arguments of func
+            **kwargs: keyword arguments of func
+
+        Returns:
+            Return value of func
+        """
+        return await self.__run(self.thread_pool, func, *args, **kwargs)
+
+    async def run_process(self, func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        """Run function in the process pool, or thread pool if there isn't one.
+
+        Arguments and return value must be picklable.
+
+        Args:
+            func: blocking module level function
+            *args: positional arguments of func
+            **kwargs: keyword arguments of func
+
+        Returns:
+            Return value of func
+        """
+        pool = self.process_pool or self.thread_pool
+        return await self.__run(pool, func, *args, **kwargs)
+
+    def shutdown(self) -> None:
+        """Shutdown the pools, waiting for running stages to finish."""
+        self.thread_pool.shutdown()
+        if self.process_pool is not None:
+            self.process_pool.shutdown()
+
+
+_executors: dict[tuple[int, int], Executor] = {}
+
+
+def build_executor(thread_pool_size: int, process_pool_size: int) -> Executor:
+    """Create executor once per configuration, then from cache."""
+    key = (thread_pool_size, process_pool_size)
+    if key not in _executors:
+        _executors[key] = Executor(thread_pool_size, process_pool_size)
+
+    return _executors[key]
+
+
+def get_executor(settings: Settings = Depends(get_settings)) -> Executor:
+    """Get the executor configured by the app settings."""
+    return build_executor(settings.thread_pool_size, settings.process_pool_size)
+
+
+def shutdown_executors() -> None:
+    """Shutdown all executors, used on app shutdown."""
+    while _executors:
+        _, executor = _executors.popitem()
+        executor.shutdown()
@@ -0,0 +1,219 @@
+"""Extracts a best-effort article from the text of a PDF, without GROBID.
+
+Headings are short blocks set in a larger or bold font than the body text. Blocks after
+an "Abstract" heading are the abstract, and blocks after a "References" heading are the
+citations. Tables, authors and the refs of each paragraph aren't extracted.
+
+Example::
+
+    with PDF(upload) as pdf:
+        article = ArticleExtractor(pdf).article()
+
+"""
+import re
+from collections import Counter
+from dataclasses import dataclass
+
+from app.document import PDF
+from app.grobid.models import Article, Citation, CitationIDs, RefText, Section
+
+# Font flag of a span, <https://pymupdf.readthedocs.io/en/latest/textpage.html>
+BOLD_FLAG = 2**4
+MAX_HEADING_LENGTH = 100
+# Minimum difference to the body font size of a heading
+HEADING_SIZE_DELTA = 1.0
+# Short blocks on this many pages are running headers or footers
+REPEATED_PAGES = 3
+
+ABSTRACT_PATTERN = re.compile(r"abstract\b\W*", re.IGNORECASE)
+KEYWORDS_PATTERN = re.compile(r"(?:key\s?words|index terms)\W*", re.IGNORECASE)
+REFERENCES_PATTERN = re.compile(
+    r"(?:references|bibliography|works cited|literature cited)\W*$", re.IGNORECASE
+)
+NUMBERING_PATTERN = re.compile(r"^(?:[0-9]+(?:[.][0-9]+)*|[IVX]+)[.]?\s+")
+CITATION_PATTERN = re.compile(r"\s(?=\[[0-9]+\]\s)")
+
+
+@dataclass
+class Block:
+    """Represents a block of text with its font."""
+
+    text: str
+    size: float
+    bold: bool
+    page: int
+
+
+def join_lines(lines: list[str]) -> str:
+    """Join lines of a block, removing hyphens which break words across lines.
+
+    Args:
+        lines: stripped lines of text
+
+    Returns:
+        Text of the block
+    """
+    parts: list[str] = []
+    for line in lines:
+        if parts and parts[-1].endswith("-") and line[:1].islower():
+            parts[-1] = parts[-1][:-1] + line
+        else:
+            parts.append(line)
+
+    return " ".join(parts)
+
+
+class ArticleExtractor:
+    """Builds an Article from the layout of the PDF text."""
+
+    uid: str | None
+    blocks: list[Block]
+    body_size: float
+
+    def __init__(self, pdf: PDF) -> None:
+        """Read the text blocks of the document.
+
+        Args:
+            pdf: opened PDF document
+        """
+        self.uid = pdf.uid
+        self.blocks = []
+        for page, block in pdf.text_blocks():
+            lines = []
+            spans = []
+            for line in block["lines"]:
+                line_spans = [span for span in line["spans"] if span["text"].strip()]
+                if line_spans:
+                    lines.append("".join(span["text"] for span in line_spans).strip())
+                    spans += line_spans
+
+            if spans:
+                self.blocks.append(
+                    Block(
+                        text=join_lines(lines),
+                        size=max(span["size"] for span in spans),
+                        bold=all(span["flags"] & BOLD_FLAG for span in spans),
+                        page=page,
+                    )
+                )
+
+        self.blocks = self.__remove_repeated(self.blocks)
+
+        # Most of the characters are in the body font
+        sizes: Counter[float] = Counter()
+        for block in self.blocks:
+            sizes[round(block.size)] += len(block.text)
+        self.body_size = sizes.most_common(1)[0][0] if sizes else 0
+
+    @staticmethod
+    def __remove_repeated(blocks: list[Block]) -> list[Block]:
+        """Remove page numbers, and running headers or footers."""
+        pages: dict[str, set[int]] = {}
+        for block in blocks:
+            if len(block.text) <= MAX_HEADING_LENGTH:
+                pages.setdefault(block.text, set()).add(block.page)
+
+        return [
+            block
+            for block in blocks
+            if not block.text.isdigit()
+            and len(pages.get(block.text, ())) < REPEATED_PAGES
+        ]
+
+    def is_heading(self, block: Block) -> bool:
+        """Whether the block is a heading.
+
+        Args:
+            block: text block
+
+        Returns:
+            True if the block is short and larger or bolder than the body text
+        """
+        return (
+            len(block.text) <= MAX_HEADING_LENGTH
+            and any(char.isalpha() for char in block.text)
+            and (block.size >= self.body_size + HEADING_SIZE_DELTA or block.bold)
+        )
+
+    def title(self) -> str:
+        """Return the text in the largest font on the first page."""
+        first_page = [block for block in self.blocks if block.page == 0]
+        if not first_page:
+            return ""
+
+        block = max(first_page, key=lambda block: block.size)
+        return block.text if block.size > self.body_size else ""
+
+    def bibliography(self) -> Citation:
+        """Return the title and UID of the article."""
+        ids = None
+        if self.uid and self.uid.startswith("arxiv:"):
+            ids = CitationIDs(arXiv=self.uid.removeprefix("arxiv:"))
+        elif self.uid and not self.uid.startswith("isbn:"):
+            ids = CitationIDs(DOI=self.uid)
+
+        return Citation(title=self.title(), ids=ids)
+
+    def article(self) -> Article:
+        """Group the blocks into the sections of the article.
+
+        Returns:
+            Article object, text before the first heading is the front matter and is
+            skipped, unless there aren't any headings
+        """
+        bibliography = self.bibliography()
+        title = bibliography.title
+        front: list[RefText] = []
+        abstract: Section | None = None
+        sections: list[Section] = []
+        references: list[str] = []
+        keywords: set[str] = set()
+
+        current: Section | None = None
+        in_references = False
+        for block in self.blocks:
+            if block.text == title:
+                continue
+
+            if m := KEYWORDS_PATTERN.match(block.text):
+                terms = re.split(r"[,;·•]", block.text[m.end() :])
+                keywords.update(term.strip() for term in terms if term.strip())
+                continue
+
+            if self.is_heading(block):
+                heading = NUMBERING_PATTERN.sub("", block.text)
+                in_references = bool(REFERENCES_PATTERN.match(heading))
+                if in_references:
+                    current = None
+                elif ABSTRACT_PATTERN.fullmatch(heading):
+                    current = abstract = Section("Abstract")
+                else:
+                    current = Section(heading)
+                    sections.append(current)
+                continue
+
+            if in_references:
+                references += CITATION_PATTERN.split(block.text)
+            elif current is not None:
+                current.paragraphs.append(RefText(block.text))
+            elif abstract is None and (m := ABSTRACT_PATTERN.match(block.text)):
+                # Abstract inline with its heading
+                abstract = Section("Abstract", [RefText(block.text[m.end() :])])
+                current = abstract
+            else:
+                front.append(RefText(block.text))
+
+        if not sections and front:
+            sections.append(Section("", front))
+
+        return Article(
+            bibliography=bibliography,
+            keywords=keywords,
+            citations={
+                f"b{i}": Citation(title=reference)
+                for i, reference in enumerate(references)
+            },
+            sections=sections,
+            tables={},
+            abstract=abstract,
+        )
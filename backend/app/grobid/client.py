@@ -1,48 +1,81 @@
 # noqa: D100
 # TODO: use pydantic dataclass or BaseModel when pydantic is updated to v1.9
-from dataclasses import dataclass
+from dataclasses import dataclass, field
+from enum import Enum
 from typing import Any
 
 import httpx
-from spacy import load
 
 from app.grobid.models.form import Form
 from app.grobid.models.response import Response
-from app.grobid.tei import TEI
+
+# Request wasn't received by GROBID, so it can be sent again
+RETRYABLE_ERRORS = (httpx.ConnectError, httpx.ConnectTimeout)
 
 
 class GrobidClientError(BaseException):
     """Exception for Client class."""
 
-    pass
+    status_code: int | None
+    retryable: bool
+
+    def __init__(
+        self, message: Any, status_code: int | None = None, retryable: bool = False
+    ) -> None:
+        """Define the reason of the error.
+
+        Args:
+            message: detail of the error
+            status_code: status code of GROBID's response, None if it didn't respond
+            retryable: whether the request can be sent again, i.e. GROBID is busy
+        """
+        super().__init__(message)
+        self.status_code = status_code
+        self.retryable = retryable
+
+
+class Endpoint(str, Enum):
+    """Represents GROBID's PDF processing services."""
+
+    fulltext = "processFulltextDocument"
+    # Only the header, i.e. title, authors, abstract and keywords
+    header = "processHeaderDocument"
+    references = "processReferences"
 
 
 @dataclass
 class Client:
-    """Client for GROBID's processFulltextDocument endpoint."""
+    """Client for GROBID's PDF processing endpoints."""
 
     api_url: str
     form: Form
     timeout: int
+    # Shared client, a new client is used per request if missing
+    client: httpx.AsyncClient | None = field(default=None, repr=False, compare=False)
+    endpoint: Endpoint = Endpoint.fulltext
 
     def __build_request(self) -> dict[str, Any]:
         """Build request dictionary."""
-        # FIXME: api url is hardcoded
-        url = f"{self.api_url}/api/processFulltextDocument"
+        url = f"{self.api_url}/api/{self.endpoint.value}"
         return dict(url=url, files=self.form.to_dict(), timeout=self.timeout)
 
     def __build_response(self, response: httpx.Response) -> Response:
         """Build Response object.
 
         Raises:
-            httpx.HTTPError: if response has 203, 400, 503 or 500 status code
+            GrobidClientError: if response has 203, 400, 503 or 500 status code
         """
         res = Response(
             status_code=response.status_code,
             content=response.content,
             headers=response.headers,
         )
-        res.raise_for_status()
+        try:
+            res.raise_for_status()
+        except httpx.HTTPError as exc:
+            # GROBID's thread pool is full
+            retryable = res.status_code == 503
+            raise GrobidClientError(exc, res.status_code, retryable)
 
         return res
 
@@ -53,16 +86,18 @@ class Client:
             GrobidClientError: if httpx.RequestError or httpx.HTTPError is raised
         """
         kwargs = self.__build_request()
-        async with httpx.AsyncClient() as client:
-            try:
-                response = await client.post(**kwargs)
-                return self.__build_response(response)
-            except httpx.RequestError as exc:
-                raise GrobidClientError(
-                    f"An error occurred while requesting {exc.request.url!r}."
-                )
-            except httpx.HTTPError as exc:
-                raise GrobidClientError(exc)
+        try:
+            if self.client is not None:
+                response = await self.client.post(**kwargs)
+            else:
+                async with httpx.AsyncClient() as client:
+                    response = await client.post(**kwargs)
+        except httpx.RequestError as exc:
+            raise GrobidClientError(
+                f"An error occurred while requesting {exc.request.url!r}.",
+                retryable=isinstance(exc, RETRYABLE_ERRORS),
+            )
+        return self.__build_response(response)
 
     def sync_request(self) -> Response:
         """Request client synchronously.
@@ -73,33 +108,9 @@ class Client:
         kwargs = self.__build_request()
         try:
             response = httpx.post(**kwargs)
-            return self.__build_response(response)
         except httpx.RequestError as exc:
             raise GrobidClientError(
-                f"An error occurred while requesting {exc.request.url!r}."
+                f"An error occurred while requesting {exc.request.url!r}.",
+                retryable=isinstance(exc, RETRYABLE_ERRORS),
             )
-        except httpx.HTTPError as exc:
-            raise GrobidClientError(exc)
-
-
-if __name__ == "__main__":
-    # import path
-
-    # pdf_file = path.Path("study/Simon_Langley-evans.pdf")
-    # with open(pdf_file, "rb") as file:
-    #     form = Form(
-    #         file=File(
-    #             payload=file.read(),
-    #             file_name=pdf_file.name,
-    #             mime_type="application/pdf",
-    #         )
-    #     )
-    #     c = Client(api_url="http://localhost:8070/api", form=form)
-    #     t = TEI(c.sync_request().content, load("en_core_web_sm"))
-    #     a = t.parse()
-    #     print(a)
-    with open("study/ian-knight.xml", "rb") as f:
-        t = TEI(f.read(), load("en_core_web_sm"))
-        a = t.parse()
-
-    print(a.sections)
+        return self.__build_response(response)
@@ -10,7 +10,8 @@ from .citation import (
     PersonName,
     Scope,
 )
-from .section import Marker, Ref, RefText, Section
+from .encoder import dumps, packb, to_dict
+from .section import Marker, Ref, Refs, RefText, Section
 
 __all__ = [
     "Article",
@@ -23,8 +24,12 @@ __all__ = [
     "CitationIDs",
     "Citation",
     "Ref",
+    "Refs",
     "RefText",
     "Marker",
     "Section",
     "Table",
+    "to_dict",
+    "dumps",
+    "packb",
 ]
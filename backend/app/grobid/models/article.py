@@ -6,7 +6,7 @@ from app.grobid.models.citation import Citation
 from app.grobid.models.section import Section
 
 
-@dataclass
+@dataclass(slots=True)
 class Table:
     """Represents the <figure> XML tag of type table."""
 
@@ -15,7 +15,7 @@ class Table:
     rows: list[list[str]] = field(default_factory=list)
 
 
-@dataclass
+@dataclass(slots=True)
 class Article:
     """Represents the scholarly article."""
 
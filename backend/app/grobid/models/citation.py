@@ -1,9 +1,9 @@
 """Represents a citation, including all the relevant information."""
 # TODO: use pydantic dataclass or BaseModel when pydantic is updated to v1.9
-from dataclasses import dataclass, field
+from dataclasses import dataclass, field, fields
 
 
-@dataclass
+@dataclass(slots=True)
 class PageRange:
     """Represents the 'to' and 'from' attributes in <biblScope/> XML tag."""
 
@@ -11,7 +11,7 @@ class PageRange:
     to_page: int
 
 
-@dataclass
+@dataclass(slots=True)
 class Scope:
     """Represents the <biblScope/> XML tag."""
 
@@ -20,10 +20,10 @@ class Scope:
 
     def is_empty(self) -> bool:
         """Return True if the default values are the same."""
-        return all(attr is None for attr in self.__dict__.values())
+        return all(getattr(self, f.name) is None for f in fields(self))
 
 
-@dataclass
+@dataclass(slots=True)
 class Date:
     """Represents the 'when' attribute in the <date/> XML tag."""
 
@@ -32,7 +32,7 @@ class Date:
     day: str | None = None
 
 
-@dataclass
+@dataclass(slots=True)
 class PersonName:
     """Represents the <persName/> XML tag."""
 
@@ -49,7 +49,7 @@ class PersonName:
             return f"{self.surname}"
 
 
-@dataclass
+@dataclass(slots=True)
 class Affiliation:
     """Represents the <affiliation> XML tag."""
 
@@ -61,10 +61,10 @@ class Affiliation:
 
     def is_empty(self) -> bool:
         """Return True if the default values are the same."""
-        return all(attr is None for attr in self.__dict__.values())
+        return all(getattr(self, f.name) is None for f in fields(self))
 
 
-@dataclass
+@dataclass(slots=True)
 class Author:
     """Represents the <author> XML tag."""
 
@@ -73,7 +73,7 @@ class Author:
     email: str | None = None
 
 
-@dataclass
+@dataclass(slots=True)
 class CitationIDs:
     """Represents the <idno> XML tag."""
 
@@ -85,10 +85,10 @@ class CitationIDs:
 
     def is_empty(self) -> bool:
         """Return True if the default values are the same."""
-        return all(attr is None for attr in self.__dict__.values())
+        return all(getattr(self, f.name) is None for f in fields(self))
 
 
-@dataclass
+@dataclass(slots=True)
 class Citation:
     """Represents the <biblStruct> XML tag."""
 
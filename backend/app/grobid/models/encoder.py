@@ -0,0 +1,136 @@
+"""Serialises TEI models to JSON.
+
+Unlike `dataclasses.asdict` followed by FastAPI's `jsonable_encoder`, values aren't
+deep copied and are only walked once. The fields of each model class are looked up once
+and reused for every instance. orjson is used to encode the result when it's installed.
+
+Models are also encoded as MessagePack if the optional msgpack package is installed,
+with the refs of each paragraph stored as columns rather than a dict per ref.
+
+Example::
+
+    content = dumps(dict(article=article, summary=summary))
+
+"""
+import dataclasses
+import json
+from enum import Enum
+from importlib.util import find_spec
+from typing import Any
+
+from app.grobid.models.section import Refs
+
+# Faster encoding requires the optional orjson package
+ORJSON_SUPPORTED = find_spec("orjson") is not None
+# Binary encoding requires the optional msgpack package
+MSGPACK_SUPPORTED = find_spec("msgpack") is not None
+
+# Names of the public fields of each model class
+_plans: dict[type, tuple[str, ...]] = {}
+
+
+def _plan(cls: type) -> tuple[str, ...]:
+    names = _plans.get(cls)
+    if names is None:
+        names = _plans[cls] = tuple(
+            field.name
+            for field in dataclasses.fields(cls)
+            if not field.name.startswith("_")
+        )
+    return names
+
+
+def _columns(refs: list[dict[str, Any]]) -> dict[str, list[Any]]:
+    # Refs of articles which were already converted, i.e. cached responses
+    return {
+        name: [to_jsonable(ref[name]) for ref in refs]
+        for name in ("start", "end", "marker", "target")
+    }
+
+
+def to_jsonable(value: Any, columnar: bool = False) -> Any:
+    """Convert models and their containers to JSON types.
+
+    Args:
+        value: model, or dict, list, set or tuple of models
+        columnar: convert refs to a dict of lists, i.e. `{"start": [0, 5], ...}`,
+            instead of a list of dicts
+
+    Returns:
+        Dicts, lists and primitives, enums are converted to their values
+    """
+    if value is None or isinstance(value, (str, int, float)):
+        return value.value if isinstance(value, Enum) else value
+
+    cls = type(value)
+    if cls in _plans or dataclasses.is_dataclass(value):
+        return {
+            name: to_jsonable(getattr(value, name), columnar) for name in _plan(cls)
+        }
+    if cls is Refs:
+        return value.to_columns() if columnar else value.to_dicts()
+    if isinstance(value, dict):
+        return {
+            key: _columns(item)
+            if columnar and key == "refs" and isinstance(item, list)
+            else to_jsonable(item, columnar)
+            for key, item in value.items()
+        }
+    if isinstance(value, (list, tuple, set, frozenset)):
+        return [to_jsonable(item, columnar) for item in value]
+    if isinstance(value, Enum):
+        return value.value
+
+    raise TypeError(f"Object of type {cls.__name__} is not JSON serialisable")
+
+
+def to_dict(model: Any) -> dict[str, Any]:
+    """Convert model to a dict, like `dataclasses.asdict`.
+
+    Args:
+        model: dataclass instance, i.e. Article object
+
+    Returns:
+        Public fields of the model, converted to JSON types
+    """
+    return to_jsonable(model)
+
+
+def dumps(value: Any) -> bytes:
+    """Encode models and their containers as JSON.
+
+    Args:
+        value: model, or dict, list, set or tuple of models
+
+    Returns:
+        UTF-8 encoded JSON
+    """
+    content = to_jsonable(value)
+    if ORJSON_SUPPORTED:
+        import orjson
+
+        return orjson.dumps(content)
+
+    return json.dumps(
+        content, ensure_ascii=False, allow_nan=False, separators=(",", ":")
+    ).encode("utf-8")
+
+
+def packb(value: Any) -> bytes:
+    """Encode models and their containers as MessagePack, refs are columnar.
+
+    Args:
+        value: model, or dict, list, set or tuple of models
+
+    Returns:
+        MessagePack bytes
+
+    Raises:
+        RuntimeError: if msgpack isn't installed
+    """
+    if not MSGPACK_SUPPORTED:
+        raise RuntimeError("MessagePack encoding requires msgpack")
+
+    import msgpack
+
+    return msgpack.packb(to_jsonable(value, columnar=True), use_bin_type=True)
@@ -4,7 +4,7 @@ from dataclasses import dataclass
 from typing import Any
 
 
-@dataclass
+@dataclass(slots=True)
 class File:
     """Represents the PDF file used as input."""
 
@@ -17,9 +17,12 @@ class File:
         return self.file_name, self.payload, self.mime_type
 
 
-@dataclass
+@dataclass(slots=True)
 class Form:
-    """Represents form data accepted by GROBID's processFulltextDocument endpoint."""
+    """Represents form data accepted by GROBID's PDF processing endpoints.
+
+    Parameters which don't apply to an endpoint are ignored by GROBID.
+    """
 
     file: File
     segment_sentences: bool | None = None
@@ -28,6 +31,9 @@ class Form:
     include_raw_citations: bool | None = None
     include_raw_affiliations: bool | None = None
     tei_coordinates: str | None = None
+    # Page range of processFulltextDocument, starting at 1
+    start: int | None = None
+    end: int | None = None
 
     def to_dict(self) -> dict[str, Any]:
         """Return dictionary for multipart/form-data."""
@@ -55,4 +61,16 @@ class Form:
         if self.tei_coordinates is not None:
             form_dict["teiCoordinates"] = self.tei_coordinates
 
+        if self.start is not None:
+            form_dict["start"] = str(self.start)
+
+        if self.end is not None:
+            form_dict["end"] = str(self.end)
+
+        return form_dict
+
+    def options(self) -> dict[str, Any]:
+        """Return form data without the PDF, i.e. to record how TEI was produced."""
+        form_dict = self.to_dict()
+        del form_dict["input"]
         return form_dict
@@ -1,7 +1,11 @@
 """Represents the text sections in a scholarly article."""
 # TODO: use pydantic dataclass or BaseModel when pydantic is updated to v1.9
+import sys
+from array import array
+from collections.abc import Iterable, Sequence
 from dataclasses import dataclass, field
 from enum import Enum
+from typing import Any, overload
 
 
 class Marker(str, Enum):
@@ -17,7 +21,7 @@ class Marker(str, Enum):
     formula = "formula"
 
 
-@dataclass
+@dataclass(slots=True)
 class Ref:
     """Represents <ref> XML tag.
 
@@ -30,15 +34,188 @@ class Ref:
     target: str | None = None
 
 
-@dataclass
-class RefText:
+class Refs(Sequence[Ref]):
+    """Columnar list of the <ref> XML tags of a paragraph.
+
+    Positions are stored in integer arrays and markers by their index, rather than a
+    Ref object per reference. Ref objects are only created when the refs are read.
+    """
+
+    __slots__ = ("starts", "ends", "markers", "targets")
+    __MARKERS = list(Marker)
+
+    starts: array
+    ends: array
+    # Index of the marker, -1 if missing
+    markers: array
+    targets: list[str | None]
+
+    def __init__(self, refs: Iterable[Ref] = ()) -> None:
+        """Store refs in columns.
+
+        Args:
+            refs: Ref objects
+        """
+        self.starts = array("i")
+        self.ends = array("i")
+        self.markers = array("b")
+        self.targets = []
+        for ref in refs:
+            self.add(ref.start, ref.end, ref.marker, ref.target)
+
+    def add(
+        self,
+        start: int,
+        end: int,
+        marker: Marker | None = None,
+        target: str | None = None,
+    ) -> None:
+        """Add ref without creating a Ref object.
+
+        Args:
+            start: start position of the ref in the text
+            end: end position of the ref in the text
+            marker: type of the callout
+            target: ID of the referenced structure, interned as it's repeated
+        """
+        self.starts.append(start)
+        self.ends.append(end)
+        self.markers.append(-1 if marker is None else self.__MARKERS.index(marker))
+        self.targets.append(None if target is None else sys.intern(target))
+
+    def append(self, ref: Ref) -> None:
+        """Add Ref object."""
+        self.add(ref.start, ref.end, ref.marker, ref.target)
+
+    def to_dicts(self) -> list[dict[str, Any]]:
+        """Convert refs to dicts without creating Ref objects, markers by value."""
+        return [
+            dict(
+                start=start,
+                end=end,
+                marker=None if marker < 0 else self.__MARKERS[marker].value,
+                target=target,
+            )
+            for start, end, marker, target in zip(
+                self.starts, self.ends, self.markers, self.targets
+            )
+        ]
+
+    def to_columns(self) -> dict[str, list[Any]]:
+        """Convert refs to a list per attribute, markers by value."""
+        return dict(
+            start=self.starts.tolist(),
+            end=self.ends.tolist(),
+            marker=[None if i < 0 else self.__MARKERS[i].value for i in self.markers],
+            target=list(self.targets),
+        )
+
+    def spans(self) -> Iterable[tuple[int, int]]:
+        """Return start and end positions of the refs."""
+        return zip(self.starts, self.ends)
+
+    def __len__(self) -> int:
+        """Return number of refs."""
+        return len(self.starts)
+
+    @overload
+    def __getitem__(self, index: int) -> Ref:  # noqa: D105
+        ...
+
+    @overload
+    def __getitem__(self, index: slice) -> list[Ref]:  # noqa: D105
+        ...
+
+    def __getitem__(self, index: int | slice) -> Ref | list[Ref]:
+        """Create Ref objects of the index or slice."""
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+
+        marker = self.markers[index]
+        return Ref(
+            start=self.starts[index],
+            end=self.ends[index],
+            marker=None if marker < 0 else self.__MARKERS[marker],
+            target=self.targets[index],
+        )
+
+    def __eq__(self, other: object) -> bool:
+        """Compare columns, or Ref objects if compared to a list."""
+        if isinstance(other, Refs):
+            return (
+                self.starts == other.starts
+                and self.ends == other.ends
+                and self.markers == other.markers
+                and self.targets == other.targets
+            )
+        if isinstance(other, Sequence):
+            return list(self) == list(other)
+        return NotImplemented
+
+    def __repr__(self) -> str:
+        """Represent as a list of Ref objects."""
+        return f"Refs({list(self)!r})"
+
+    def __getstate__(self) -> tuple[array, array, array, list[str | None]]:
+        """Pickle columns."""
+        return self.starts, self.ends, self.markers, self.targets
+
+    def __setstate__(self, state: tuple[array, array, array, list[str | None]]) -> None:
+        """Unpickle columns."""
+        self.starts, self.ends, self.markers, self.targets = state
+
+
+class _PlainTextCache:
+    # Not a dataclass field, so it isn't compared, serialised or validated
+    __slots__ = ("_plain",)
+
+    # Plain text and ref offsets, with the text and number of refs they're built from
+    _plain: tuple[str, int, str, array] | None
+
+
+@dataclass(slots=True)
+class RefText(_PlainTextCache):
     """Represents the <p> XML tag.
 
-    Supports embedded <ref> XML tags.
+    Supports embedded <ref> XML tags, a list of Ref objects is stored as Refs.
     """
 
     text: str
-    refs: list[Ref] = field(default_factory=list)
+    refs: Refs = field(default_factory=Refs)
+
+    def __post_init__(self) -> None:
+        """Convert list of Ref objects to Refs."""
+        if not isinstance(self.refs, Refs):
+            self.refs = Refs(self.refs)
+        self._plain = None
+
+    def __build_plain(self) -> tuple[str, array]:
+        # Built once, unless the text or refs changed
+        if (
+            self._plain is not None
+            and self._plain[0] is self.text
+            and self._plain[1] == len(self.refs)
+        ):
+            return self._plain[2], self._plain[3]
+
+        offsets = array("i")
+        if len(self.refs) == 0:
+            plain_text = self.text
+        else:
+            parts: list[str] = []
+            length = 0
+            left_bound = 0
+            for start, end in self.refs.spans():
+                part = self.text[left_bound:start].rstrip()
+                parts.append(part)
+                length += len(part)
+                offsets.append(length)
+                left_bound = end
+            parts.append(self.text[left_bound:].rstrip())
+            plain_text = "".join(parts)
+
+        self._plain = (self.text, len(self.refs), plain_text, offsets)
+        return plain_text, offsets
 
     @property
     def plain_text(self) -> str:
@@ -46,20 +223,15 @@ class RefText:
 
         Trailing whitespace is removed.
         """
-        if len(self.refs) == 0:
-            return self.text
+        return self.__build_plain()[0]
 
-        ranges = [(ref.start, ref.end) for ref in self.refs]
-        text = ""
-        left_bound = 0
-        for start, end in ranges:
-            text += self.text[left_bound:start].rstrip()
-            left_bound = end
-        text += self.text[ranges[-1][1] :].rstrip()
-        return text
+    @property
+    def ref_offsets(self) -> array:
+        """Return positions of the removed refs in the plain text."""
+        return self.__build_plain()[1]
 
 
-@dataclass
+@dataclass(slots=True)
 class Section:
     """Represents <div> tag with <head> tag."""
 
@@ -68,8 +240,4 @@ class Section:
 
     def to_str(self) -> str:
         """Return paragraphs in plain text format."""
-        text = ""
-        for paragraph in self.paragraphs:
-            text += paragraph.plain_text
-
-        return text
+        return "".join(paragraph.plain_text for paragraph in self.paragraphs)
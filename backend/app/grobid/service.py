@@ -0,0 +1,420 @@
+"""Limits, retries and load balances the requests sent to GROBID servers.
+
+GROBID responds with 503 when its thread pool is full, so requests are limited to its
+configured concurrency, and busy or unreachable servers are retried with jittered
+exponential backoff. After repeated connection errors the circuit breaker of the server
+opens and it isn't used, until a trial request succeeds. Requests are distributed
+between many servers by their number of outstanding requests, and servers failing
+their health checks are skipped.
+
+Example::
+
+    grobid = GrobidPool(
+        [GrobidInstance(url, timeout=15, concurrency=10) for url in urls]
+    )
+    grobid.start(client, interval=10)
+    response = await grobid.request(form, client)
+
+"""
+import asyncio
+import random
+import time
+from dataclasses import dataclass
+from enum import Enum
+from typing import Collection
+
+import httpx
+from fastapi import Request
+
+from app.config import Settings
+from app.grobid.client import Client, Endpoint, GrobidClientError
+from app.grobid.models.form import Form
+from app.grobid.models.response import Response
+
+
+@dataclass
+class RetryPolicy:
+    """Bounded retries with jittered exponential backoff."""
+
+    retries: int = 3
+    backoff: float = 0.5
+    max_backoff: float = 8.0
+
+    def delay(self, attempt: int) -> float:
+        """Return seconds to wait before the next attempt, using full jitter.
+
+        Args:
+            attempt: number of the failed attempt, starting at 0
+
+        Returns:
+            Random delay up to the exponential backoff
+        """
+        return random.uniform(0, min(self.max_backoff, self.backoff * 2**attempt))
+
+
+class CircuitState(str, Enum):
+    """Represents whether requests are sent."""
+
+    closed = "closed"
+    opened = "open"
+    half_open = "half_open"
+
+
+class CircuitOpenError(GrobidClientError):
+    """Requests aren't sent while the circuit breaker is open."""
+
+    pass
+
+
+class CircuitBreaker:
+    """Stops requests after consecutive failures, until the reset timeout passes."""
+
+    failure_threshold: int
+    reset_timeout: float
+    __failures: int = 0
+    __opened_at: float | None = None
+    __trial_at: float | None = None
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        """Define limits.
+
+        Args:
+            failure_threshold: consecutive failures which open the circuit
+            reset_timeout: seconds before a trial request is sent to a failed server
+        """
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+
+    @property
+    def state(self) -> CircuitState:
+        """State of the circuit."""
+        if self.__opened_at is None:
+            return CircuitState.closed
+        if time.monotonic() - self.__opened_at < self.reset_timeout:
+            return CircuitState.opened
+        return CircuitState.half_open
+
+    def allow(self) -> bool:
+        """Whether a request can be sent.
+
+        A single trial request is allowed while half open, or another one if the
+        trial didn't finish within the reset timeout.
+        """
+        match self.state:
+            case CircuitState.closed:
+                return True
+            case CircuitState.half_open:
+                now = time.monotonic()
+                if (
+                    self.__trial_at is None
+                    or now - self.__trial_at >= self.reset_timeout
+                ):
+                    self.__trial_at = now
+                    return True
+        return False
+
+    def record_success(self) -> None:
+        """Close the circuit."""
+        self.__failures = 0
+        self.__opened_at = None
+        self.__trial_at = None
+
+    def record_failure(self) -> None:
+        """Count failure, opens the circuit at the threshold or if the trial failed."""
+        self.__failures += 1
+        self.__trial_at = None
+        if self.__failures >= self.failure_threshold or self.__opened_at is not None:
+            self.__opened_at = time.monotonic()
+
+
+class GrobidInstance:
+    """GROBID server shared by every request."""
+
+    api_url: str
+    timeout: int
+    breaker: CircuitBreaker
+    # Requests sent or waiting for the semaphore
+    outstanding: int = 0
+    # Result of the last health check
+    healthy: bool = True
+    # Version of GROBID, once it's known
+    version: str | None = None
+    __semaphore: asyncio.Semaphore
+
+    def __init__(
+        self,
+        api_url: str,
+        timeout: int,
+        concurrency: int = 10,
+        breaker: CircuitBreaker | None = None,
+    ) -> None:
+        """Define limits, must be created in the event loop of the app.
+
+        Args:
+            api_url: URL of the GROBID server
+            timeout: seconds before a request times out
+            concurrency: maximum number of requests at once, match GROBID's
+                `concurrency` setting
+            breaker: circuit breaker, by default opened after 5 connection errors
+        """
+        self.api_url = api_url
+        self.timeout = timeout
+        self.breaker = breaker or CircuitBreaker()
+        self.__semaphore = asyncio.Semaphore(concurrency)
+
+    async def send(
+        self,
+        form: Form,
+        client: httpx.AsyncClient | None = None,
+        endpoint: Endpoint = Endpoint.fulltext,
+    ) -> Response:
+        """Send form to GROBID once.
+
+        Args:
+            form: form data of the request
+            client: shared HTTP client, a new client is used per request if missing
+            endpoint: GROBID service which processes the PDF
+
+        Returns:
+            GROBID's response
+
+        Raises:
+            GrobidClientError: if the request failed, or the circuit breaker is open
+        """
+        if not self.breaker.allow():
+            # Another instance may be available
+            raise CircuitOpenError("GROBID circuit breaker is open", retryable=True)
+
+        self.outstanding += 1
+        try:
+            async with self.__semaphore:
+                response = await Client(
+                    api_url=self.api_url,
+                    form=form,
+                    timeout=self.timeout,
+                    client=client,
+                    endpoint=endpoint,
+                ).asyncio_request()
+        except GrobidClientError as exc:
+            # Error responses show GROBID is running
+            if exc.status_code is None:
+                self.breaker.record_failure()
+            else:
+                self.breaker.record_success()
+            raise
+        finally:
+            self.outstanding -= 1
+
+        self.breaker.record_success()
+        return response
+
+    async def check_health(self, client: httpx.AsyncClient) -> bool:
+        """Update whether GROBID is alive.
+
+        Args:
+            client: shared HTTP client
+
+        Returns:
+            Whether the instance is healthy
+        """
+        try:
+            response = await client.get(
+                f"{self.api_url}/api/isalive", timeout=self.timeout
+            )
+            self.healthy = response.status_code == 200
+        except Exception:  # noqa: B902
+            self.healthy = False
+
+        return self.healthy
+
+    async def check_version(
+        self, client: httpx.AsyncClient | None = None
+    ) -> str | None:
+        """Get the version of GROBID, only requested until it's known.
+
+        Args:
+            client: shared HTTP client, a new client is used if missing
+
+        Returns:
+            Version or None if GROBID didn't respond
+        """
+        if self.version is not None:
+            return self.version
+
+        try:
+            if client is None:
+                async with httpx.AsyncClient() as new_client:
+                    response = await new_client.get(
+                        f"{self.api_url}/api/version", timeout=self.timeout
+                    )
+            else:
+                response = await client.get(
+                    f"{self.api_url}/api/version", timeout=self.timeout
+                )
+        except httpx.HTTPError:
+            return None
+
+        if response.status_code == 200 and response.text.strip():
+            self.version = response.text.strip()
+        return self.version
+
+
+class GrobidPool:
+    """Distributes requests between GROBID instances.
+
+    Requests are sent to the healthy instance with the fewest outstanding requests, and
+    retried on another instance if it's busy or unreachable.
+    """
+
+    instances: list[GrobidInstance]
+    retry: RetryPolicy
+    __task: "asyncio.Task[None] | None" = None
+
+    def __init__(
+        self, instances: list[GrobidInstance], retry: RetryPolicy | None = None
+    ) -> None:
+        """Define instances.
+
+        Args:
+            instances: GROBID servers
+            retry: retries of busy or unreachable servers, by default 3 retries
+        """
+        self.instances = instances
+        self.retry = retry or RetryPolicy()
+
+    def choose(self, tried: Collection[GrobidInstance] = ()) -> GrobidInstance:
+        """Choose the instance with the fewest outstanding requests.
+
+        Instances which weren't tried are preferred, then healthy instances. Instances
+        with an open circuit aren't used. Ties are broken randomly.
+
+        Args:
+            tried: instances which already failed the request
+
+        Returns:
+            GrobidInstance object
+
+        Raises:
+            CircuitOpenError: if the circuit of every instance is open
+        """
+        available = [
+            instance
+            for instance in self.instances
+            if instance.breaker.state is not CircuitState.opened
+        ]
+        if not available:
+            raise CircuitOpenError("GROBID is unavailable, circuit breaker is open")
+
+        untried = [instance for instance in available if instance not in tried]
+        candidates = untried or available
+        healthy = [instance for instance in candidates if instance.healthy]
+        return min(
+            healthy or candidates,
+            key=lambda instance: (instance.outstanding, random.random()),
+        )
+
+    async def request(
+        self,
+        form: Form,
+        client: httpx.AsyncClient | None = None,
+        endpoint: Endpoint = Endpoint.fulltext,
+    ) -> Response:
+        """Send form to GROBID, retrying if it's busy or unreachable.
+
+        Args:
+            form: form data of the request
+            client: shared HTTP client, a new client is used per request if missing
+            endpoint: GROBID service which processes the PDF
+
+        Returns:
+            GROBID's response
+
+        Raises:
+            GrobidClientError: if the request failed after the retries, or the circuit
+                of every instance is open
+        """
+        attempt = 0
+        tried: list[GrobidInstance] = []
+        while True:
+            instance = self.choose(tried)
+            try:
+                return await instance.send(form, client, endpoint)
+            except GrobidClientError as exc:
+                if not exc.retryable or attempt >= self.retry.retries:
+                    raise
+                tried.append(instance)
+
+            await asyncio.sleep(self.retry.delay(attempt))
+            attempt += 1
+
+    async def version(self, client: httpx.AsyncClient | None = None) -> str | None:
+        """Get the version of the first instance which responds.
+
+        Args:
+            client: shared HTTP client, a new client is used if missing
+
+        Returns:
+            Version or None if no instance responded
+        """
+        for instance in self.instances:
+            if (version := await instance.check_version(client)) is not None:
+                return version
+        return None
+
+    async def check_health(self, client: httpx.AsyncClient) -> None:
+        """Check every instance at once.
+
+        Args:
+            client: shared HTTP client
+        """
+        await asyncio.gather(
+            *(instance.check_health(client) for instance in self.instances)
+        )
+
+    async def __check_periodically(
+        self, client: httpx.AsyncClient, interval: float
+    ) -> None:
+        while True:
+            await self.check_health(client)
+            await asyncio.sleep(interval)
+
+    def start(self, client: httpx.AsyncClient, interval: float) -> None:
+        """Check the health of the instances in the background.
+
+        Args:
+            client: shared HTTP client
+            interval: seconds between the checks
+        """
+        self.__task = asyncio.create_task(
+            self.__check_periodically(client, interval), name="grobid_health"
+        )
+
+    async def stop(self) -> None:
+        """Cancel the health checks."""
+        if self.__task is not None:
+            self.__task.cancel()
+            await asyncio.gather(self.__task, return_exceptions=True)
+            self.__task = None
+
+
+def build_grobid(settings: Settings) -> GrobidPool:
+    """Create pool of the GROBID instances using the app settings."""
+    return GrobidPool(
+        [
+            GrobidInstance(
+                api_url,
+                settings.grobid_api_timeout,
+                settings.grobid_concurrency,
+                CircuitBreaker(
+                    settings.grobid_circuit_failures, settings.grobid_circuit_reset
+                ),
+            )
+            for api_url in settings.grobid_api_urls
+        ],
+        RetryPolicy(settings.grobid_retries, settings.grobid_retry_backoff),
+    )
+
+
+def get_grobid(request: Request) -> GrobidPool:
+    """Get the GROBID pool of the app."""
+    return request.app.state.grobid
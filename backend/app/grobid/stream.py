@@ -0,0 +1,471 @@
+"""Parses TEI XML in a single pass using `lxml.etree.iterparse`.
+
+Alternative to the BeautifulSoup based `TEI` class which produces identical Article
+objects. Structures are parsed as soon as their closing tag is read, then cleared, so
+memory is bounded by the largest section or citation rather than the whole document.
+
+Example::
+
+    article = StreamingTEI(response.content, model).parse()
+
+"""
+import string
+from collections import defaultdict
+from io import BytesIO
+
+from lxml import etree
+
+from app.grobid.models import (
+    Affiliation,
+    Article,
+    Author,
+    Citation,
+    CitationIDs,
+    Date,
+    PageRange,
+    PersonName,
+    Refs,
+    RefText,
+    Scope,
+    Section,
+    Table,
+)
+from app.grobid.models.section import Marker
+from app.grobid.tei import TEI, GrobidParserError, extract_keywords
+from app.nlp.models import Pipeline
+
+XML_ID = "{http://www.w3.org/XML/1998/namespace}id"
+
+Index = dict[str, list[etree._Element]]
+
+
+def local_name(element: etree._Element) -> str:
+    """Return tag name without namespace, or empty string for comments."""
+    tag = element.tag
+    if not isinstance(tag, str):
+        return ""
+    return tag.rpartition("}")[2]
+
+
+def text(element: etree._Element) -> str:
+    """Return text of element and its descendants."""
+    return "".join(element.itertext())
+
+
+def index(element: etree._Element) -> Index:
+    """Group descendants of element by tag name, in document order."""
+    descendants: Index = defaultdict(list)
+    for descendant in element.iterdescendants():
+        if name := local_name(descendant):
+            descendants[name].append(descendant)
+
+    return descendants
+
+
+def find(
+    descendants: Index, name: str, attrs: dict[str, str] = {}
+) -> etree._Element | None:
+    """Return first descendant with tag name and attribute values."""
+    for element in descendants.get(name, ()):
+        if all(element.get(k) == v for k, v in attrs.items()):
+            return element
+
+
+class StreamingTEI:
+    """Single pass parser of TEI XML into serializable objects."""
+
+    __stream: bytes
+    __model: Pipeline
+
+    def __init__(self, stream: bytes, model: Pipeline) -> None:
+        """Store XML bytes and model.
+
+        Args:
+            stream: XML bytes
+            model: spaCy pipeline with textrank component
+
+        Raises:
+            GrobidParserError: if model arg doesn't have parser or textrank pipeline
+        """
+        if not model.has_pipe("parser"):
+            raise GrobidParserError("Language models require parser pipeline")
+        if not model.has_pipe("textrank"):
+            raise GrobidParserError("Language models require textrank pipeline")
+        self.__stream = stream
+        self.__model = model
+
+    def parse(self, strict: bool = True) -> Article:
+        """Attempt to parse the XML into Article object.
+
+        Args:
+            strict: fail if any fields are missing, otherwise the missing fields of
+                partial responses (header or references only) are empty
+
+        Returns:
+            Article object
+
+        Raises:
+            GrobidParserError: Article could not be parsed
+        """
+        # First occurrence of each container tag
+        body = source_desc = list_bibl = None
+        # Open structures still to be parsed, innermost last
+        stack: list[tuple[etree._Element, str, int]] = []
+
+        abstract: Section | None = None
+        bibliography: Citation | None = None
+        keywords: set[str] = set()
+        sections: list[Section | None] = []
+        tables: list[tuple[str, Table | None]] = []
+        citations: list[tuple[str | None, Citation | None]] = []
+        seen = set()
+
+        events = etree.iterparse(
+            BytesIO(self.__stream),
+            events=("start", "end"),
+            recover=True,
+            huge_tree=True,
+        )
+        try:
+            for event, element in events:
+                name = local_name(element)
+
+                if event == "start":
+                    match name:
+                        case "body" if body is None:
+                            body = element
+                        case "sourceDesc" if source_desc is None:
+                            source_desc = element
+                        case "listBibl" if list_bibl is None:
+                            list_bibl = element
+                        case "div" if body in element.iterancestors():
+                            stack.append((element, name, len(sections)))
+                            sections.append(None)
+                        case "figure" if body in element.iterancestors():
+                            if element.get("type") == "table" and (
+                                xml_id := element.get(XML_ID)
+                            ):
+                                stack.append((element, name, len(tables)))
+                                tables.append((xml_id, None))
+                        case "abstract" | "keywords" if name not in seen:
+                            seen.add(name)
+                            stack.append((element, name, 0))
+                        case "biblStruct":
+                            if list_bibl in element.iterancestors():
+                                stack.append((element, "citation", len(citations)))
+                                citations.append((element.get(XML_ID), None))
+                            elif (
+                                "bibliography" not in seen
+                                and source_desc in element.iterancestors()
+                            ):
+                                seen.add("bibliography")
+                                stack.append((element, "bibliography", 0))
+                    continue
+
+                if stack and stack[-1][0] is element:
+                    _, kind, slot = stack.pop()
+                    match kind:
+                        case "div":
+                            sections[slot] = self.section(element)
+                        case "figure":
+                            tables[slot] = (tables[slot][0], self.table(element))
+                        case "abstract":
+                            abstract = self.section(element, title="Abstract")
+                        case "keywords":
+                            keywords = self.keywords(element)
+                        case "bibliography":
+                            bibliography = self.citation(element)
+                        case "citation":
+                            citations[slot] = (
+                                citations[slot][0],
+                                self.citation(element),
+                            )
+
+                # Nothing left needs the element
+                if not stack:
+                    element.clear()
+                    if (parent := element.getparent()) is not None:
+                        while element.getprevious() is not None:
+                            del parent[0]
+        except etree.XMLSyntaxError:
+            # Lenient like BeautifulSoup, parse what has been read
+            pass
+
+        if strict:
+            if body is None:
+                raise GrobidParserError("Missing body")
+
+            if source_desc is None:
+                raise GrobidParserError("Missing source description")
+
+            if bibliography is None:
+                raise GrobidParserError("Missing bibliography")
+
+            if list_bibl is None:
+                raise GrobidParserError("Missing citations")
+
+        if bibliography is None:
+            bibliography = Citation(title="")
+
+        return Article(
+            abstract=abstract,
+            sections=[section for section in sections if section is not None],
+            tables={name: table for name, table in tables if table is not None},
+            bibliography=bibliography,
+            keywords=keywords,
+            citations={
+                name: citation for name, citation in citations if citation is not None
+            },
+        )
+
+    def citation(self, source_tag: etree._Element) -> Citation:
+        """Parse citation.
+
+        Args:
+            source_tag : biblStruct XML element
+
+        Returns:
+            Citation object
+        """
+        descendants = index(source_tag)
+
+        title = self.title(descendants, attrs={"type": "main"})
+        if not title:
+            # Use meeting as the main title
+            title = self.title(descendants, attrs={"level": "m"})
+        citation = Citation(title=title)
+        citation.authors = self.authors(descendants)
+        ids = CitationIDs(
+            DOI=self.idno(descendants, attrs={"type": "DOI"}),
+            arXiv=self.idno(descendants, attrs={"type": "arXiv"}),
+        )
+        if not ids.is_empty():
+            citation.ids = ids
+
+        citation.date = self.date(descendants)
+        citation.target = self.target(descendants)
+        citation.publisher = self.publisher(descendants)
+        citation.scope = self.scope(descendants)
+        if journal := self.title(descendants, attrs={"level": "j"}):
+            if journal != citation.title:
+                citation.journal = journal
+        if series := self.title(descendants, attrs={"level": "s"}):
+            if series != citation.title:
+                citation.series = series
+
+        return citation
+
+    @staticmethod
+    def title(descendants: Index, attrs: dict[str, str] = {}) -> str:
+        """Parse first title element text with matching attributes."""
+        if (title_tag := find(descendants, "title", attrs)) is not None:
+            return text(title_tag)
+
+        return ""
+
+    @staticmethod
+    def target(descendants: Index) -> str | None:
+        """Parse first ptr element target."""
+        if (ptr_tag := find(descendants, "ptr")) is not None:
+            return ptr_tag.get("target")
+
+    @staticmethod
+    def idno(descendants: Index, attrs: dict[str, str] = {}) -> str | None:
+        """Parse first idno element text with matching attributes."""
+        if (idno_tag := find(descendants, "idno", attrs)) is not None:
+            return text(idno_tag) or None
+
+    @staticmethod
+    def publisher(descendants: Index) -> str | None:
+        """Parse first publisher element text."""
+        if (publisher_tag := find(descendants, "publisher")) is not None:
+            return text(publisher_tag) or None
+
+    @staticmethod
+    def date(descendants: Index) -> Date | None:
+        """Parse first date element."""
+        if (date_tag := find(descendants, "date")) is not None:
+            if (when := date_tag.get("when")) is not None:
+                return TEI.parse_date(when)
+
+    @staticmethod
+    def scope(descendants: Index) -> Scope | None:
+        """Parse all biblScope elements."""
+        scope = Scope()
+        for scope_tag in descendants.get("biblScope", ()):
+            match scope_tag.get("unit"):
+                case "page":
+                    try:
+                        from_page = scope_tag.get("from")
+                        to_page = scope_tag.get("to")
+                        if from_page is not None and to_page is not None:
+                            pages = PageRange(int(from_page), int(to_page))
+                        elif scope_text := text(scope_tag):
+                            pages = PageRange(int(scope_text), int(scope_text))
+                        else:
+                            continue
+
+                        scope.pages = pages
+                    except ValueError:
+                        continue
+                case "volume":
+                    try:
+                        scope.volume = int(text(scope_tag))
+                    except ValueError:
+                        continue
+
+        if not scope.is_empty():
+            return scope
+
+    @staticmethod
+    def authors(descendants: Index) -> list[Author]:
+        """Parse all author elements."""
+        authors: list[Author] = []
+        for author in descendants.get("author", ()):
+            author_descendants = index(author)
+            if (persname := find(author_descendants, "persName")) is None:
+                continue
+
+            persname_descendants = index(persname)
+            if (surname_tag := find(persname_descendants, "surname")) is None:
+                continue
+
+            person_name = PersonName(surname=text(surname_tag))
+            forename_tag = find(persname_descendants, "forename", {"type": "first"})
+            if forename_tag is not None:
+                person_name.first_name = text(forename_tag)
+
+            author_obj = Author(person_name=person_name)
+            authors.append(author_obj)
+
+            if (email_tag := find(author_descendants, "email")) is not None:
+                author_obj.email = text(email_tag)
+
+            for affiliation_tag in author_descendants.get("affiliation", ()):
+                affiliation_obj = Affiliation()
+                for orgname_tag in affiliation_tag.iterdescendants("{*}orgName"):
+                    match orgname_tag.get("type"):
+                        case "institution":
+                            affiliation_obj.institution = text(orgname_tag)
+                        case "department":
+                            affiliation_obj.department = text(orgname_tag)
+                        case "laboratory":
+                            affiliation_obj.laboratory = text(orgname_tag)
+
+                if not affiliation_obj.is_empty():
+                    author_obj.affiliations.append(affiliation_obj)
+
+        return authors
+
+    def keywords(self, source_tag: etree._Element) -> set[str]:
+        """Parse all term elements.
+
+        Args:
+            source_tag : keywords XML element
+
+        Returns:
+            Set of keywords
+        """
+        terms: list[str] = []
+        for term_tag in source_tag.iterdescendants("{*}term"):
+            if term := text(term_tag):
+                terms.append(term)
+
+        return extract_keywords(terms, self.__model)
+
+    def section(self, source_tag: etree._Element, title: str = "") -> Section | None:
+        """Parse div element with head element.
+
+        Args:
+            source_tag : XML element
+            title: forces the parsing of the section. Default is empty string (false)
+
+        Returns:
+            Section object if valid section.
+        """
+        descendants = index(source_tag)
+        if (head := find(descendants, "head")) is not None:
+            head_text = text(head)
+            if head.get("n") is not None or (
+                head_text and head_text[0] in string.ascii_letters
+            ):
+                if head_text.isupper() or head_text.islower():
+                    head_text = head_text.capitalize()
+
+            section = Section(title=head_text)
+        elif title:
+            section = Section(title=title)
+        else:
+            return
+
+        for p in descendants.get("p", ()):
+            section.paragraphs.append(self.ref_text(p))
+
+        return section
+
+    @staticmethod
+    def ref_text(source_tag: etree._Element) -> RefText:
+        """Parse text with ref elements.
+
+        Args:
+            source_tag : XML element
+
+        Returns:
+            RefText object
+        """
+        parts: list[str] = []
+        refs = Refs()
+        length = 0
+
+        def walk(element: etree._Element) -> None:
+            nonlocal length
+            if element.text and local_name(element):
+                parts.append(element.text)
+                length += len(element.text)
+
+            for child in element:
+                if local_name(child) == "ref":
+                    marker = None
+                    if (el_type := child.get("type")) is not None:
+                        try:
+                            marker = Marker[el_type]
+                        except KeyError:
+                            pass
+
+                    # NOTE: if target[0] is '#', check for citation
+                    refs.add(
+                        length, length + len(text(child)), marker, child.get("target")
+                    )
+
+                walk(child)
+
+                if child.tail:
+                    parts.append(child.tail)
+                    length += len(child.tail)
+
+        walk(source_tag)
+
+        return RefText(text="".join(parts), refs=refs)
+
+    @staticmethod
+    def table(source_tag: etree._Element) -> Table | None:
+        """Parse figure element with table type.
+
+        Args:
+            source_tag : XML element
+
+        Returns:
+            Table object
+        """
+        descendants = index(source_tag)
+        if (head_tag := find(descendants, "head")) is not None:
+            if head_text := text(head_tag):
+                table = Table(heading=head_text)
+                if (desc_tag := find(descendants, "figDesc")) is not None:
+                    table.description = text(desc_tag)
+                for row in descendants.get("row", ()):
+                    table.rows.append(
+                        [text(cell) for cell in row.iterdescendants("{*}cell")]
+                    )
+
+                return table
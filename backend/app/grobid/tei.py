@@ -5,7 +5,6 @@ from typing import Generator
 import pytextrank  # noqa:F401
 from bs4 import BeautifulSoup
 from bs4.element import NavigableString, PageElement, Tag
-from spacy.language import Language
 
 from app.grobid.models import (
     Affiliation,
@@ -16,13 +15,14 @@ from app.grobid.models import (
     Date,
     PageRange,
     PersonName,
-    Ref,
+    Refs,
     RefText,
     Scope,
     Section,
     Table,
 )
 from app.grobid.models.section import Marker
+from app.nlp.models import Pipeline
 
 
 class GrobidParserError(BaseException):
@@ -31,35 +31,61 @@ class GrobidParserError(BaseException):
     pass
 
 
-# TODO: use DOI from PyMuPDF to cache XML
+def extract_keywords(terms: list[str], model: Pipeline) -> set[str]:
+    """Extract keywords from the text of term tags.
+
+    Uses spaCy model with textrank pipeline to extract noun chunks. Terms are run
+    through the model as a stream of batches.
+
+    Args:
+        terms: text of each term tag
+        model: spaCy pipeline with textrank component
+
+    Returns:
+        Set of keywords
+    """
+    keywords: set[str] = set()
+
+    for doc in model.pipe(terms):
+        phrases = doc._.phrases
+        if phrases:
+            phrase = phrases[0].text
+            if clean_keyword := TEI.clean_title_string(phrase):
+                keywords.add(clean_keyword)
+
+    return keywords
+
+
 # NOTE: shouldn't TEI methods be static?
 class TEI:
     """Methods used to parse TEI XML into serializable objects."""
 
     soup: BeautifulSoup
-    __model: Language
+    __model: Pipeline
 
-    def __init__(self, stream: bytes, model: Language) -> None:
+    def __init__(self, stream: bytes, model: Pipeline) -> None:
         """TEI class constructor.
 
         Args:
             stream: XML bytes
-            model: spaCy language model
+            model: spaCy pipeline with textrank component
 
         Raises:
-            GrobidParserError: if model arg doesn't have parser pipeline
+            GrobidParserError: if model arg doesn't have parser or textrank pipeline
         """
         self.soup = BeautifulSoup(stream, "lxml-xml")
         if not model.has_pipe("parser"):
             raise GrobidParserError("Language models require parser pipeline")
         if not model.has_pipe("textrank"):
-            model.add_pipe("textrank")
+            raise GrobidParserError("Language models require textrank pipeline")
         self.__model = model
 
-    def parse(self) -> Article:
+    def parse(self, strict: bool = True) -> Article:
         """Attempt to parse the XML into Article object.
 
-        Parsing is strict (fails if any fields are missing)
+        Args:
+            strict: fail if any fields are missing, otherwise the missing fields of
+                partial responses (header or references only) are empty
 
         Returns:
             Article object
@@ -69,43 +95,49 @@ class TEI:
         """
         body = self.soup.body
 
-        if not isinstance(body, Tag):
+        if strict and not isinstance(body, Tag):
             raise GrobidParserError("Missing body")
 
         abstract: Section | None = self.section(self.soup.abstract, title="Abstract")
 
         sections: list[Section] = []
-        for div in body.find_all("div"):
-            if (section := self.section(div)) is not None:
-                sections.append(section)
-
         tables: dict[str, Table] = {}
-        for table_tag in body.find_all("figure", {"type": "table"}):
-            if isinstance(table_tag, Tag):
-                if "xml:id" in table_tag.attrs:
-                    name = table_tag.attrs["xml:id"]
-                    if (table_obj := self.table(table_tag)) is not None:
-                        tables[name] = table_obj
-
-        if (source := self.soup.find("sourceDesc")) is None:
+        if isinstance(body, Tag):
+            for div in body.find_all("div"):
+                if (section := self.section(div)) is not None:
+                    sections.append(section)
+
+            for table_tag in body.find_all("figure", {"type": "table"}):
+                if isinstance(table_tag, Tag):
+                    if "xml:id" in table_tag.attrs:
+                        name = table_tag.attrs["xml:id"]
+                        if (table_obj := self.table(table_tag)) is not None:
+                            tables[name] = table_obj
+
+        source = self.soup.find("sourceDesc")
+        if strict and source is None:
             raise GrobidParserError("Missing source description")
 
-        biblstruct_tag = source.find("biblStruct")
-        if not isinstance(biblstruct_tag, Tag):
+        biblstruct_tag = source.find("biblStruct") if source is not None else None
+        if isinstance(biblstruct_tag, Tag):
+            bibliography = self.citation(biblstruct_tag)
+        elif strict:
             raise GrobidParserError("Missing bibliography")
+        else:
+            bibliography = Citation(title="")
 
-        bibliography = self.citation(biblstruct_tag)
         keywords = self.keywords(self.soup.keywords)
 
         listbibl_tag = self.soup.find("listBibl")
-        if not isinstance(listbibl_tag, Tag):
+        if strict and not isinstance(listbibl_tag, Tag):
             raise GrobidParserError("Missing citations")
 
         citations = {}
-        for struct_tag in listbibl_tag.find_all("biblStruct"):
-            if isinstance(struct_tag, Tag):
-                name = struct_tag.get("xml:id")
-                citations[name] = self.citation(struct_tag)
+        if isinstance(listbibl_tag, Tag):
+            for struct_tag in listbibl_tag.find_all("biblStruct"):
+                if isinstance(struct_tag, Tag):
+                    name = struct_tag.get("xml:id")
+                    citations[name] = self.citation(struct_tag)
 
         return Article(
             abstract=abstract,
@@ -208,19 +240,14 @@ class TEI:
         Returns:
             Set of keywords
         """
-        keywords: set[str] = set()
+        terms: list[str] = []
 
         if source_tag is not None:
             for term_tag in source_tag.find_all("term"):
                 if term_tag.text:
-                    doc = self.__model(term_tag.text)
-                    phrases = doc._.phrases
-                    if phrases:
-                        phrase = phrases[0].text
-                        if clean_keyword := self.clean_title_string(phrase):
-                            keywords.add(clean_keyword)
+                    terms.append(term_tag.text)
 
-        return keywords
+        return extract_keywords(terms, self.__model)
 
     def publisher(self, source_tag: Tag | None) -> str | None:
         """Parse publisher tag text.
@@ -249,10 +276,20 @@ class TEI:
                 if "when" in date_tag.attrs:
                     when = date_tag.attrs["when"]
 
-                    return self.__parse_date(when)
+                    return self.parse_date(when)
 
-    def __parse_date(self, date: str) -> Date | None:
-        # Naive ISO 8601 date parser
+    @staticmethod
+    def parse_date(date: str) -> Date | None:
+        """Parse 'when' attribute of date tag.
+
+        Naive ISO 8601 date parser.
+
+        Args:
+            date: date string, i.e. 2022-05-03
+
+        Returns:
+            Date object if date string isn't empty
+        """
         tokens = date.split(sep="-")
         tokens = list(filter(None, tokens))
 
@@ -407,28 +444,26 @@ class TEI:
         """
         if source_tag is not None:
             text_and_refs = self.__text_and_refs(source_tag)
+            parts: list[str] = []
             start = 0
-            ref_text = RefText(text="")
+            refs = Refs()
             for el in text_and_refs:
-                start = len(ref_text.text)
                 if isinstance(el, Tag):
                     end = start + len(el.text)
-                    ref = Ref(start=start, end=end)
+                    marker = None
                     if (el_type := el.attrs.get("type")) is not None:
                         try:
-                            ref.marker = Marker[el_type]
+                            marker = Marker[el_type]
                         except KeyError:
                             pass
 
                     # NOTE: if target[0] is '#', check for citation
-                    if (el_target := el.attrs.get("target")) is not None:
-                        ref.target = el_target
-
-                    ref_text.refs.append(ref)
+                    refs.add(start, end, marker, el.attrs.get("target"))
                 else:
-                    ref_text.text += str(el)
+                    parts.append(str(el))
+                    start += len(parts[-1])
 
-            return ref_text
+            return RefText(text="".join(parts), refs=refs)
 
     def table(self, source_tag: Tag | None) -> Table | None:
         """Parse <figure> with table type.
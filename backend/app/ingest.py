@@ -0,0 +1,375 @@
+"""Processes a directory of PDFs or TEI files without the HTTP API.
+
+PDFs are sent to GROBID, limited to its concurrency, then the TEI is parsed and analysed
+by a pool of processes, with a spaCy model loaded once per worker. Summaries aren't
+generated. Results are appended as JSON lines as soon as each file finishes, so an
+interrupted run resumes with the files which weren't processed, or which failed.
+
+Example::
+
+    $ python -m app.ingest papers/ --output papers.jsonl --workers 4
+
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+from importlib.util import find_spec
+from pathlib import Path
+from typing import IO, Any, AsyncIterator
+
+import httpx
+from pydantic import ValidationError
+
+from app.archive import TEIArchive
+from app.cache import NullCache, ResultCache, cache_key
+from app.config import Settings, get_settings
+from app.executor import Executor
+from app.grobid.models import dumps
+from app.grobid.service import build_grobid
+from app.grobid.tei import GrobidParserError
+from app.pipeline import parse_and_analyse
+from app.processor import ProcessingError, Processor
+from app.summariser import NullSummariser
+
+# TEI files are parsed without GROBID
+SUFFIXES = (".pdf", ".xml")
+
+# Parquet output requires the optional pyarrow package
+PARQUET_SUPPORTED = find_spec("pyarrow") is not None
+
+
+def find_inputs(directory: Path) -> list[Path]:
+    """List PDFs and TEI files of the directory and its subdirectories.
+
+    Args:
+        directory: directory of the inputs
+
+    Returns:
+        Sorted paths of the inputs
+    """
+    return sorted(
+        path
+        for path in directory.rglob("*")
+        if path.is_file() and path.suffix.lower() in SUFFIXES
+    )
+
+
+def truncate_partial_line(output: Path) -> None:
+    """Remove the line which was being written when the previous run was interrupted.
+
+    The file is read backwards as bytes, as the line may end inside a UTF-8 character.
+
+    Args:
+        output: JSON lines of the previous run
+    """
+    if not output.exists():
+        return
+
+    with output.open("r+b") as file:
+        end = position = file.seek(0, os.SEEK_END)
+        while position > 0:
+            start = max(position - 4096, 0)
+            file.seek(start)
+            index = file.read(position - start).rfind(b"\n")
+            if index != -1:
+                position = start + index + 1
+                break
+            position = start
+        if position != end:
+            file.truncate(position)
+
+
+def read_checkpoint(output: Path) -> set[str]:
+    """Read the inputs processed by a previous run, removing the failed inputs.
+
+    Failed inputs are processed again, so their lines are replaced by the new result.
+
+    Args:
+        output: JSON lines of the previous run
+
+    Returns:
+        Paths of the inputs which didn't fail
+    """
+    done: set[str] = set()
+    if not output.exists():
+        return done
+
+    failed = False
+    lines = []
+    with output.open(encoding="utf-8") as file:
+        for line in file:
+            try:
+                result = json.loads(line)
+            except json.JSONDecodeError:
+                # Line which was being written when the run was interrupted
+                failed = True
+                continue
+            if "detail" in result:
+                failed = True
+            else:
+                done.add(result["path"])
+                lines.append(line)
+
+    if failed:
+        compacted = output.with_name(f"{output.name}.tmp")
+        compacted.write_text("".join(lines), encoding="utf-8")
+        compacted.replace(output)
+
+    return done
+
+
+class Ingester:
+    """Runs the pipeline stages of each input, using the stages of the processor."""
+
+    processor: Processor
+    __semaphore: asyncio.Semaphore
+
+    def __init__(self, processor: Processor, concurrency: int) -> None:
+        """Define limits.
+
+        Args:
+            processor: reads PDFs and gets their TEI from the archive or GROBID
+            concurrency: maximum number of inputs processed at once
+        """
+        self.processor = processor
+        self.__semaphore = asyncio.Semaphore(concurrency)
+
+    async def tei(self, path: Path) -> tuple[str, bytes]:
+        """Get TEI of the input.
+
+        Args:
+            path: path to the PDF or TEI file
+
+        Returns:
+            Cache key of the input and its TEI
+
+        Raises:
+            ProcessingError: PDF can't be read or GROBID is unavailable
+        """
+        upload = await self.processor.executor.run_thread(path.read_bytes)
+        if path.suffix.lower() == ".xml":
+            return cache_key(None, upload), upload
+
+        contents, uid = await self.processor.read(upload)
+        key = cache_key(uid, upload)
+        return key, await self.processor.tei(key, contents, path.name)
+
+    async def ingest(self, path: Path, name: str) -> dict[str, Any]:
+        """Run every stage of the pipeline for the input.
+
+        Args:
+            path: path to the PDF or TEI file
+            name: name of the input in the result
+
+        Returns:
+            Result of the input, or the detail of its error
+        """
+        async with self.__semaphore:
+            try:
+                key, tei_content = await self.tei(path)
+            except ProcessingError as exc:
+                return dict(path=name, status_code=exc.status_code, detail=exc.detail)
+            try:
+                article, result = await self.processor.executor.run_process(
+                    parse_and_analyse, tei_content, self.processor.settings.tei_parser
+                )
+            except GrobidParserError as exc:
+                # The next run requests TEI of the PDF from GROBID again
+                await self.processor.set_parse_error(key, str(exc))
+                return dict(path=name, status_code=400, detail=str(exc))
+
+        return dict(
+            path=name,
+            key=key,
+            article=article,
+            common_words=result.common_words,
+            phrase_ranks=result.phrase_ranks,
+            sentences=result.sentences,
+        )
+
+    async def ingest_many(
+        self, paths: list[Path], root: Path
+    ) -> AsyncIterator[dict[str, Any]]:
+        """Run every stage of the pipeline for each input.
+
+        Args:
+            paths: paths to the PDF or TEI files
+            root: directory of the inputs, their names are relative to it
+
+        Yields:
+            Result of each input as soon as it finishes
+        """
+        tasks = [
+            asyncio.create_task(self.ingest(path, path.relative_to(root).as_posix()))
+            for path in paths
+        ]
+        try:
+            for task in asyncio.as_completed(tasks):
+                yield await task
+        finally:
+            for task in tasks:
+                task.cancel()
+
+
+def write_parquet(output: Path, parquet: Path) -> None:
+    """Convert the JSON lines to Parquet, nested values are stored as JSON.
+
+    Args:
+        output: path of the JSON lines
+        parquet: path of the Parquet file
+
+    Raises:
+        RuntimeError: if pyarrow isn't installed
+    """
+    if not PARQUET_SUPPORTED:
+        raise RuntimeError("Parquet output requires pyarrow")
+
+    import pyarrow
+    import pyarrow.parquet
+
+    # Last result of each input
+    rows = {}
+    with output.open(encoding="utf-8") as file:
+        for line in file:
+            try:
+                result = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            rows[result["path"]] = {
+                name: json.dumps(value) if isinstance(value, (dict, list)) else value
+                for name, value in result.items()
+            }
+
+    pyarrow.parquet.write_table(pyarrow.Table.from_pylist(list(rows.values())), parquet)
+
+
+async def ingest(
+    settings: Settings,
+    paths: list[Path],
+    root: Path,
+    stream: IO[str],
+    workers: int,
+    archive: TEIArchive | None = None,
+) -> bool:
+    """Process the inputs, writing a JSON line per input.
+
+    Args:
+        settings: app settings, used for GROBID and the pipeline stages
+        paths: paths to the PDF or TEI files
+        root: directory of the inputs
+        stream: stream of the JSON lines
+        workers: number of processes, 0 runs in the thread pool instead
+        archive: archive of the TEI produced by GROBID
+
+    Returns:
+        Whether every input was processed
+    """
+    executor = Executor(settings.thread_pool_size, workers)
+    grobid = build_grobid(settings)
+    success = True
+    try:
+        async with httpx.AsyncClient() as client:
+            processor = Processor(
+                settings,
+                ResultCache(NullCache()),
+                executor,
+                grobid,
+                client,
+                NullSummariser(),
+                archive,
+            )
+            # Enough inputs for every GROBID slot and worker
+            concurrency = settings.grobid_concurrency * len(grobid.instances) + max(
+                workers, 1
+            )
+            ingester = Ingester(processor, concurrency)
+            async for result in ingester.ingest_many(paths, root):
+                success = success and "detail" not in result
+                stream.write(dumps(result).decode() + "\n")
+                stream.flush()
+    finally:
+        executor.shutdown()
+
+    return success
+
+
+def main(argv: list[str] | None = None) -> int:
+    """Run the command line interface.
+
+    Args:
+        argv: command line arguments, by default those of the process
+
+    Returns:
+        Exit code, 1 if any input failed
+    """
+    parser = argparse.ArgumentParser(
+        prog="python -m app.ingest", description=__doc__.splitlines()[0]
+    )
+    parser.add_argument("directory", type=Path, help="directory of PDFs or TEI files")
+    parser.add_argument(
+        "--output",
+        type=Path,
+        required=True,
+        help="path of the JSON lines, inputs already in it are skipped",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=os.cpu_count() or 1,
+        help="number of processes, 0 runs in threads of the current process",
+    )
+    parser.add_argument(
+        "--grobid-url", help="URLs of GROBID, comma separated, by default from .env"
+    )
+    parser.add_argument(
+        "--grobid-concurrency", type=int, help="maximum requests per GROBID instance"
+    )
+    parser.add_argument("--archive", help="path to the TEI archive database")
+    parser.add_argument(
+        "--parquet", type=Path, help="also write the results as Parquet"
+    )
+    args = parser.parse_args(argv)
+
+    if args.parquet is not None and not PARQUET_SUPPORTED:
+        parser.error("--parquet requires pyarrow")
+    try:
+        settings = (
+            Settings(grobid_api_url=args.grobid_url)
+            if args.grobid_url
+            else get_settings()
+        )
+    except ValidationError:
+        parser.error("GROBID_API_URL or --grobid-url is required")
+    if args.grobid_concurrency is not None:
+        settings = settings.copy(
+            update=dict(grobid_concurrency=args.grobid_concurrency)
+        )
+
+    truncate_partial_line(args.output)
+    done = read_checkpoint(args.output)
+    paths = [
+        path
+        for path in find_inputs(args.directory)
+        if path.relative_to(args.directory).as_posix() not in done
+    ]
+    archive = TEIArchive(args.archive) if args.archive else None
+
+    with args.output.open("a", encoding="utf-8") as stream:
+        try:
+            success = asyncio.run(
+                ingest(settings, paths, args.directory, stream, args.workers, archive)
+            )
+        finally:
+            if archive is not None:
+                archive.close()
+
+    if args.parquet is not None:
+        write_parquet(args.output, args.parquet)
+
+    return 0 if success else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,200 @@
+"""Runs uploads as background jobs.
+
+Jobs are added to a bounded queue and processed by a fixed number of worker tasks, so
+bursts of uploads don't hold HTTP connections open for the whole pipeline. The results
+of each stage are stored on the job as soon as they're ready.
+
+Example::
+
+    jobs = JobQueue(maxsize=100, workers=4)
+    await jobs.start()
+    job = jobs.submit(processor, upload, "paper.pdf")
+    jobs.get(job.job_id).results
+
+"""
+import asyncio
+import uuid
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from enum import Enum
+from typing import Any
+
+from fastapi import Request, status
+
+from app.processor import Engine, ProcessingError, Processor
+
+
+class JobStatus(str, Enum):
+    """Represents the state of a job."""
+
+    queued = "queued"
+    running = "running"
+    done = "done"
+    failed = "failed"
+
+
+@dataclass
+class Job:
+    """Represents an upload processed in the background."""
+
+    job_id: str = field(default_factory=lambda: uuid.uuid4().hex)
+    status: JobStatus = JobStatus.queued
+    results: dict[str, Any] = field(default_factory=dict)
+    error: dict[str, Any] | None = None
+
+    @property
+    def finished(self) -> bool:
+        """Whether the job is done or failed."""
+        return self.status in (JobStatus.done, JobStatus.failed)
+
+    def to_dict(self) -> dict[str, Any]:
+        """Serialize job for the API response."""
+        return dict(
+            id=self.job_id,
+            status=self.status.value,
+            results=self.results,
+            error=self.error,
+        )
+
+
+class JobQueueFull(Exception):
+    """Queue doesn't have space for another job."""
+
+    pass
+
+
+class JobQueue:
+    """Bounded queue of jobs processed by worker tasks."""
+
+    maxsize: int
+    workers: int
+    max_jobs: int
+    __jobs: OrderedDict[str, Job]
+    __queue: asyncio.Queue | None = None
+    __tasks: list[asyncio.Task]
+
+    def __init__(self, maxsize: int, workers: int, max_jobs: int = 1000) -> None:
+        """Define limits, workers are created by start.
+
+        Args:
+            maxsize: maximum number of queued jobs
+            workers: number of jobs processed concurrently
+            max_jobs: maximum number of stored jobs, the oldest finished jobs are
+                removed first
+        """
+        self.maxsize = maxsize
+        self.workers = workers
+        self.max_jobs = max_jobs
+        self.__jobs = OrderedDict()
+        self.__tasks = []
+
+    async def start(self) -> None:
+        """Create queue and worker tasks in the running event loop."""
+        self.__queue = asyncio.Queue(maxsize=self.maxsize)
+        self.__tasks = [
+            asyncio.create_task(self.__work(self.__queue), name=f"job_worker_{i}")
+            for i in range(self.workers)
+        ]
+
+    async def stop(self) -> None:
+        """Cancel worker tasks, unfinished jobs are marked as failed."""
+        for task in self.__tasks:
+            task.cancel()
+        await asyncio.gather(*self.__tasks, return_exceptions=True)
+        self.__tasks = []
+        self.__queue = None
+
+        for job in self.__jobs.values():
+            if not job.finished:
+                job.status = JobStatus.failed
+                job.error = dict(
+                    status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                    detail="Server shutdown before job finished",
+                )
+
+    def __prune(self) -> None:
+        finished = [job.job_id for job in self.__jobs.values() if job.finished]
+        for job_id in finished[: max(len(self.__jobs) - self.max_jobs, 0)]:
+            del self.__jobs[job_id]
+
+    def submit(
+        self,
+        processor: Processor,
+        upload: bytes,
+        filename: str | None = None,
+        engine: Engine = Engine.grobid,
+    ) -> Job:
+        """Add upload to the queue.
+
+        Args:
+            processor: runs the pipeline stages
+            upload: uploaded PDF bytes
+            filename: name of the uploaded file
+            engine: parses the PDF
+
+        Returns:
+            Queued Job object
+
+        Raises:
+            JobQueueFull: if the queue is full or not started
+        """
+        if self.__queue is None:
+            raise JobQueueFull("Job queue isn't running")
+
+        job = Job()
+        try:
+            self.__queue.put_nowait((job, processor, upload, filename, engine))
+        except asyncio.QueueFull:
+            raise JobQueueFull("Job queue is full")
+
+        self.__jobs[job.job_id] = job
+        self.__prune()
+
+        return job
+
+    def get(self, job_id: str) -> Job | None:
+        """Return job or None if missing."""
+        return self.__jobs.get(job_id)
+
+    async def __run(
+        self,
+        job: Job,
+        processor: Processor,
+        upload: bytes,
+        filename: str | None,
+        engine: Engine,
+    ) -> None:
+        job.status = JobStatus.running
+        try:
+            async for event, data in processor.process(upload, filename, engine):
+                job.results[event.value] = data
+        except ProcessingError as exc:
+            job.status = JobStatus.failed
+            job.error = dict(status_code=exc.status_code, detail=exc.detail)
+        except Exception:  # noqa: B902
+            # Worker must keep running for the next job
+            job.status = JobStatus.failed
+            job.error = dict(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail="Job failed unexpectedly",
+            )
+        else:
+            job.status = JobStatus.done
+
+    async def __work(self, queue: asyncio.Queue) -> None:
+        while True:
+            job, processor, upload, filename, engine = await queue.get()
+            try:
+                await self.__run(job, processor, upload, filename, engine)
+            finally:
+                queue.task_done()
+
+    async def join(self) -> None:
+        """Wait until every queued job is finished."""
+        if self.__queue is not None:
+            await self.__queue.join()
+
+
+def get_jobs(request: Request) -> JobQueue:
+    """Get the job queue of the app."""
+    return request.app.state.jobs
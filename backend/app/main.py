@@ -11,7 +11,15 @@ Todo:
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
+from app.api.middleware import CompressionMiddleware
 from app.api.routes import router
+from app.clients import ClientRegistry
+from app.config import Settings, get_settings
+from app.executor import shutdown_executors
+from app.grobid.service import build_grobid
+from app.jobs import JobQueue
+from app.nlp.summary import get_tokenizer
+from app.summariser import build_local_summariser, shutdown_summarisers
 
 
 def get_application() -> FastAPI:
@@ -30,9 +38,69 @@ def get_application() -> FastAPI:
         allow_methods=["*"],
         allow_headers=["*"],
     )
+    # Small responses aren't worth compressing
+    application.add_middleware(
+        CompressionMiddleware, minimum_size=1000, compresslevel=6
+    )
 
     application.include_router(router)
 
+    application.state.clients = ClientRegistry()
+
+    def app_settings() -> Settings:
+        """Get settings, including overrides used by the tests."""
+        return application.dependency_overrides.get(get_settings, get_settings)()
+
+    def load_summariser() -> None:
+        """Load tokenizer or model of the summariser once."""
+        settings = app_settings()
+        match settings.summariser:
+            case "huggingface" if settings.huggingface_api_token:
+                get_tokenizer(settings.bart_fast_tokenizer)
+            case "local":
+                build_local_summariser(
+                    settings.summariser_model,
+                    settings.summariser_workers,
+                    settings.summariser_batch_size,
+                    settings.summariser_quantize,
+                ).start()
+
+    async def start_grobid() -> None:
+        """Create the pool of GROBID instances in the event loop."""
+        settings = app_settings()
+        application.state.grobid = build_grobid(settings)
+        # Health checks only choose between instances
+        if len(settings.grobid_api_urls) > 1 and settings.grobid_health_interval > 0:
+            application.state.grobid.start(
+                application.state.clients.get("grobid", settings),
+                settings.grobid_health_interval,
+            )
+
+    async def stop_grobid() -> None:
+        """Stop health checks of the GROBID instances."""
+        await application.state.grobid.stop()
+
+    async def start_jobs() -> None:
+        """Start workers of the job queue."""
+        settings = app_settings()
+        application.state.jobs = JobQueue(
+            settings.job_queue_size, settings.job_workers, settings.job_max_results
+        )
+        await application.state.jobs.start()
+
+    async def stop_jobs() -> None:
+        """Stop workers of the job queue."""
+        await application.state.jobs.stop()
+
+    application.add_event_handler("startup", load_summariser)
+    application.add_event_handler("startup", start_grobid)
+    application.add_event_handler("startup", start_jobs)
+    application.add_event_handler("shutdown", stop_jobs)
+    application.add_event_handler("shutdown", stop_grobid)
+    application.add_event_handler("shutdown", shutdown_summarisers)
+    application.add_event_handler("shutdown", shutdown_executors)
+    application.add_event_handler("shutdown", application.state.clients.aclose)
+
     return application
 
 
@@ -0,0 +1,162 @@
+"""Applies the NLP techniques to an article, parsing each text only once.
+
+Sections are run through the spaCy model once. The full text is assembled from the
+section Docs, and the rank components are applied to the existing Docs rather than
+running the model again.
+
+Example::
+
+    analysis = Analysis(section_texts, models, abstract=abstract_text)
+    analysis.sentences
+    analysis.phrase_ranks
+    analysis.common_words(5)
+    Analysis.split_sentences(summary_text, models)
+
+"""
+from functools import cached_property
+
+from spacy.tokens.doc import Doc
+
+from app.nlp.models import ModelManager
+from app.nlp.summary import TextRank
+from app.nlp.techniques import Phrase, Word
+
+# Sentence boundaries only need the parser
+SENTENCE_DISABLE = ["attribute_ruler", "lemmatizer", "ner"]
+
+
+class Analysis:
+    """Parses the sections of an article once and derives each technique from them."""
+
+    models: ModelManager
+    section_docs: list[Doc]
+    abstract_doc: Doc | None
+    doc: Doc
+
+    def __init__(
+        self,
+        section_texts: list[str],
+        models: ModelManager,
+        abstract: str | None = None,
+        batch_size: int = 32,
+        n_process: int = 1,
+    ) -> None:
+        """Run spaCy model on the sections and abstract as a single batch.
+
+        Args:
+            section_texts: plain text of each section, empty sections are skipped
+            models: spaCy pipelines
+            abstract: plain text of the abstract, used for phrase ranking if given
+            batch_size: number of texts per batch
+            n_process: number of processes used by spaCy
+        """
+        texts = self.texts(section_texts, abstract)
+        docs = list(models.base.pipe(texts, batch_size, n_process))
+
+        self.__load(models, docs, abstract is not None)
+
+    def __load(self, models: ModelManager, docs: list[Doc], has_abstract: bool) -> None:
+        self.models = models
+        self.abstract_doc = docs.pop() if has_abstract else None
+        self.section_docs = docs
+        # NOTE: created before ranking, Doc extensions can't be merged
+        if docs:
+            self.doc = Doc.from_docs(docs)
+        else:
+            self.doc = models.base.model.make_doc("")
+
+    @staticmethod
+    def texts(section_texts: list[str], abstract: str | None = None) -> list[str]:
+        """Texts which are run through the spaCy model, in order.
+
+        Args:
+            section_texts: plain text of each section, empty sections are skipped
+            abstract: plain text of the abstract
+
+        Returns:
+            Non-empty section texts followed by the abstract
+        """
+        texts = [section_text for section_text in section_texts if section_text]
+        if abstract is not None:
+            texts.append(abstract)
+
+        return texts
+
+    @classmethod
+    def pipe(
+        cls,
+        articles: list[tuple[list[str], str | None]],
+        models: ModelManager,
+        batch_size: int = 32,
+        n_process: int = 1,
+    ) -> list["Analysis"]:
+        """Run spaCy model on the texts of many articles as a single batch.
+
+        Args:
+            articles: section texts and abstract of each article
+            models: spaCy pipelines
+            batch_size: number of texts per batch
+            n_process: number of processes used by spaCy
+
+        Returns:
+            List of Analysis objects in the same order as articles
+        """
+        article_texts = [cls.texts(*article) for article in articles]
+        docs = models.base.pipe(
+            (text for texts in article_texts for text in texts), batch_size, n_process
+        )
+
+        analyses: list[Analysis] = []
+        for (_, abstract), texts in zip(articles, article_texts):
+            analysis = cls.__new__(cls)
+            analysis.__load(models, [next(docs) for _ in texts], abstract is not None)
+            analyses.append(analysis)
+
+        return analyses
+
+    @cached_property
+    def sentences(self) -> list[str]:
+        """Two highest ranked sentences of each section, using TextRank."""
+        sentences: list[str] = []
+        for doc in self.section_docs:
+            sentences += TextRank.from_doc(self.models.textrank.rank(doc)).sentences
+
+        return sentences
+
+    @cached_property
+    def phrase_ranks(self) -> list[tuple[str, int]]:
+        """Phrases of the abstract, or full text, using PositionRank."""
+        doc = self.abstract_doc if self.abstract_doc is not None else self.doc
+
+        return Phrase.from_doc(self.models.positionrank.rank(doc)).ranks
+
+    def common_words(self, n: int) -> list[tuple[str, int]]:
+        """Nouns of the full text which occur at least n times.
+
+        Args:
+            n : threshold of occurances for word to be returned
+
+        Returns:
+            List of words including their frequency
+
+        Raises:
+            RuntimeError: if model doesn't contain lemmatizer pipeline
+        """
+        if not self.models.base.has_pipe("lemmatizer"):
+            raise RuntimeError("Language models requires lemmatizer pipeline")
+
+        return Word.from_doc(self.doc).words_threshold_n(n)
+
+    @staticmethod
+    def split_sentences(text: str, models: ModelManager) -> list[str]:
+        """Split text into sentences, only running the components needed.
+
+        Args:
+            text: text to be split
+            models: spaCy pipelines
+
+        Returns:
+            List of sentences
+        """
+        doc = models.base.select_pipes(disable=SENTENCE_DISABLE)(text)
+        return [sentence.text for sentence in doc.sents]
@@ -0,0 +1,199 @@
+"""Builds the spaCy pipelines used by the NLP techniques once.
+
+The rank components of pytextrank are created once and never added to the spaCy model,
+so each pipeline shares the same vocab and weights, and the model is never changed
+while handling requests. Pipelines are immutable, disabling components returns a new
+pipeline.
+
+Example::
+
+    models = ModelManager(en_core_web_sm.load())
+    doc = models.textrank("text to be ranked")
+    doc = models.positionrank.rank(models.base("text parsed once"))
+    sentences = models.base.select_pipes(enable=["parser"])("text to be split")
+
+"""
+from dataclasses import dataclass, replace
+from typing import Callable, Iterable, Iterator
+
+import pytextrank  # noqa: F401
+from spacy.language import Language
+from spacy.tokens.doc import Doc
+from spacy.tokens.span import Span
+from spacy.util import registry
+
+
+@registry.misc("prefix_scrubber")
+def prefix_scrubber():
+    """Scrub spans.
+
+    Ensures that it removes leading determinants, punctuation, stopwords and also
+    single word results.
+
+    Returns:
+        Scrubbed string
+    """
+
+    def scrubber_func(span: Span) -> str:
+
+        result = []
+
+        while span[0].pos_ == "DET":
+            span = span[1:]
+
+        for token in span:
+            if (
+                len(token.text) > 1
+                and not token.is_punct
+                and not token.is_stop
+                and (token.is_alpha or token.is_digit)
+            ):
+                result.append(token.text.lower())
+
+        if len(result) == 1:
+            return ""
+
+        return " ".join(result)
+
+    return scrubber_func
+
+
+RANK_PIPES = {
+    "textrank": {},
+    "positionrank": {"scrubber": {"@misc": "prefix_scrubber"}},
+}
+
+
+@dataclass(frozen=True)
+class Pipeline:
+    """spaCy model followed by rank components, with some components disabled.
+
+    Rank components added to the spaCy model itself are never run.
+    """
+
+    model: Language
+    components: tuple[tuple[str, Callable[[Doc], Doc]], ...] = ()
+    disabled: frozenset[str] = frozenset()
+
+    @property
+    def pipe_names(self) -> list[str]:
+        """Names of the enabled components in order."""
+        names = [name for name in self.model.pipe_names if name not in RANK_PIPES]
+        names += [name for name, _ in self.components]
+        return [name for name in names if name not in self.disabled]
+
+    @property
+    def model_disabled(self) -> list[str]:
+        """Names of the spaCy model components which aren't run."""
+        return [*self.disabled, *RANK_PIPES]
+
+    def has_pipe(self, name: str) -> bool:
+        """Check if component is enabled.
+
+        Args:
+            name: name of the component
+
+        Returns:
+            True if component is enabled
+        """
+        return name in self.pipe_names
+
+    def select_pipes(
+        self,
+        *,
+        enable: Iterable[str] | None = None,
+        disable: Iterable[str] | None = None,
+    ) -> "Pipeline":
+        """Create pipeline with only some components enabled.
+
+        Exactly one of enable or disable must be given.
+
+        Args:
+            enable: names of the components to keep enabled
+            disable: names of the components to disable
+
+        Returns:
+            Pipeline object
+
+        Raises:
+            ValueError: if both or neither of enable and disable are given
+        """
+        if (enable is None) == (disable is None):
+            raise ValueError("Either enable or disable components must be given")
+        if enable is not None:
+            disable = set(self.pipe_names) - set(enable)
+
+        return replace(self, disabled=self.disabled | frozenset(disable or ()))
+
+    def rank(self, doc: Doc) -> Doc:
+        """Apply rank components to a Doc which has already been parsed.
+
+        Args:
+            doc: Doc created by the spaCy model
+
+        Returns:
+            The same Doc, ranked in place
+        """
+        for name, component in self.components:
+            if name not in self.disabled:
+                doc = component(doc)
+
+        return doc
+
+    def __call__(self, text: str) -> Doc:
+        """Run pipeline on text.
+
+        Args:
+            text: text to be processed
+
+        Returns:
+            Doc object
+        """
+        return self.rank(self.model(text, disable=self.model_disabled))
+
+    def pipe(
+        self, texts: Iterable[str], batch_size: int = 32, n_process: int = 1
+    ) -> Iterator[Doc]:
+        """Run pipeline on many texts using batches.
+
+        Args:
+            texts: texts to be processed
+            batch_size: number of texts per batch
+            n_process: number of processes used by spaCy
+
+        Yields:
+            Doc objects in the same order as texts
+        """
+        for doc in self.model.pipe(
+            texts,
+            batch_size=batch_size,
+            n_process=n_process,
+            disable=self.model_disabled,
+        ):
+            yield self.rank(doc)
+
+
+class ModelManager:
+    """Pre-configured pipelines sharing one spaCy model."""
+
+    base: Pipeline
+    textrank: Pipeline
+    positionrank: Pipeline
+
+    def __init__(self, model: Language) -> None:
+        """Create the rank components and pipelines.
+
+        Args:
+            model: spaCy language model
+        """
+        rankers = {
+            name: model.create_pipe(name, config=config)
+            for name, config in RANK_PIPES.items()
+        }
+        self.base = Pipeline(model)
+        self.textrank = replace(
+            self.base, components=(("textrank", rankers["textrank"]),)
+        )
+        self.positionrank = replace(
+            self.base, components=(("positionrank", rankers["positionrank"]),)
+        )
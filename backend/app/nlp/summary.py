@@ -1,34 +1,53 @@
 """Represents the summarisation methods."""
+from functools import lru_cache
+
 import httpx
-from spacy.language import Language
 from spacy.tokens.doc import Doc
 from spacy.tokens.span import Span
 from transformers.models.bart.tokenization_bart import BartTokenizer
+from transformers.models.bart.tokenization_bart_fast import BartTokenizerFast
+from transformers.tokenization_utils_base import PreTrainedTokenizerBase
+
+from app.nlp.models import Pipeline
 
 
 class TextRank:
     """Rank sentences from text using Textrank."""
 
-    model: Language
+    model: Pipeline
     doc: Doc
 
-    def __init__(self, text: str, model: Language) -> None:
-        """Create Doc object using spaCy model with textrank pipeline.
+    def __init__(self, text: str, model: Pipeline) -> None:
+        """Create Doc object using spaCy pipeline with textrank component.
 
         Args:
-            model: spaCy Language model
+            model: spaCy pipeline with textrank component
             text: text to be ranked
 
         Raises:
-            RuntimeError: if text is empty string
+            RuntimeError: if text is empty string or pipeline doesn't contain textrank
         """
         if not text:
             raise RuntimeError("Text cannot be empty")
         if not model.has_pipe("textrank"):
-            model.add_pipe("textrank")
+            raise RuntimeError("Pipeline requires textrank component")
         self.model = model
         self.doc = model(text)
 
+    @classmethod
+    def from_doc(cls, doc: Doc) -> "TextRank":
+        """Use text which has already been run through a textrank pipeline.
+
+        Args:
+            doc: Doc ranked by the textrank pipeline
+
+        Returns:
+            TextRank object
+        """
+        text_rank = cls.__new__(cls)
+        text_rank.doc = doc
+        return text_rank
+
     @property
     def sentences(self) -> list[str]:
         """Ranked sentences in order."""
@@ -52,12 +71,14 @@ class Bart:
     MAX_TOKENS = 1024  # BART token limit
     MAX_LENGTH = 358  # int(MAX_TOKENS, 0.35)
     MIN_LENGTH = 256  # int(MAX_TOKENS, 0.25)
+    CHARS_PER_TOKEN = 4  # initial guess of the text needed for MAX_TOKENS
 
     api_token: str
     text: str
     timeout: int
     use_gpu: bool
     model_id: str
+    client: httpx.AsyncClient | None
 
     def __init__(
         self,
@@ -65,14 +86,18 @@ class Bart:
         text: str,
         timeout: int,
         use_gpu: bool = True,
+        client: httpx.AsyncClient | None = None,
+        fast_tokenizer: bool = True,
     ) -> None:
-        """Define variables and tokenize text.
+        """Define variables and truncate text to the token limit.
 
         Args:
             api_token: used for HuggingFace API authorization
             text: text to be summarised
             use_gpu: use GPU instead of CPU for inference
             model_id: ID of model according to HuggingFace
+            client: shared HTTP client, a new client is used if missing
+            fast_tokenizer: use the Rust tokenizer instead of the Python one
 
         Raises:
             RuntimeError: if API token or text is empty string
@@ -84,14 +109,51 @@ class Bart:
         self.api_token = api_token
         self.timeout = timeout
         self.use_gpu = use_gpu
-        tokenizer = BartTokenizer.from_pretrained(self.MODEL_ID)
+        self.client = client
+        tokenizer = get_tokenizer(fast_tokenizer)
         # The additional token will be newline
-        encoded_input = tokenizer(text, truncation=True, max_length=self.MAX_TOKENS - 1)
-        decoded_input = tokenizer.decode(
-            encoded_input["input_ids"], skip_special_tokens=True
-        )
+        max_tokens = self.MAX_TOKENS - 1 - tokenizer.num_special_tokens_to_add()
         # NOTE: according to Wil, this reduces hallucination
-        self.text = "\n" + decoded_input
+        self.text = "\n" + self.truncate(text, tokenizer, max_tokens)
+
+    @classmethod
+    def truncate(
+        cls, text: str, tokenizer: PreTrainedTokenizerBase, max_tokens: int
+    ) -> str:
+        """Truncate text to a number of tokens.
+
+        Only a prefix of the text is tokenized, doubling it until it contains more than
+        max_tokens tokens. Text which fits isn't decoded.
+
+        Args:
+            text: text to be truncated
+            tokenizer: BART tokenizer
+            max_tokens: maximum number of tokens, excluding special tokens
+
+        Returns:
+            Truncated text
+        """
+        budget = max_tokens * cls.CHARS_PER_TOKEN
+        while True:
+            prefix = text[:budget]
+            encoded = tokenizer(
+                prefix,
+                add_special_tokens=False,
+                return_offsets_mapping=tokenizer.is_fast,
+            )
+            if len(encoded["input_ids"]) > max_tokens:
+                break
+            if len(prefix) == len(text):
+                return text
+            budget *= 2
+
+        if tokenizer.is_fast:
+            _, end = encoded["offset_mapping"][max_tokens - 1]
+            return prefix[:end]
+
+        return tokenizer.decode(
+            encoded["input_ids"][:max_tokens], skip_special_tokens=True
+        )
 
     @property
     async def summary(self) -> str:
@@ -106,19 +168,24 @@ class Bart:
         """
         headers = {"Authorization": f"Bearer {self.api_token}"}
 
-        async with httpx.AsyncClient(timeout=self.timeout) as client:
-            response = await client.post(
-                url=self.API_URL,
-                headers=headers,
-                json={
-                    "inputs": self.text,
-                    "parameters": {
-                        "max_length": self.MAX_LENGTH,
-                        "min_length": self.MIN_LENGTH,
-                    },
-                    "options": {"use_gpu": self.use_gpu, "use_cache": False},
+        kwargs = dict(
+            url=self.API_URL,
+            headers=headers,
+            json={
+                "inputs": self.text,
+                "parameters": {
+                    "max_length": self.MAX_LENGTH,
+                    "min_length": self.MIN_LENGTH,
                 },
-            )
+                "options": {"use_gpu": self.use_gpu, "use_cache": False},
+            },
+            timeout=self.timeout,
+        )
+        if self.client is not None:
+            response = await self.client.post(**kwargs)
+        else:
+            async with httpx.AsyncClient() as client:
+                response = await client.post(**kwargs)
 
         response.raise_for_status()
 
@@ -128,3 +195,17 @@ class Bart:
             raise RuntimeError("BART response is empty")
 
         return r_json[0]["summary_text"]
+
+
+@lru_cache
+def get_tokenizer(fast: bool = True) -> PreTrainedTokenizerBase:
+    """Load BART tokenizer once, then from cache.
+
+    Args:
+        fast: use the Rust tokenizer instead of the Python one
+
+    Returns:
+        BART tokenizer
+    """
+    tokenizer_class = BartTokenizerFast if fast else BartTokenizer
+    return tokenizer_class.from_pretrained(Bart.MODEL_ID)
@@ -11,10 +11,9 @@ from functools import cached_property
 from math import ceil
 
 import pytextrank  # noqa: F401
-from spacy.language import Language
 from spacy.tokens.doc import Doc
-from spacy.tokens.span import Span
-from spacy.util import registry
+
+from app.nlp.models import Pipeline
 
 
 class Word:
@@ -23,11 +22,11 @@ class Word:
     __doc: Doc
     __accepted_pos_tags = {"NOUN", "PROPN"}
 
-    def __init__(self, text: str, model: Language):
+    def __init__(self, text: str, model: Pipeline):
         """Run English spacy model on text chunk.
 
         Args:
-            model : spaCy language model
+            model : spaCy pipeline
             text : chunk of text from scholarly article
 
         Raises:
@@ -39,6 +38,20 @@ class Word:
 
         self.__doc = model(text)
 
+    @classmethod
+    def from_doc(cls, doc: Doc) -> "Word":
+        """Use text which has already been run through a spaCy model.
+
+        Args:
+            doc : Doc created by a model with lemmatizer pipeline
+
+        Returns:
+            Word object
+        """
+        word = cls.__new__(cls)
+        word.__doc = doc
+        return word
+
     @cached_property
     def noun_freq(self) -> dict[str, int]:
         """Calculate the frequencies of noun lemmas in a given document.
@@ -81,23 +94,47 @@ class Phrase:
 
     __doc: Doc
 
-    def __init__(self, text: str, model: Language):
+    def __init__(self, text: str, model: Pipeline):
         """Run English spacy model on text chunk.
 
         Args:
-            model : spaCy language model
+            model : spaCy pipeline with positionrank component
             text : chunk of text from scholarly article
 
-        """
-        if model.has_pipe("positionrank"):
-            model.remove_pipe("positionrank")
+        Raises:
+            RunTimeError: if pipeline doesn't contain positionrank
 
-        model.add_pipe(
-            "positionrank",
-            config={"scrubber": {"@misc": "prefix_scrubber"}},
-        )
+        """
+        self.check_pipe(model)
         self.__doc = model(text)
 
+    @classmethod
+    def from_doc(cls, doc: Doc) -> "Phrase":
+        """Use text which has already been run through a positionrank pipeline.
+
+        Args:
+            doc : Doc ranked by the positionrank pipeline
+
+        Returns:
+            Phrase object
+        """
+        phrase = cls.__new__(cls)
+        phrase.__doc = doc
+        return phrase
+
+    @staticmethod
+    def check_pipe(model: Pipeline) -> None:
+        """Check pipeline contains positionrank component.
+
+        Args:
+            model : spaCy pipeline
+
+        Raises:
+            RunTimeError: if pipeline doesn't contain positionrank
+        """
+        if not model.has_pipe("positionrank"):
+            raise RuntimeError("Pipeline requires positionrank component")
+
     @cached_property
     def ranks(self) -> list[tuple[str, int]]:
         """Return sorted dictionary with phrases and their normalised rank.
@@ -130,37 +167,3 @@ class Phrase:
                 phrases[phrase.text] = phrase.count
 
         return dict(sorted(phrases.items(), key=lambda item: item[1], reverse=True))
-
-    @registry.misc("prefix_scrubber")
-    def prefix_scrubber():
-        """Scrub spans.
-
-        Ensures that it removes leading determinants, punctuation, stopwords and also
-        single word results.
-
-        Returns:
-            Scrubbed string
-        """
-
-        def scrubber_func(span: Span) -> str:
-
-            result = []
-
-            while span[0].pos_ == "DET":
-                span = span[1:]
-
-            for token in span:
-                if (
-                    len(token.text) > 1
-                    and not token.is_punct
-                    and not token.is_stop
-                    and (token.is_alpha or token.is_digit)
-                ):
-                    result.append(token.text.lower())
-
-            if len(result) == 1:
-                return ""
-
-            return " ".join(result)
-
-        return scrubber_func
@@ -0,0 +1,241 @@
+"""Contains the blocking stages of the PDF processing pipeline.
+
+Stages only take and return picklable objects, so they can be run by the thread or
+process pools in `app.executor`.
+
+Example::
+
+    contents, uid = read_pdf(upload)
+    article = parse_article(grobid_response.content)
+    result = analyse([section.to_str() for section in article.sections])
+
+"""
+import io
+import zipfile
+from dataclasses import dataclass, field
+from functools import lru_cache
+
+import en_core_web_sm
+from spacy.language import Language
+
+from app.document import PDF
+from app.extraction import ArticleExtractor
+from app.grobid.models import Article
+from app.grobid.stream import StreamingTEI
+from app.grobid.tei import TEI
+from app.nlp.analysis import Analysis
+from app.nlp.models import ModelManager
+
+PARSERS: dict[str, type[TEI] | type[StreamingTEI]] = {
+    "soup": TEI,
+    "lxml": StreamingTEI,
+}
+
+
+@lru_cache
+def get_model() -> Language:
+    """Load the spaCy model once per process."""
+    return en_core_web_sm.load()
+
+
+@lru_cache
+def get_models() -> ModelManager:
+    """Build the spaCy pipelines once per process."""
+    return ModelManager(get_model())
+
+
+@dataclass
+class NLPResult:
+    """Represents the output of the NLP stage."""
+
+    common_words: list[tuple[str, int]] = field(default_factory=list)
+    phrase_ranks: list[tuple[str, int]] = field(default_factory=list)
+    sentences: list[str] = field(default_factory=list)
+
+    @classmethod
+    def from_analysis(cls, analysis: Analysis) -> "NLPResult":
+        """Rank sentences, phrases and words of an analysed article.
+
+        Args:
+            analysis: Analysis object of the article
+
+        Returns:
+            NLPResult object
+        """
+        result = cls(
+            phrase_ranks=analysis.phrase_ranks,
+            sentences=analysis.sentences,
+        )
+        try:
+            result.common_words = analysis.common_words(5)
+        except RuntimeError:
+            pass
+
+        return result
+
+
+def read_pdf(
+    upload: bytes, garbage: int = 0, deflate: bool = False, uid_pages: int = 2
+) -> tuple[bytes, str | None]:
+    """Open and repair PDF.
+
+    Args:
+        upload: PDF file as bytes
+        garbage: garbage collection level of repaired PDFs
+        deflate: whether to compress the streams of repaired PDFs
+        uid_pages: number of pages searched for the document UID
+
+    Returns:
+        Repaired PDF bytes, or the upload itself if it didn't need repairs, and the
+        document UID
+
+    Raises:
+        RuntimeError: if PDF cannot be read
+    """
+    with PDF(upload, garbage, deflate, uid_pages) as pdf:
+        return pdf.bytes_, pdf.uid
+
+
+def read_zip(upload: bytes) -> list[tuple[bytes, str]]:
+    """Read the PDFs of a zip archive.
+
+    Args:
+        upload: zip file as bytes
+
+    Returns:
+        Bytes and name of each PDF in the archive
+
+    Raises:
+        RuntimeError: if zip file cannot be read
+    """
+    try:
+        with zipfile.ZipFile(io.BytesIO(upload)) as archive:
+            return [
+                (archive.read(info), info.filename)
+                for info in archive.infolist()
+                if not info.is_dir() and info.filename.lower().endswith(".pdf")
+            ]
+    except (zipfile.BadZipFile, zipfile.LargeZipFile) as exc:
+        raise RuntimeError(f"Zip file could not be read: {exc}")
+
+
+def parse_article(content: bytes, parser: str = "soup", strict: bool = True) -> Article:
+    """Parse GROBID TEI XML into Article object.
+
+    Args:
+        content: TEI XML bytes
+        parser: name of the parser backend, see PARSERS
+        strict: fail if any fields are missing, i.e. the body of header only TEI
+
+    Returns:
+        Article object
+
+    Raises:
+        GrobidParserError: Article could not be parsed
+    """
+    # Keywords only need noun chunks and textrank
+    model = get_models().textrank.select_pipes(disable=["ner"])
+    return PARSERS[parser](content, model).parse(strict)
+
+
+def extract_article(upload: bytes, uid_pages: int = 2) -> Article:
+    """Extract Article object from the text of the PDF, without GROBID.
+
+    Args:
+        upload: PDF file as bytes
+        uid_pages: number of pages searched for the document UID
+
+    Returns:
+        Best-effort Article object
+
+    Raises:
+        RuntimeError: if PDF cannot be read
+    """
+    with PDF(upload, uid_pages=uid_pages) as pdf:
+        return ArticleExtractor(pdf).article()
+
+
+def analyse(
+    section_texts: list[str],
+    abstract: str | None = None,
+    batch_size: int = 32,
+    n_process: int = 1,
+) -> NLPResult:
+    """Rank sentences, phrases and words of an article.
+
+    Each text is run through the spaCy model once, using batches.
+
+    Args:
+        section_texts: plain text of each section
+        abstract: plain text of the abstract, used for phrase ranking if given
+        batch_size: number of texts per spaCy batch
+        n_process: number of processes used by spaCy
+
+    Returns:
+        NLPResult object
+    """
+    analysis = Analysis(
+        section_texts,
+        get_models(),
+        abstract=abstract,
+        batch_size=batch_size,
+        n_process=n_process,
+    )
+    return NLPResult.from_analysis(analysis)
+
+
+def parse_and_analyse(
+    content: bytes, parser: str = "soup"
+) -> tuple[Article, NLPResult]:
+    """Parse GROBID TEI XML and rank sentences, phrases and words of the article.
+
+    Args:
+        content: TEI XML bytes
+        parser: name of the parser backend, see PARSERS
+
+    Returns:
+        Article object and its NLPResult object
+
+    Raises:
+        GrobidParserError: Article could not be parsed
+    """
+    article = parse_article(content, parser)
+    result = analyse(
+        [section.to_str() for section in article.sections],
+        article.abstract.to_str() if article.abstract else None,
+    )
+    return article, result
+
+
+def analyse_many(
+    articles: list[tuple[list[str], str | None]],
+    batch_size: int = 32,
+    n_process: int = 1,
+) -> list[NLPResult]:
+    """Rank sentences, phrases and words of many articles.
+
+    Texts of every article are run through the spaCy model as a single stream of
+    batches.
+
+    Args:
+        articles: section texts and abstract of each article
+        batch_size: number of texts per spaCy batch
+        n_process: number of processes used by spaCy
+
+    Returns:
+        NLPResult object of each article, in the same order as articles
+    """
+    analyses = Analysis.pipe(articles, get_models(), batch_size, n_process)
+    return [NLPResult.from_analysis(analysis) for analysis in analyses]
+
+
+def split_sentences(text: str) -> list[str]:
+    """Split text into sentences.
+
+    Args:
+        text: text to be split
+
+    Returns:
+        List of sentences
+    """
+    return Analysis.split_sentences(text, get_models())
@@ -0,0 +1,732 @@
+"""Runs the stages of the PDF processing pipeline for an upload.
+
+Results are yielded as events as soon as each stage finishes, so routes can respond
+with the full result, stream it, or store it as the partial result of a job.
+
+Example::
+
+    processor = Processor(settings, cache, executor, grobid, grobid_client, summariser)
+    async for event, data in processor.process(upload, "paper.pdf"):
+        print(event.value, data)
+
+"""
+import asyncio
+from enum import Enum
+from typing import Any, AsyncIterator
+
+import httpx
+from fastapi import status
+from fastapi.param_functions import Depends
+
+from app.archive import ArchivedTEI, TEIArchive, get_archive
+from app.cache import ResultCache, Stage, cache_key, get_cache
+from app.clients import get_grobid_client
+from app.config import Settings, get_settings
+from app.executor import Executor, get_executor
+from app.grobid.client import Endpoint, GrobidClientError
+from app.grobid.models import Article, to_dict
+from app.grobid.models.form import File, Form
+from app.grobid.service import GrobidPool, get_grobid
+from app.grobid.tei import GrobidParserError
+from app.pipeline import (
+    NLPResult,
+    analyse,
+    analyse_many,
+    extract_article,
+    parse_article,
+    read_pdf,
+    split_sentences,
+)
+from app.summariser import Summariser, get_summariser
+
+
+class Event(str, Enum):
+    """Represents the results yielded by the processor, in order."""
+
+    article = "article"
+    common_words = "common_words"
+    phrase_ranks = "phrase_ranks"
+    sentences = "sentences"
+    summary = "summary"
+
+
+class Engine(str, Enum):
+    """Represents how the PDF is parsed into an article."""
+
+    grobid = "grobid"
+    # Best-effort, from the PDF text
+    local = "local"
+
+
+# Fields of the /upload response
+RESPONSE_EVENTS = (Event.article, Event.common_words, Event.phrase_ranks, Event.summary)
+
+
+class ProcessingError(Exception):
+    """Stage of the pipeline failed, maps to a HTTP error response."""
+
+    status_code: int
+    detail: str
+
+    def __init__(self, status_code: int, detail: str) -> None:
+        """Define status code and detail of the response.
+
+        Args:
+            status_code: HTTP status code
+            detail: reason the stage failed
+        """
+        super().__init__(detail)
+        self.status_code = status_code
+        self.detail = detail
+
+
+class Processor:
+    """Runs the pipeline stages using the app lifetime resources."""
+
+    settings: Settings
+    cache: ResultCache
+    executor: Executor
+    grobid: GrobidPool
+    grobid_client: httpx.AsyncClient | None
+    summariser: Summariser
+    archive: TEIArchive | None
+
+    def __init__(
+        self,
+        settings: Settings,
+        cache: ResultCache,
+        executor: Executor,
+        grobid: GrobidPool,
+        grobid_client: httpx.AsyncClient | None,
+        summariser: Summariser,
+        archive: TEIArchive | None = None,
+    ) -> None:
+        """Define variables.
+
+        Args:
+            settings: app settings
+            cache: pipeline result cache
+            executor: thread and process pools
+            grobid: limits, retries and load balances requests to GROBID
+            grobid_client: shared HTTP client for GROBID
+            summariser: summarisation backend
+            archive: permanent store of the TEI produced by GROBID, if enabled
+        """
+        self.settings = settings
+        self.cache = cache
+        self.executor = executor
+        self.grobid = grobid
+        self.grobid_client = grobid_client
+        self.summariser = summariser
+        self.archive = archive
+
+    async def read(self, upload: bytes) -> tuple[bytes, str | None]:
+        """Use PyMuPDF to open and fix the PDF.
+
+        Args:
+            upload: uploaded PDF bytes
+
+        Returns:
+            PDF bytes sent to GROBID and the document UID
+
+        Raises:
+            ProcessingError: PDF can't be read
+        """
+        try:
+            return await self.executor.run_thread(
+                read_pdf,
+                upload,
+                self.settings.pdf_garbage,
+                self.settings.pdf_deflate,
+                self.settings.pdf_uid_pages,
+            )
+        except RuntimeError as exc:
+            raise ProcessingError(status.HTTP_415_UNSUPPORTED_MEDIA_TYPE, str(exc))
+
+    async def article(
+        self,
+        key: str,
+        contents: bytes,
+        filename: str | None,
+        engine: Engine = Engine.grobid,
+    ) -> Article:
+        """Parse PDF into Article object using GROBID, or the local extractor.
+
+        Args:
+            key: cache key of the PDF
+            contents: PDF bytes
+            filename: name of the uploaded file
+            engine: parses the PDF
+
+        Returns:
+            Article object
+
+        Raises:
+            ProcessingError: GROBID is unavailable or its response can't be parsed
+        """
+        if (article := self.cache.get(Stage.article, key)) is not None:
+            return article
+
+        if engine is Engine.local:
+            try:
+                article = await self.executor.run_thread(
+                    extract_article, contents, self.settings.pdf_uid_pages
+                )
+            except RuntimeError as exc:
+                raise ProcessingError(status.HTTP_415_UNSUPPORTED_MEDIA_TYPE, str(exc))
+            self.cache.put(Stage.article, key, article)
+            return article
+
+        article = None
+        tei_content = self.cache.get(Stage.tei, key) or await self.archived_tei(key)
+        if tei_content is not None:
+            try:
+                article = await self.executor.run_thread(
+                    parse_article, tei_content, self.settings.tei_parser
+                )
+            except GrobidParserError as exc:
+                # Request TEI from GROBID again, in case it was fixed
+                await self.set_parse_error(key, str(exc))
+
+        if article is None:
+            tei_content = await self.grobid_tei(key, contents, filename)
+            try:
+                article = await self.executor.run_thread(
+                    parse_article, tei_content, self.settings.tei_parser
+                )
+            except GrobidParserError as exc:
+                await self.set_parse_error(key, str(exc))
+                raise ProcessingError(status.HTTP_400_BAD_REQUEST, str(exc))
+
+        # Only cache TEI which can be parsed
+        self.cache.put(Stage.tei, key, tei_content)
+        self.cache.put(Stage.article, key, article)
+
+        return article
+
+    async def tei(self, key: str, contents: bytes, filename: str | None) -> bytes:
+        """Get TEI of the PDF from the cache, the archive or GROBID.
+
+        Archived TEI which couldn't be parsed is requested from GROBID again.
+
+        Args:
+            key: cache key of the PDF
+            contents: PDF bytes
+            filename: name of the uploaded file
+
+        Returns:
+            TEI XML bytes
+
+        Raises:
+            ProcessingError: GROBID is unavailable
+        """
+        if (tei_content := self.cache.get(Stage.tei, key)) is not None:
+            return tei_content
+        if (tei_content := await self.archived_tei(key)) is not None:
+            return tei_content
+        return await self.grobid_tei(key, contents, filename)
+
+    async def archived_tei(self, key: str) -> bytes | None:
+        """Get archived TEI of the PDF, unless it couldn't be parsed.
+
+        Args:
+            key: cache key of the PDF
+
+        Returns:
+            TEI XML bytes or None if it isn't archived
+        """
+        if self.archive is None:
+            return None
+
+        archived = await self.executor.run_thread(self.archive.get, key)
+        if archived is None or archived.parse_error is not None:
+            return None
+        return archived.content
+
+    async def grobid_tei(
+        self, key: str, contents: bytes, filename: str | None
+    ) -> bytes:
+        """Request TEI of the PDF from GROBID, replacing the archived TEI.
+
+        TEI is archived, even if it can't be parsed, so it can be parsed again once
+        the parser is fixed.
+
+        Args:
+            key: cache key of the PDF
+            contents: PDF bytes
+            filename: name of the uploaded file
+
+        Returns:
+            TEI XML bytes
+
+        Raises:
+            ProcessingError: GROBID is unavailable
+        """
+        form = Form(
+            file=File(
+                payload=contents,
+                file_name=filename or "",
+                mime_type="application/pdf",
+            )
+        )
+
+        try:
+            response = await self.grobid.request(form, self.grobid_client)
+        except GrobidClientError as exc:
+            raise ProcessingError(status.HTTP_503_SERVICE_UNAVAILABLE, str(exc))
+
+        if self.archive is not None:
+            archived = ArchivedTEI(
+                key,
+                response.content,
+                await self.grobid.version(self.grobid_client),
+                form.options(),
+                filename,
+            )
+            await self.executor.run_thread(self.archive.put, archived)
+
+        return response.content
+
+    async def reparse(self, key: str) -> Article:
+        """Parse archived TEI again, replacing the cached article.
+
+        The cached response is removed, so its NLP stages are run again on the next
+        upload of the PDF. TEI is parsed by the process pool, if there is one.
+
+        Args:
+            key: cache key of the PDF
+
+        Returns:
+            Article object
+
+        Raises:
+            ProcessingError: TEI isn't archived or can't be parsed
+        """
+        archived = None
+        if self.archive is not None:
+            archived = await self.executor.run_thread(self.archive.get, key)
+        if archived is None:
+            raise ProcessingError(status.HTTP_404_NOT_FOUND, "TEI isn't archived")
+
+        try:
+            article = await self.executor.run_process(
+                parse_article, archived.content, self.settings.tei_parser
+            )
+        except GrobidParserError as exc:
+            await self.set_parse_error(key, str(exc))
+            raise ProcessingError(status.HTTP_400_BAD_REQUEST, str(exc))
+
+        await self.set_parse_error(key, None)
+        self.cache.put(Stage.tei, key, archived.content)
+        self.cache.put(Stage.article, key, article)
+        self.cache.delete(Stage.response, key)
+        return article
+
+    async def set_parse_error(self, key: str, parse_error: str | None) -> None:
+        """Record whether the archived TEI of the PDF can be parsed, if it's archived.
+
+        Args:
+            key: cache key of the PDF
+            parse_error: error of the parser, or None if the TEI was parsed
+        """
+        if self.archive is not None:
+            await self.executor.run_thread(
+                self.archive.set_parse_error, key, parse_error
+            )
+
+    async def preview(
+        self, upload: bytes, filename: str | None = None
+    ) -> dict[str, Any]:
+        """Parse the metadata of the PDF using GROBID's header service.
+
+        Faster than the full text, as GROBID only processes the first pages. The full
+        article is used if it's already cached.
+
+        Args:
+            upload: uploaded PDF bytes
+            filename: name of the uploaded file
+
+        Returns:
+            Bibliography, keywords and abstract of the article
+
+        Raises:
+            ProcessingError: PDF can't be read, GROBID is unavailable or its response
+                can't be parsed
+        """
+        contents, uid = await self.read(upload)
+        key = cache_key(uid, upload)
+
+        article = self.cache.get(Stage.article, key) or self.cache.get(
+            Stage.header, key
+        )
+        if article is None:
+            form = Form(
+                file=File(
+                    payload=contents,
+                    file_name=filename or "",
+                    mime_type="application/pdf",
+                )
+            )
+            try:
+                response = await self.grobid.request(
+                    form, self.grobid_client, Endpoint.header
+                )
+            except GrobidClientError as exc:
+                raise ProcessingError(status.HTTP_503_SERVICE_UNAVAILABLE, str(exc))
+
+            try:
+                article = await self.executor.run_thread(
+                    parse_article, response.content, self.settings.tei_parser, False
+                )
+            except GrobidParserError as exc:
+                raise ProcessingError(status.HTTP_400_BAD_REQUEST, str(exc))
+            self.cache.put(Stage.header, key, article)
+
+        return dict(
+            bibliography=to_dict(article.bibliography),
+            keywords=article.keywords,
+            abstract=to_dict(article.abstract) if article.abstract else None,
+        )
+
+    async def analyse(self, article: Article) -> NLPResult:
+        """Rank sentences, phrases and words of the article.
+
+        Args:
+            article: Article object
+
+        Returns:
+            NLPResult object
+        """
+        section_texts = [section.to_str() for section in article.sections]
+        abstract_text = article.abstract.to_str() if article.abstract else None
+        return await self.executor.run_process(
+            analyse,
+            section_texts,
+            abstract_text,
+            self.settings.spacy_batch_size,
+            self.settings.spacy_n_process,
+        )
+
+    async def summarise(self, sentences: list[str]) -> tuple[list[str], bool]:
+        """Summarise ranked sentences.
+
+        Args:
+            sentences: ranked sentences of the article
+
+        Returns:
+            Summary sentences, the ranked sentences if it can't be summarised, and
+            whether the summary can be cached
+        """
+        try:
+            summary_text = await self.summariser.summarise(" ".join(sentences))
+            return await self.executor.run_process(split_sentences, summary_text), True
+        except httpx.HTTPStatusError:
+            # Transient, the next request may get a summary
+            return sentences, False
+        except RuntimeError:
+            return sentences, True
+
+    async def process(
+        self,
+        upload: bytes,
+        filename: str | None = None,
+        engine: Engine = Engine.grobid,
+    ) -> AsyncIterator[tuple[Event, Any]]:
+        """Run every stage of the pipeline.
+
+        Results of each stage are cached using the DOI of the PDF, or its hash.
+        Blocking stages are run by the executor. If `GROBID_FALLBACK` is set, the
+        local extractor is used when GROBID is unavailable.
+
+        Args:
+            upload: uploaded PDF bytes
+            filename: name of the uploaded file
+            engine: parses the PDF
+
+        Yields:
+            Event and its serializable result, as each stage finishes
+
+        Raises:
+            ProcessingError: stage of the pipeline failed
+        """
+        contents, uid = await self.read(upload)
+
+        # NOTE: repaired bytes aren't deterministic, so hash the uploaded bytes
+        key = cache_key(uid, upload)
+        # Local results are cached separately, so they don't replace GROBID results
+        if engine is Engine.local:
+            key = f"{engine.value}:{key}"
+        cached_response = self.cache.get(Stage.response, key)
+        # Responses cached without the sentences are stale
+        if cached_response is not None and Event.sentences.value in cached_response:
+            for event in Event:
+                yield event, cached_response[event.value]
+            return
+
+        try:
+            article = await self.article(key, contents, filename, engine)
+        except ProcessingError as exc:
+            if not (
+                engine is Engine.grobid
+                and exc.status_code == status.HTTP_503_SERVICE_UNAVAILABLE
+                and self.settings.grobid_fallback
+            ):
+                raise
+            key = f"{Engine.local.value}:{key}"
+            article = await self.article(key, contents, filename, Engine.local)
+
+        try:
+            article_dict = await self.executor.run_thread(to_dict, article)
+        except TypeError:
+            raise ProcessingError(
+                status.HTTP_500_INTERNAL_SERVER_ERROR,
+                "Couldn't serialise Article object",
+            )
+        yield Event.article, article_dict
+
+        result = await self.analyse(article)
+        yield Event.common_words, result.common_words
+        yield Event.phrase_ranks, result.phrase_ranks
+        yield Event.sentences, result.sentences
+
+        summary, cacheable = await self.summarise(result.sentences)
+        yield Event.summary, summary
+
+        if cacheable:
+            self.cache.put(
+                Stage.response,
+                key,
+                dict(
+                    article=article_dict,
+                    common_words=result.common_words,
+                    phrase_ranks=result.phrase_ranks,
+                    sentences=result.sentences,
+                    summary=summary,
+                ),
+            )
+
+    async def response(
+        self,
+        upload: bytes,
+        filename: str | None = None,
+        engine: Engine = Engine.grobid,
+    ) -> dict[str, Any]:
+        """Run every stage of the pipeline and collect the /upload response.
+
+        Args:
+            upload: uploaded PDF bytes
+            filename: name of the uploaded file
+            engine: parses the PDF
+
+        Returns:
+            Response with the article, common words, phrase ranks and summary
+
+        Raises:
+            ProcessingError: stage of the pipeline failed
+        """
+        response_dict: dict[str, Any] = {}
+        async for event, data in self.process(upload, filename, engine):
+            if event in RESPONSE_EVENTS:
+                response_dict[event.value] = data
+
+        return response_dict
+
+
+class AnalysisBatcher:
+    """Runs the NLP stage of many articles as a single spaCy batch.
+
+    Articles which are waiting while a batch is running are analysed together in the
+    next batch.
+    """
+
+    executor: Executor
+    batch_size: int
+    n_process: int
+    max_articles: int
+    __pending: list[tuple[Article, "asyncio.Future[NLPResult]"]]
+    __task: "asyncio.Task[None] | None" = None
+
+    def __init__(
+        self,
+        executor: Executor,
+        batch_size: int = 32,
+        n_process: int = 1,
+        max_articles: int = 16,
+    ) -> None:
+        """Define variables.
+
+        Args:
+            executor: thread and process pools
+            batch_size: number of texts per spaCy batch
+            n_process: number of processes used by spaCy
+            max_articles: maximum number of articles per batch
+        """
+        self.executor = executor
+        self.batch_size = batch_size
+        self.n_process = n_process
+        self.max_articles = max_articles
+        self.__pending = []
+
+    async def analyse(self, article: Article) -> NLPResult:
+        """Add article to the next batch.
+
+        Args:
+            article: Article object
+
+        Returns:
+            NLPResult object
+        """
+        future = asyncio.get_running_loop().create_future()
+        self.__pending.append((article, future))
+        if self.__task is None or self.__task.done():
+            self.__task = asyncio.create_task(self.__run())
+
+        return await future
+
+    async def __run(self) -> None:
+        while self.__pending:
+            batch = self.__pending[: self.max_articles]
+            self.__pending = self.__pending[self.max_articles :]
+
+            articles = [
+                (
+                    [section.to_str() for section in article.sections],
+                    article.abstract.to_str() if article.abstract else None,
+                )
+                for article, _ in batch
+            ]
+            try:
+                results = await self.executor.run_process(
+                    analyse_many, articles, self.batch_size, self.n_process
+                )
+            except Exception as exc:  # noqa: B902
+                # Forwarded to each article of the batch
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(exc)
+            else:
+                for (_, future), result in zip(batch, results):
+                    if not future.done():
+                        future.set_result(result)
+
+
+class BatchProcessor(Processor):
+    """Processes many uploads concurrently, sharing the NLP stage between them."""
+
+    __semaphore: asyncio.Semaphore
+    __batcher: AnalysisBatcher
+
+    def __init__(self, processor: Processor, concurrency: int) -> None:
+        """Use the resources of a processor.
+
+        Args:
+            processor: processor of a single upload
+            concurrency: maximum number of uploads sent to GROBID at once
+        """
+        super().__init__(
+            processor.settings,
+            processor.cache,
+            processor.executor,
+            processor.grobid,
+            processor.grobid_client,
+            processor.summariser,
+            processor.archive,
+        )
+        self.__semaphore = asyncio.Semaphore(concurrency)
+        self.__batcher = AnalysisBatcher(
+            self.executor, self.settings.spacy_batch_size, self.settings.spacy_n_process
+        )
+
+    async def article(
+        self,
+        key: str,
+        contents: bytes,
+        filename: str | None,
+        engine: Engine = Engine.grobid,
+    ) -> Article:
+        """Limit concurrent GROBID requests of the batch."""
+        async with self.__semaphore:
+            return await super().article(key, contents, filename, engine)
+
+    async def analyse(self, article: Article) -> NLPResult:  # noqa: D102
+        return await self.__batcher.analyse(article)
+
+    async def __result(
+        self, upload: bytes, filename: str | None, engine: Engine
+    ) -> dict[str, Any]:
+        try:
+            response = await self.response(upload, filename, engine)
+        except ProcessingError as exc:
+            return dict(
+                filename=filename, status_code=exc.status_code, detail=exc.detail
+            )
+
+        return dict(filename=filename, status_code=status.HTTP_200_OK, **response)
+
+    async def batch(
+        self, uploads: list[tuple[bytes, str | None]], engine: Engine = Engine.grobid
+    ) -> AsyncIterator[dict[str, Any]]:
+        """Run every stage of the pipeline for each upload.
+
+        Args:
+            uploads: uploaded PDF bytes and name of each file
+            engine: parses the PDFs
+
+        Yields:
+            Response of each upload as soon as it finishes, including the filename and
+            status code
+        """
+        tasks = [
+            asyncio.create_task(self.__result(upload, filename, engine))
+            for upload, filename in uploads
+        ]
+        try:
+            for task in asyncio.as_completed(tasks):
+                yield await task
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    async def __reparse_result(self, key: str) -> dict[str, Any]:
+        async with self.__semaphore:
+            try:
+                article = await self.reparse(key)
+            except ProcessingError as exc:
+                return dict(key=key, status_code=exc.status_code, detail=exc.detail)
+
+        return dict(
+            key=key, status_code=status.HTTP_200_OK, title=article.bibliography.title
+        )
+
+    async def reparse_many(self, keys: list[str]) -> AsyncIterator[dict[str, Any]]:
+        """Parse archived TEI of many PDFs again.
+
+        Args:
+            keys: cache keys of the PDFs
+
+        Yields:
+            Title of each article as soon as it's parsed, including the key and status
+            code
+        """
+        tasks = [asyncio.create_task(self.__reparse_result(key)) for key in keys]
+        try:
+            for task in asyncio.as_completed(tasks):
+                yield await task
+        finally:
+            for task in tasks:
+                task.cancel()
+
+
+def get_processor(
+    settings: Settings = Depends(get_settings),
+    cache: ResultCache = Depends(get_cache),
+    executor: Executor = Depends(get_executor),
+    grobid: GrobidPool = Depends(get_grobid),
+    grobid_client: httpx.AsyncClient = Depends(get_grobid_client),
+    summariser: Summariser = Depends(get_summariser),
+    archive: TEIArchive | None = Depends(get_archive),
+) -> Processor:
+    """Get the processor using the app lifetime resources."""
+    return Processor(
+        settings, cache, executor, grobid, grobid_client, summariser, archive
+    )
@@ -0,0 +1,167 @@
+"""Parses archived TEI again with the current TEI parser and NLP stages.
+
+TEI is parsed and analysed by a pool of processes, without GROBID. Results are written
+as JSON lines, and the articles can replace those of an SQLite result cache.
+
+Example::
+
+    $ python -m app.reparse tei.sqlite3 --output articles.jsonl --workers 4
+
+"""
+import argparse
+import multiprocessing
+import os
+import sys
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from typing import IO, Iterable, Iterator
+
+from pydantic import ValidationError
+
+from app.archive import TEIArchive
+from app.cache import ResultCache, SQLiteCache, Stage
+from app.config import get_settings
+from app.grobid.models import Article, dumps
+from app.grobid.tei import GrobidParserError
+from app.pipeline import NLPResult, get_models, parse_and_analyse
+
+
+def reparse(
+    archive: TEIArchive, keys: Iterable[str], parser: str = "soup", workers: int = 1
+) -> Iterator[tuple[str, tuple[Article, NLPResult] | GrobidParserError]]:
+    """Parse and analyse archived TEI in parallel.
+
+    Only a couple of TEI per worker are read from the archive at once.
+
+    Args:
+        archive: archive of the TEI
+        keys: cache keys of the PDFs
+        parser: name of the parser backend
+        workers: number of processes. Zero runs in the current process instead.
+
+    Yields:
+        Key and result of each PDF as soon as it's finished, or the parser error
+    """
+    if workers == 0:
+        for key in keys:
+            if (archived := archive.get(key)) is not None:
+                try:
+                    yield key, parse_and_analyse(archived.content, parser)
+                except GrobidParserError as exc:
+                    yield key, exc
+        return
+
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        # Forking a process with a loaded model isn't safe
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=get_models,
+    ) as pool:
+        pending: dict[Future, str] = {}
+        for key in keys:
+            if (archived := archive.get(key)) is not None:
+                pending[pool.submit(parse_and_analyse, archived.content, parser)] = key
+            while len(pending) >= 2 * workers:
+                yield from _finished(pending)
+        while pending:
+            yield from _finished(pending)
+
+
+def _finished(
+    pending: dict[Future, str]
+) -> Iterator[tuple[str, tuple[Article, NLPResult] | GrobidParserError]]:
+    done, _ = wait(pending, return_when=FIRST_COMPLETED)
+    for future in done:
+        key = pending.pop(future)
+        try:
+            yield key, future.result()
+        except GrobidParserError as exc:
+            yield key, exc
+
+
+def main(argv: list[str] | None = None, output: IO[str] = sys.stdout) -> int:
+    """Run the command line interface.
+
+    Args:
+        argv: command line arguments, by default those of the process
+        output: stream of the JSON lines, if the output argument is missing
+
+    Returns:
+        Exit code, 1 if any TEI couldn't be parsed
+    """
+    parser = argparse.ArgumentParser(
+        prog="python -m app.reparse", description=__doc__.splitlines()[0]
+    )
+    parser.add_argument("archive", help="path to the TEI archive database")
+    parser.add_argument("keys", nargs="*", help="keys of the PDFs, by default all")
+    parser.add_argument("--grobid-version", help="only parse TEI of this version")
+    parser.add_argument("--parser", choices=["soup", "lxml"], default="soup")
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=os.cpu_count() or 1,
+        help="number of processes, 0 runs in the current process",
+    )
+    parser.add_argument("--output", help="path of the JSON lines, by default stdout")
+    parser.add_argument(
+        "--cache", help="path to the SQLite result cache whose articles are replaced"
+    )
+    parser.add_argument(
+        "--cache-size",
+        type=int,
+        help="maximum number of cached values, by default CACHE_SIZE of the app",
+    )
+    args = parser.parse_args(argv)
+
+    sqlite_cache = None
+    if args.cache:
+        cache_size = args.cache_size
+        if cache_size is None:
+            try:
+                cache_size = get_settings().cache_size
+            except ValidationError:
+                parser.error("--cache-size is required if the app isn't configured")
+        # Matches the app's cache, so its values aren't evicted early
+        sqlite_cache = SQLiteCache(args.cache, maxsize=cache_size)
+    archive = TEIArchive(args.archive)
+    cache = ResultCache(sqlite_cache) if sqlite_cache is not None else None
+    keys = args.keys or archive.keys(args.grobid_version)
+    stream = open(args.output, "w", encoding="utf-8") if args.output else output
+
+    failed = False
+    try:
+        for key, result in reparse(archive, keys, args.parser, args.workers):
+            if isinstance(result, GrobidParserError):
+                failed = True
+                archive.set_parse_error(key, str(result))
+                stream.write(dumps(dict(key=key, detail=str(result))).decode() + "\n")
+                continue
+
+            article, nlp_result = result
+            archive.set_parse_error(key, None)
+            if cache is not None:
+                cache.put(Stage.article, key, article)
+                cache.delete(Stage.response, key)
+            stream.write(
+                dumps(
+                    dict(
+                        key=key,
+                        article=article,
+                        common_words=nlp_result.common_words,
+                        phrase_ranks=nlp_result.phrase_ranks,
+                        sentences=nlp_result.sentences,
+                    )
+                ).decode()
+                + "\n"
+            )
+    finally:
+        if stream is not output:
+            stream.close()
+        if sqlite_cache is not None:
+            sqlite_cache.close()
+        archive.close()
+
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,353 @@
+"""Summarises the ranked sentences of an article.
+
+The Hugging Face Inference API is used by default. The local backend runs a
+sequence-to-sequence model on CPU, for deployments without access to the API. Requests
+waiting for a worker are generated together as a batch.
+
+Example::
+
+    summariser = LocalSummariser("sshleifer/distilbart-cnn-12-6", workers=2)
+    summariser.start()
+    summary_text = await summariser.summarise(text)
+
+"""
+import asyncio
+import queue
+import threading
+from abc import ABC, abstractmethod
+from concurrent.futures import Future
+from importlib.util import find_spec
+from typing import Any
+
+import httpx
+from fastapi.param_functions import Depends
+
+from app.clients import get_huggingface_client
+from app.config import Settings, get_settings
+from app.executor import Executor, get_executor
+from app.nlp.summary import Bart
+
+# The local backend requires the optional torch package
+TORCH_SUPPORTED = find_spec("torch") is not None
+
+
+class Summariser(ABC):
+    """Interface for summarisation backends."""
+
+    @abstractmethod
+    async def summarise(self, text: str) -> str:
+        """Create summary of text.
+
+        Args:
+            text: text to be summarised
+
+        Returns:
+            Summarised text
+
+        Raises:
+            HTTPStatusError: if the request to a remote backend fails
+            RuntimeError: if text can't be summarised
+        """
+
+
+class NullSummariser(Summariser):
+    """Summariser which is disabled, the ranked sentences are used instead."""
+
+    async def summarise(self, text: str) -> str:  # noqa: D102
+        raise RuntimeError("Summarisation is disabled")
+
+
+class APISummariser(Summariser):
+    """Summarise using BART on the Hugging Face Inference API."""
+
+    api_token: str
+    timeout: int
+    executor: Executor
+    client: httpx.AsyncClient | None
+    fast_tokenizer: bool
+
+    def __init__(
+        self,
+        api_token: str,
+        timeout: int,
+        executor: Executor,
+        client: httpx.AsyncClient | None = None,
+        fast_tokenizer: bool = True,
+    ) -> None:
+        """Define variables.
+
+        Args:
+            api_token: used for HuggingFace API authorization
+            timeout: request timeout in seconds
+            executor: runs the tokenizer outside of the event loop
+            client: shared HTTP client, a new client is used if missing
+            fast_tokenizer: use the Rust tokenizer instead of the Python one
+        """
+        self.api_token = api_token
+        self.timeout = timeout
+        self.executor = executor
+        self.client = client
+        self.fast_tokenizer = fast_tokenizer
+
+    async def summarise(self, text: str) -> str:  # noqa: D102
+        bart = await self.executor.run_thread(
+            Bart,
+            api_token=self.api_token,
+            text=text,
+            timeout=self.timeout,
+            client=self.client,
+            fast_tokenizer=self.fast_tokenizer,
+        )
+        return await bart.summary
+
+
+class LocalSummariser(Summariser):
+    """Summarise using a sequence-to-sequence model on CPU.
+
+    Each worker thread takes the requests waiting in the queue, up to batch_size, and
+    generates their summaries as a batch.
+    """
+
+    model_id: str
+    workers: int
+    batch_size: int
+    quantize: bool
+    __model: Any = None
+    __tokenizer: Any = None
+    __load_error: str | None = None
+    __queue: "queue.SimpleQueue[tuple[str, Future[str]] | None]"
+    __threads: list[threading.Thread]
+    __lock: threading.Lock
+
+    def __init__(
+        self,
+        model_id: str,
+        workers: int = 1,
+        batch_size: int = 4,
+        quantize: bool = True,
+    ) -> None:
+        """Define variables, the model is loaded by start.
+
+        Args:
+            model_id: ID of model according to HuggingFace
+            workers: number of worker threads
+            batch_size: maximum number of texts generated together
+            quantize: use dynamic int8 quantisation of the linear layers
+        """
+        self.model_id = model_id
+        self.workers = workers
+        self.batch_size = batch_size
+        self.quantize = quantize
+        self.__queue = queue.SimpleQueue()
+        self.__threads = []
+        self.__lock = threading.Lock()
+
+    @property
+    def started(self) -> bool:
+        """Whether the worker threads are running."""
+        return bool(self.__threads)
+
+    def load(self) -> tuple[Any, Any]:
+        """Load model and tokenizer once.
+
+        A failed load isn't retried, the error is raised again by later calls.
+
+        Returns:
+            Model and tokenizer
+
+        Raises:
+            RuntimeError: if torch isn't installed or the model can't be loaded
+        """
+        with self.__lock:
+            if self.__load_error is not None:
+                raise RuntimeError(self.__load_error)
+            if self.__model is None:
+                try:
+                    self.__model, self.__tokenizer = self.__load()
+                except Exception as e:  # noqa: B902
+                    # Such as an unknown model ID, or no access to the Hugging Face Hub
+                    self.__load_error = f"Summariser model couldn't be loaded: {e}"
+                    raise RuntimeError(self.__load_error) from e
+
+        return self.__model, self.__tokenizer
+
+    def __load(self) -> tuple[Any, Any]:
+        if not TORCH_SUPPORTED:
+            raise RuntimeError("Local summariser requires torch")
+
+        import torch
+        from transformers import AutoModelForSeq2SeqLM, AutoTokenizer
+
+        model = AutoModelForSeq2SeqLM.from_pretrained(self.model_id)
+        if self.quantize:
+            model = torch.quantization.quantize_dynamic(
+                model, {torch.nn.Linear}, dtype=torch.qint8
+            )
+        tokenizer = AutoTokenizer.from_pretrained(self.model_id)
+
+        return model.eval(), tokenizer
+
+    def generate(self, texts: list[str]) -> list[str]:
+        """Summarise texts as a batch, blocking until finished.
+
+        Args:
+            texts: texts to be summarised
+
+        Returns:
+            Summarised texts in the same order as texts
+        """
+        import torch
+
+        model, tokenizer = self.load()
+        # The additional token will be newline
+        max_tokens = Bart.MAX_TOKENS - 1 - tokenizer.num_special_tokens_to_add()
+        inputs = tokenizer(
+            ["\n" + Bart.truncate(text, tokenizer, max_tokens) for text in texts],
+            padding=True,
+            return_tensors="pt",
+        )
+        with torch.inference_mode():
+            output = model.generate(
+                **inputs, max_length=Bart.MAX_LENGTH, min_length=Bart.MIN_LENGTH
+            )
+
+        return tokenizer.batch_decode(output, skip_special_tokens=True)
+
+    def __work(self) -> None:
+        while (item := self.__queue.get()) is not None:
+            batch = [item]
+            while len(batch) < self.batch_size:
+                try:
+                    item = self.__queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is None:
+                    # Leave the sentinel for after this batch
+                    self.__queue.put(None)
+                    break
+                batch.append(item)
+
+            try:
+                summaries = self.generate([text for text, _ in batch])
+            except Exception as e:  # noqa: B902
+                # Forwarded to each request of the batch, which falls back to the
+                # ranked sentences on RuntimeError
+                error = (
+                    e
+                    if isinstance(e, RuntimeError)
+                    else RuntimeError(f"Summary couldn't be generated: {e}")
+                )
+                for _, future in batch:
+                    future.set_exception(error)
+            else:
+                for (_, future), summary in zip(batch, summaries):
+                    future.set_result(summary)
+
+    def start(self) -> None:
+        """Load model and start worker threads.
+
+        Raises:
+            RuntimeError: if torch isn't installed or the model can't be loaded
+        """
+        self.load()
+        with self.__lock:
+            if not self.__threads:
+                for i in range(self.workers):
+                    thread = threading.Thread(
+                        target=self.__work, name=f"summariser_{i}", daemon=True
+                    )
+                    thread.start()
+                    self.__threads.append(thread)
+
+    async def summarise(self, text: str) -> str:  # noqa: D102
+        if not text:
+            raise RuntimeError("Text cannot be empty")
+        if not self.started:
+            await asyncio.get_running_loop().run_in_executor(None, self.start)
+
+        future: Future[str] = Future()
+        self.__queue.put((text, future))
+        summary = await asyncio.wrap_future(future)
+        if not summary:
+            raise RuntimeError("Summary is empty")
+
+        return summary
+
+    def shutdown(self) -> None:
+        """Stop worker threads, waiting for queued requests to finish."""
+        with self.__lock:
+            threads, self.__threads = self.__threads, []
+        for _ in threads:
+            self.__queue.put(None)
+        for thread in threads:
+            thread.join()
+
+
+_local_summarisers: dict[tuple[str, int, int, bool], LocalSummariser] = {}
+
+
+def build_local_summariser(
+    model_id: str, workers: int, batch_size: int, quantize: bool
+) -> LocalSummariser:
+    """Create local summariser once per configuration, then from cache."""
+    key = (model_id, workers, batch_size, quantize)
+    if key not in _local_summarisers:
+        _local_summarisers[key] = LocalSummariser(*key)
+
+    return _local_summarisers[key]
+
+
+def build_summariser(
+    settings: Settings,
+    executor: Executor,
+    client: httpx.AsyncClient | None = None,
+) -> Summariser:
+    """Create summariser configured by the app settings.
+
+    Args:
+        settings: app settings
+        executor: thread and process pools
+        client: shared HTTP client for Hugging Face
+
+    Returns:
+        Summariser object
+
+    Raises:
+        ValueError: if backend is unknown
+    """
+    match settings.summariser:
+        case "huggingface":
+            return APISummariser(
+                settings.huggingface_api_token,
+                settings.huggingface_api_timeout,
+                executor,
+                client=client,
+                fast_tokenizer=settings.bart_fast_tokenizer,
+            )
+        case "local":
+            return build_local_summariser(
+                settings.summariser_model,
+                settings.summariser_workers,
+                settings.summariser_batch_size,
+                settings.summariser_quantize,
+            )
+        case "none":
+            return NullSummariser()
+        case _:
+            raise ValueError(f"Unknown summariser {settings.summariser!r}")
+
+
+def get_summariser(
+    settings: Settings = Depends(get_settings),
+    executor: Executor = Depends(get_executor),
+    client: httpx.AsyncClient = Depends(get_huggingface_client),
+) -> Summariser:
+    """Get the summariser configured by the app settings."""
+    return build_summariser(settings, executor, client)
+
+
+def shutdown_summarisers() -> None:
+    """Stop all local summarisers, used on app shutdown."""
+    while _local_summarisers:
+        _, summariser = _local_summarisers.popitem()
+        summariser.shutdown()
@@ -0,0 +1,76 @@
+"""Fixtures shared by the unit tests."""
+from typing import Callable, Iterator
+
+import fitz
+import httpx
+import pytest
+import respx
+
+from app.cache import MemoryCache, ResultCache, get_cache
+from app.grobid.models import Article, Citation, RefText, Section
+from app.main import app
+from app.nlp.summary import Bart
+from tests.test_grobid.test_tei import TestParse
+
+API_URL = "http://validurl:8070"
+
+
+@pytest.fixture(autouse=True)
+def cache() -> Iterator[ResultCache]:
+    """Give the app an empty result cache for each test."""
+    cache = ResultCache(MemoryCache())
+    app.dependency_overrides[get_cache] = lambda: cache
+    yield cache
+    del app.dependency_overrides[get_cache]
+
+
+@pytest.fixture
+def article() -> Article:
+    """Create article with a single section."""
+    return Article(
+        bibliography=Citation(title="Test"),
+        keywords=set(),
+        tables={},
+        sections=[Section("Introduction", [RefText("Lorem Ipsum")])],
+        citations={},
+    )
+
+
+@pytest.fixture
+def grobid_xml(article: Article) -> bytes:
+    """Create GROBID response of the article."""
+    return TestParse.build_xml(article)
+
+
+@pytest.fixture
+def grobid(grobid_xml: bytes) -> Iterator[respx.Router]:
+    """Mock GROBID, responding with the TEI of the article, and the summariser.
+
+    The routes are named "fulltext", "version" and "summary".
+    """
+    with respx.mock(assert_all_called=False) as router:
+        router.post(f"{API_URL}/api/processFulltextDocument", name="fulltext").mock(
+            return_value=httpx.Response(status_code=200, content=grobid_xml)
+        )
+        router.get(f"{API_URL}/api/version", name="version").mock(
+            return_value=httpx.Response(status_code=200, text="0.7.1")
+        )
+        router.post(Bart.API_URL, name="summary").mock(
+            return_value=httpx.Response(status_code=200, content="[]")
+        )
+        yield router
+
+
+@pytest.fixture
+def build_pdf() -> Callable[..., bytes]:
+    """Create PDFs, with the text on the first page."""
+
+    def build(text: str = "", pages: int = 1) -> bytes:
+        with fitz.open(filetype="pdf") as pdf:
+            for number in range(pages):
+                page = pdf.new_page()
+                if number == 0 and text:
+                    page.insert_text(fitz.Point(50, 50), text)
+            return pdf.tobytes()
+
+    return build
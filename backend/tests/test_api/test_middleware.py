@@ -0,0 +1,39 @@
+"""Unit tests for the middleware module."""
+from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse, StreamingResponse
+from fastapi.testclient import TestClient
+
+from app.api.middleware import CompressionMiddleware
+
+app = FastAPI()
+app.add_middleware(CompressionMiddleware, minimum_size=100)
+
+
+@app.get("/text")
+def text():  # noqa: D103
+    return PlainTextResponse("Lorem Ipsum " * 100)
+
+
+@app.get("/stream")
+def stream():  # noqa: D103
+    lines = iter(["Lorem Ipsum\n"] * 100)
+    return StreamingResponse(lines, media_type="application/x-ndjson")
+
+
+class TestCompressionMiddleware:
+    """Unit tests for CompressionMiddleware class."""
+
+    def test_compressed(self):  # noqa: D102
+        with TestClient(app) as client:
+            response = client.get("/text", headers={"Accept-Encoding": "gzip"})
+
+        assert response.headers["Content-Encoding"] == "gzip"
+        assert response.text == "Lorem Ipsum " * 100
+
+    def test_streamed(self):
+        """Streamed events aren't buffered by compression."""
+        with TestClient(app) as client:
+            response = client.get("/stream", headers={"Accept-Encoding": "gzip"})
+
+        assert "Content-Encoding" not in response.headers
+        assert response.text == "Lorem Ipsum\n" * 100
@@ -0,0 +1,47 @@
+"""Unit tests for the responses module."""
+import pytest
+from fastapi import Request
+
+from app.api.responses import MessagePackResponse, ModelResponse, negotiate
+from app.grobid.models import Ref, RefText
+from app.grobid.models.encoder import MSGPACK_SUPPORTED
+
+
+def build_request(accept: str) -> Request:
+    """Create request with the Accept header."""
+    return Request(dict(type="http", headers=[(b"accept", accept.encode("latin-1"))]))
+
+
+class TestNegotiate:
+    """Unit tests for negotiate function."""
+
+    content = dict(paragraph=RefText("Foo [1]", [Ref(4, 7)]))
+
+    def test_json(self):  # noqa: D102
+        response = negotiate(build_request("application/json"), self.content)
+
+        assert isinstance(response, ModelResponse)
+        assert response.body == (
+            b'{"paragraph":{"text":"Foo [1]",'
+            b'"refs":[{"start":4,"end":7,"marker":null,"target":null}]}}'
+        )
+
+    @pytest.mark.skipif(MSGPACK_SUPPORTED, reason="msgpack is installed")
+    def test_missing_msgpack(self):
+        """JSON is used if msgpack isn't installed."""
+        response = negotiate(build_request("application/msgpack"), self.content)
+
+        assert isinstance(response, ModelResponse)
+
+    def test_msgpack(self):
+        """Refs are columnar."""
+        msgpack = pytest.importorskip("msgpack")
+        response = negotiate(build_request("application/msgpack"), self.content)
+
+        assert isinstance(response, MessagePackResponse)
+        assert msgpack.unpackb(response.body) == dict(
+            paragraph=dict(
+                text="Foo [1]",
+                refs=dict(start=[4], end=[7], marker=[None], target=[None]),
+            )
+        )
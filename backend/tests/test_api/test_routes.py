@@ -1,22 +1,32 @@
 """Unit tests for API routes."""
 # from app.api.models import UploadResponse
+import io
+import json
+import time
+import zipfile
+
+import fitz
 import httpx
 import respx
 from fastapi import status
 from fastapi.testclient import TestClient
 
+from app.archive import TEIArchive, get_archive
 from app.config import Settings, get_settings
+from app.grobid.models import Article, Author, Citation, PersonName, RefText, Section
 from app.main import app
 from app.nlp.summary import Bart
+from tests.conftest import API_URL
 from tests.test_grobid.test_tei import TestParse
 
-API_URL = "http://validurl:8070"
-
 
 def get_settings_overrides():
     """Mock .env file."""
     return Settings(
-        grobid_api_url=API_URL, grobid_api_timeout=15, huggingface_api_timeout=60
+        grobid_api_url=API_URL,
+        grobid_api_timeout=15,
+        huggingface_api_timeout=60,
+        grobid_retry_backoff=0,
     )
 
 
@@ -27,8 +37,6 @@ class TestRecieveFile:
         * Add invalid tests
     """
 
-    import fitz
-
     with fitz.open(filetype="pdf") as test_pdf:
         # Required to save pdf
         test_pdf.new_page()
@@ -80,15 +88,6 @@ class TestRecieveFile:
     @respx.mock
     def test_valid_request(self):
         """Mock XML response from GROBID API."""
-        from app.grobid.models import (
-            Article,
-            Author,
-            Citation,
-            PersonName,
-            RefText,
-            Section,
-        )
-
         article = Article(
             bibliography=Citation(
                 title="Test",
@@ -124,6 +123,317 @@ class TestRecieveFile:
 
         assert response.status_code == status.HTTP_200_OK
 
+    def test_cached_request(self, grobid, build_pdf):
+        """Same PDF uploaded twice only requests GROBID once."""
+        upload = build_pdf("Cached")
+        with TestClient(app) as client:
+            for _ in range(2):
+                response = client.post(
+                    "/upload",
+                    files={"file": ("filename", upload, "application/pdf")},
+                )
+                assert response.status_code == status.HTTP_200_OK
+
+        assert grobid["fulltext"].call_count == 1
+
+    def test_local_engine(self, grobid, build_pdf):
+        """Local extractor doesn't request GROBID."""
+        with TestClient(app) as client:
+            response = client.post(
+                "/upload",
+                params={"engine": "local"},
+                files={"file": ("filename", build_pdf("Local"), "application/pdf")},
+            )
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json()["article"]["sections"][0]["paragraphs"] == [
+            dict(text="Local", refs=[])
+        ]
+        assert grobid["fulltext"].call_count == 0
+
+    @respx.mock
+    def test_grobid_fallback(self):
+        """Local extractor is used when GROBID is unavailable."""
+        app.dependency_overrides[get_settings] = lambda: Settings(
+            grobid_api_url=API_URL, grobid_fallback=True, grobid_retry_backoff=0
+        )
+        try:
+            with TestClient(app) as client:
+                respx.mock.post(API_URL).mock(side_effect=httpx.ConnectError)
+                respx.mock.post(Bart.API_URL).mock(
+                    return_value=httpx.Response(status_code=200, content="[]")
+                )
+                response = client.post(
+                    "/upload",
+                    files={"file": ("filename", self.test_obj, "application/pdf")},
+                )
+        finally:
+            app.dependency_overrides[get_settings] = get_settings_overrides
+
+        assert response.status_code == status.HTTP_200_OK
+
+
+class TestArchive:
+    """Unit tests for `/archive/reparse` endpoint."""
+
+    app.dependency_overrides[get_settings] = get_settings_overrides
+
+    def test_disabled(self):  # noqa: D102
+        with TestClient(app) as client:
+            response = client.post("/archive/reparse")
+
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+
+    def test_reparse(self, tmp_path, grobid, build_pdf):
+        """TEI produced by GROBID is archived, then parsed again."""
+        archive = TEIArchive(str(tmp_path / "tei.sqlite3"))
+        app.dependency_overrides[get_archive] = lambda: archive
+        upload = build_pdf()
+
+        try:
+            with TestClient(app) as client:
+                client.post(
+                    "/upload", files={"file": ("filename", upload, "application/pdf")}
+                )
+                response = client.post(
+                    "/archive/reparse", params={"grobid_version": "0.7.1"}
+                )
+        finally:
+            del app.dependency_overrides[get_archive]
+
+        (key,) = archive.keys()
+        assert archive.get(key).grobid_version == "0.7.1"
+        assert response.status_code == status.HTTP_200_OK
+        assert json.loads(response.text) == dict(
+            key=key, status_code=status.HTTP_200_OK, title="Test"
+        )
+        archive.close()
+
+
+class TestOpenAPI:
+    """Unit tests for `/openapi.json` endpoint."""
+
+    def test_schema(self):
+        """Schema of every route can be generated."""
+        with TestClient(app) as client:
+            response = client.get("/openapi.json")
+
+        assert response.status_code == status.HTTP_200_OK
+        assert "/upload" in response.json()["paths"]
+
+
+class TestPreview:
+    """Unit tests for `/upload/preview` endpoint."""
+
+    app.dependency_overrides[get_settings] = get_settings_overrides
+
+    @respx.mock
+    def test_header_only(self, build_pdf):
+        """Only GROBID's header service is requested."""
+        xml = b"""
+        <TEI><sourceDesc><biblStruct><title type='main'>Test</title></biblStruct>
+        </sourceDesc><abstract><div><p>Lorem Ipsum</p></div></abstract></TEI>
+        """
+        upload = build_pdf()
+        with TestClient(app) as client:
+            route = respx.mock.post(f"{API_URL}/api/processHeaderDocument").mock(
+                return_value=httpx.Response(status_code=200, content=xml)
+            )
+            response = client.post(
+                "/upload/preview",
+                files={"file": ("filename", upload, "application/pdf")},
+            )
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json()["bibliography"]["title"] == "Test"
+        assert response.json()["abstract"]["paragraphs"][0]["text"] == "Lorem Ipsum"
+        assert route.call_count == 1
+
+
+class TestStream:
+    """Unit tests for `/upload/stream` endpoint."""
+
+    app.dependency_overrides[get_settings] = get_settings_overrides
+
+    def test_invalid_document(self):
+        """Errors before the article is ready are status codes."""
+        with TestClient(app) as client:
+            response = client.post(
+                "/upload/stream", files={"file": ("filename", b"", "application/pdf")}
+            )
+
+        assert response.status_code == status.HTTP_415_UNSUPPORTED_MEDIA_TYPE
+
+    def test_ndjson(self, grobid, build_pdf):
+        """Each stage is a line, in order."""
+        with TestClient(app) as client:
+            response = client.post(
+                "/upload/stream",
+                files={"file": ("filename", build_pdf("NDJSON"), "application/pdf")},
+            )
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.headers["content-type"] == "application/x-ndjson"
+        events = [json.loads(line) for line in response.text.splitlines()]
+        assert [event["event"] for event in events] == [
+            "article",
+            "common_words",
+            "phrase_ranks",
+            "sentences",
+            "summary",
+        ]
+        assert events[0]["data"]["bibliography"]["title"] == "Test"
+
+    def test_cached_request(self, grobid, build_pdf):
+        """Cached results have the same events as processed results."""
+        upload = build_pdf("Cached stream")
+        with TestClient(app) as client:
+            responses = [
+                client.post(
+                    "/upload/stream",
+                    files={"file": ("filename", upload, "application/pdf")},
+                )
+                for _ in range(2)
+            ]
+
+        processed, cached = (
+            [json.loads(line) for line in response.text.splitlines()]
+            for response in responses
+        )
+        assert grobid["fulltext"].call_count == 1
+        assert [event["event"] for event in cached] == [
+            "article",
+            "common_words",
+            "phrase_ranks",
+            "sentences",
+            "summary",
+        ]
+        assert cached == processed
+
+    def test_sse(self, grobid, build_pdf):
+        """Server-Sent Events are used if accepted."""
+        with TestClient(app) as client:
+            response = client.post(
+                "/upload/stream",
+                files={"file": ("filename", build_pdf("SSE"), "application/pdf")},
+                headers={"Accept": "text/event-stream"},
+            )
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.headers["content-type"].startswith("text/event-stream")
+        messages = response.text.strip().split("\n\n")
+        assert [message.splitlines()[0] for message in messages] == [
+            "event: article",
+            "event: common_words",
+            "event: phrase_ranks",
+            "event: sentences",
+            "event: summary",
+        ]
+        assert all(message.splitlines()[1].startswith("data: ") for message in messages)
+
+
+class TestBatch:
+    """Unit tests for `/upload/batch` endpoint."""
+
+    app.dependency_overrides[get_settings] = get_settings_overrides
+
+    def test_batch(self, grobid, build_pdf):
+        """Each PDF, including those in zip files, has a line of results."""
+        pdfs = [build_pdf(text) for text in ["Batch 1", "Batch 2"]]
+        buffer = io.BytesIO()
+        with zipfile.ZipFile(buffer, "w") as archive:
+            archive.writestr("zipped.pdf", pdfs[1])
+
+        with TestClient(app) as client:
+            response = client.post(
+                "/upload/batch",
+                files=[
+                    ("files", ("first.pdf", pdfs[0], "application/pdf")),
+                    ("files", ("papers.zip", buffer.getvalue(), "application/zip")),
+                    ("files", ("invalid.pdf", b"", "application/pdf")),
+                    ("files", ("notes.txt", b"", "text/plain")),
+                ],
+            )
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.headers["content-type"] == "application/x-ndjson"
+        lines = {
+            line["filename"]: line
+            for line in map(json.loads, response.text.splitlines())
+        }
+        assert set(lines) == {"first.pdf", "zipped.pdf", "invalid.pdf", "notes.txt"}
+        for filename in ["first.pdf", "zipped.pdf"]:
+            assert lines[filename]["status_code"] == status.HTTP_200_OK
+            assert lines[filename]["article"]["bibliography"]["title"] == "Test"
+            assert "summary" in lines[filename]
+        for filename in ["invalid.pdf", "notes.txt"]:
+            assert (
+                lines[filename]["status_code"] == status.HTTP_415_UNSUPPORTED_MEDIA_TYPE
+            )
+
+
+class TestJobs:
+    """Unit tests for `/jobs` endpoints."""
+
+    app.dependency_overrides[get_settings] = get_settings_overrides
+
+    @staticmethod
+    def wait(client: TestClient, job_id: str) -> dict:
+        """Poll job until it's finished."""
+        for _ in range(100):
+            job = client.get(f"/jobs/{job_id}").json()
+            if job["status"] in ("done", "failed"):
+                return job
+            time.sleep(0.05)
+
+        raise TimeoutError("Job didn't finish")
+
+    def test_invalid_mime(self):  # noqa: D102
+        with TestClient(app) as client:
+            response = client.post(
+                "/jobs", files={"file": ("filename", b"", "application/zip")}
+            )
+
+        assert response.status_code == status.HTTP_415_UNSUPPORTED_MEDIA_TYPE
+
+    def test_missing_job(self):  # noqa: D102
+        with TestClient(app) as client:
+            response = client.get("/jobs/missing")
+
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+
+    def test_failed_job(self):
+        """Errors of the pipeline are stored on the job."""
+        with TestClient(app) as client:
+            response = client.post(
+                "/jobs", files={"file": ("filename", b"", "application/pdf")}
+            )
+            assert response.status_code == status.HTTP_202_ACCEPTED
+            job = self.wait(client, response.json()["id"])
+
+        assert job["status"] == "failed"
+        assert job["error"]["status_code"] == status.HTTP_415_UNSUPPORTED_MEDIA_TYPE
+
+    def test_valid_job(self, grobid, build_pdf):
+        """Job has the same results as `/upload`."""
+        with TestClient(app) as client:
+            response = client.post(
+                "/jobs",
+                files={"file": ("filename", build_pdf("Job"), "application/pdf")},
+            )
+            job = self.wait(client, response.json()["id"])
+
+        assert job["status"] == "done"
+        assert job["error"] is None
+        assert job["results"]["article"]["bibliography"]["title"] == "Test"
+        assert set(job["results"]) == {
+            "article",
+            "common_words",
+            "phrase_ranks",
+            "sentences",
+            "summary",
+        }
+
 
 class TestValidateURL:
     """Unit tests for '/validate_url/' endpoint.
@@ -0,0 +1,48 @@
+"""Unit tests for the archive module."""
+from app.archive import ArchivedTEI, TEIArchive, build_archive
+
+
+class TestTEIArchive:
+    """Unit tests for TEIArchive class."""
+
+    def test_get_put(self, tmp_path):
+        """TEI is stored with the GROBID version and form options."""
+        archive = TEIArchive(str(tmp_path / "tei.sqlite3"))
+        assert archive.get("foo") is None
+
+        tei = ArchivedTEI(
+            "foo", b"<TEI/>" * 100, "0.7.1", {"consolidateHeader": "1"}, "paper.pdf"
+        )
+        archive.put(tei)
+
+        assert archive.get("foo") == tei
+        assert len(archive) == 1
+        archive.close()
+
+    def test_set_parse_error(self, tmp_path):
+        """Parse errors are recorded, and cleared once the TEI is parsed."""
+        archive = TEIArchive(str(tmp_path / "tei.sqlite3"))
+        archive.put(ArchivedTEI("foo", b"<TEI/>"))
+
+        archive.set_parse_error("foo", "Missing body")
+        assert archive.get("foo").parse_error == "Missing body"
+        archive.set_parse_error("foo", None)
+        assert archive.get("foo").parse_error is None
+        archive.close()
+
+    def test_keys(self, tmp_path):
+        """Keys are listed oldest first, optionally by GROBID version."""
+        archive = TEIArchive(str(tmp_path / "tei.sqlite3"))
+        archive.put(ArchivedTEI("foo", b"<TEI/>", "0.7.1", created=2))
+        archive.put(ArchivedTEI("bar", b"<TEI/>", "0.7.0", created=1))
+
+        assert archive.keys() == ["bar", "foo"]
+        assert archive.keys("0.7.1") == ["foo"]
+        archive.close()
+
+
+class TestBuildArchive:
+    """Unit tests for build_archive function."""
+
+    def test_disabled(self):  # noqa: D102
+        assert build_archive("") is None
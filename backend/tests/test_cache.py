@@ -0,0 +1,144 @@
+"""Unit tests for the cache module."""
+import pickle
+import sqlite3
+
+import pytest
+
+from app.cache import (
+    MemoryCache,
+    NullCache,
+    ResultCache,
+    SQLiteCache,
+    Stage,
+    build_cache,
+    cache_key,
+)
+
+
+class TestCacheKey:
+    """Unit tests for cache_key function."""
+
+    def test_uid(self):
+        """DOI is used when available and is case insensitive."""
+        assert cache_key("10.1000/ABC", b"") == cache_key("10.1000/abc", b"foo")
+        assert cache_key("arxiv:2101.00001", b"") == "arxiv:2101.00001"
+
+    def test_hash_fallback(self):
+        """Hash of contents is used when there is no DOI."""
+        assert cache_key(None, b"foo") == cache_key(None, b"foo")
+        assert cache_key(None, b"foo") != cache_key(None, b"bar")
+
+
+class TestMemoryCache:
+    """Unit tests for MemoryCache class."""
+
+    def test_get_set(self):  # noqa: D102
+        cache = MemoryCache()
+        assert cache.get("foo") is None
+
+        cache.put("foo", 1)
+        assert cache.get("foo") == 1
+
+        cache.clear()
+        assert cache.get("foo") is None
+
+    def test_evicts_least_recently_used(self):  # noqa: D102
+        cache = MemoryCache(maxsize=2)
+        cache.put("foo", 1)
+        cache.put("bar", 2)
+        cache.get("foo")
+        cache.put("baz", 3)
+
+        assert len(cache) == 2
+        assert cache.get("bar") is None
+        assert cache.get("foo") == 1
+
+
+class TestSQLiteCache:
+    """Unit tests for SQLiteCache class."""
+
+    def test_get_set(self, tmp_path, article):
+        """Values are pickled, including Article objects."""
+        cache = SQLiteCache(str(tmp_path / "cache.sqlite3"))
+        assert cache.get("foo") is None
+
+        cache.put("foo", article)
+        assert cache.get("foo") == article
+
+        cache.clear()
+        assert cache.get("foo") is None
+        cache.close()
+
+    def test_persistent(self, tmp_path):  # noqa: D102
+        path = str(tmp_path / "cache.sqlite3")
+        cache = SQLiteCache(path)
+        cache.put("foo", b"<TEI/>")
+        cache.close()
+
+        assert SQLiteCache(path).get("foo") == b"<TEI/>"
+
+    def test_compressed(self, tmp_path):
+        """Values are compressed, uncompressed values are treated as stale."""
+        path = str(tmp_path / "cache.sqlite3")
+        cache = SQLiteCache(path)
+        cache.put("foo", "Lorem Ipsum " * 100)
+        cache.close()
+
+        with sqlite3.connect(path) as connection:
+            (blob,) = connection.execute("SELECT value FROM cache").fetchone()
+            assert len(blob) < 100
+            connection.execute(
+                "UPDATE cache SET value = ?", (pickle.dumps("Lorem Ipsum"),)
+            )
+        connection.close()
+
+        assert SQLiteCache(path).get("foo") is None
+
+    def test_delete(self, tmp_path):  # noqa: D102
+        cache = SQLiteCache(str(tmp_path / "cache.sqlite3"))
+        cache.put("foo", 1)
+        cache.delete("foo")
+        cache.delete("bar")
+
+        assert cache.get("foo") is None
+        cache.close()
+
+    def test_evicts_least_recently_used(self, tmp_path):  # noqa: D102
+        cache = SQLiteCache(str(tmp_path / "cache.sqlite3"), maxsize=2)
+        cache.put("foo", 1)
+        cache.put("bar", 2)
+        cache.get("foo")
+        cache.put("baz", 3)
+
+        assert len(cache) == 2
+        assert cache.get("bar") is None
+        assert cache.get("foo") == 1
+
+
+class TestResultCache:
+    """Unit tests for ResultCache class."""
+
+    def test_stages(self):
+        """Stages are stored separately."""
+        cache = ResultCache(MemoryCache())
+        cache.put(Stage.tei, "foo", b"<TEI/>")
+
+        assert cache.get(Stage.tei, "foo") == b"<TEI/>"
+        assert cache.get(Stage.article, "foo") is None
+
+    def test_null_cache(self):  # noqa: D102
+        cache = ResultCache(NullCache())
+        cache.put(Stage.tei, "foo", b"<TEI/>")
+
+        assert cache.get(Stage.tei, "foo") is None
+
+
+class TestBuildCache:
+    """Unit tests for build_cache function."""
+
+    def test_invalid_backend(self):  # noqa: D102
+        with pytest.raises(ValueError, match="Unknown cache backend"):
+            build_cache("invalid", 1, "")
+
+    def test_same_instance(self):  # noqa: D102
+        assert build_cache("memory", 1, "") is build_cache("memory", 1, "")
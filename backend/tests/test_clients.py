@@ -0,0 +1,34 @@
+"""Unit tests for the clients module."""
+import pytest
+
+from app.clients import ClientRegistry
+from app.config import Settings
+
+
+class TestClientRegistry:
+    """Unit tests for ClientRegistry class."""
+
+    settings = Settings(grobid_api_url="http://validurl:8070", http2=False)
+
+    @pytest.mark.asyncio
+    async def test_shared_client(self):
+        """Same client is returned per service."""
+        registry = ClientRegistry()
+        client = registry.get("grobid", self.settings)
+
+        assert registry.get("grobid", self.settings) is client
+        assert registry.get("huggingface", self.settings) is not client
+
+        await registry.aclose()
+
+    @pytest.mark.asyncio
+    async def test_closed_client(self):
+        """Closed clients are recreated."""
+        registry = ClientRegistry()
+        client = registry.get("grobid", self.settings)
+        await registry.aclose()
+
+        assert client.is_closed
+        assert not registry.get("grobid", self.settings).is_closed
+
+        await registry.aclose()
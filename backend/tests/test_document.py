@@ -1,4 +1,6 @@
 """Unit tests for the document module."""
+from concurrent.futures import ThreadPoolExecutor
+
 import fitz
 import pytest
 from fitz.fitz import Rect
@@ -44,6 +46,42 @@ class TestPDF:
 
         assert type(pdf_bytes) == bytes
 
+    def test_pdf_bytes_original(self):
+        """Documents which weren't repaired aren't serialised again."""
+        self.empty_new_page()
+        upload = self.pdf.tobytes()
+        with PDF(upload) as pdf:
+            assert not pdf.is_repaired
+            assert pdf.bytes_ is upload
+
+    def test_pdf_repaired(self):
+        """Repaired documents are serialised again."""
+        self.empty_new_page()
+        upload = self.pdf.tobytes()
+        broken = upload.replace(b"startxref", b"startxrf")
+        with PDF(broken, garbage=3, deflate=True) as pdf:
+            assert pdf.is_repaired
+            pdf_bytes = pdf.bytes_
+
+        with PDF(pdf_bytes) as pdf:
+            assert not pdf.is_repaired
+
+    def test_pdf_repaired_threads(self):
+        """Documents opened at once only get their own warnings."""
+        self.empty_new_page()
+        upload = self.pdf.tobytes()
+        broken = upload.replace(b"startxref", b"startxrf")
+
+        def is_repaired(stream: bytes) -> bool:
+            with PDF(stream) as pdf:
+                return pdf.is_repaired
+
+        uploads = [upload, broken] * 50
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            repaired = list(executor.map(is_repaired, uploads))
+
+        assert repaired == [stream is broken for stream in uploads]
+
     def test_pdf_no_uid(self):
         """Tests that UID is not returned if failed to parse."""
         self.empty_new_page()
@@ -89,3 +127,71 @@ class TestPDF:
 
         with PDF(self.pdf.tobytes()) as pdf:
             assert pdf.uid == doi
+
+    def test_pdf_doi_metadata(self):
+        """Tests DOI is parsed from the metadata before the pages."""
+        self.empty_new_page()
+        self.pdf.set_metadata({"subject": "doi:10.1000/182"})
+
+        with PDF(self.pdf.tobytes()) as pdf:
+            assert pdf.uid == "10.1000/182"
+
+        self.pdf.set_metadata({})
+
+    def test_pdf_doi_xmp(self):
+        """Tests DOI is parsed from the XMP metadata."""
+        self.empty_new_page()
+        self.pdf.set_xml_metadata("<prism:doi>10.1000/182</prism:doi>")
+
+        with PDF(self.pdf.tobytes()) as pdf:
+            assert pdf.uid == "10.1000/182"
+
+        self.pdf.del_xml_metadata()
+
+    def test_pdf_arxiv_link(self):
+        """Tests arXiv identifier is parsed from arxiv.org links."""
+        page = self.empty_new_page()
+        link_dict = {
+            "uri": "https://arxiv.org/abs/2101.00001",
+            "kind": fitz.LINK_URI,
+            "from": Rect(0, 0, 0, 0),
+        }
+        page.insert_link(link_dict)
+
+        with PDF(self.pdf.tobytes()) as pdf:
+            assert pdf.uid == "arxiv:2101.00001"
+
+    def test_pdf_uid_pages(self):
+        """DOI is preferred and only the first pages are searched."""
+        pdf = fitz.open()
+        pdf.new_page().insert_text((72, 72), "ISBN 978-3-16-148410-0")
+        pdf.new_page().insert_link(
+            {
+                "uri": "http://crossmark.crossref.org/dialog/?doi=10.1000/182",
+                "kind": fitz.LINK_URI,
+                "from": Rect(0, 0, 0, 0),
+            }
+        )
+        upload = pdf.tobytes()
+
+        with PDF(upload) as doc:
+            assert doc.uid == "10.1000/182"
+        with PDF(upload, uid_pages=1) as doc:
+            assert doc.uid == "isbn:9783161484100"
+
+    def test_pdf_cited_doi(self):
+        """Identifiers cited after the first page aren't used."""
+        pdf = fitz.open()
+        pdf.new_page().insert_text((72, 72), "Title")
+        page = pdf.new_page()
+        page.insert_text((72, 72), "[1] Cited. doi:10.1000/182")
+        page.insert_link(
+            {
+                "uri": "https://doi.org/10.1000/183",
+                "kind": fitz.LINK_URI,
+                "from": Rect(0, 0, 0, 0),
+            }
+        )
+
+        with PDF(pdf.tobytes()) as doc:
+            assert doc.uid is None
@@ -0,0 +1,54 @@
+"""Unit tests for the executor module."""
+import threading
+
+import pytest
+
+from app.executor import Executor, build_executor, shutdown_executors
+
+
+def thread_name() -> str:
+    """Return name of the current thread."""
+    return threading.current_thread().name
+
+
+class TestExecutor:
+    """Unit tests for Executor class."""
+
+    @pytest.mark.asyncio
+    async def test_run_thread(self):
+        """Function is run outside of the event loop thread."""
+        executor = Executor(thread_pool_size=1)
+
+        assert (await executor.run_thread(thread_name)).startswith("pipeline")
+        assert await executor.run_thread(sum, [1, 2]) == 3
+        executor.shutdown()
+
+    @pytest.mark.asyncio
+    async def test_run_process_without_pool(self):
+        """Process stages fall back to the thread pool."""
+        executor = Executor(thread_pool_size=1, process_pool_size=0)
+
+        assert executor.process_pool is None
+        assert (await executor.run_process(thread_name)).startswith("pipeline")
+        executor.shutdown()
+
+    @pytest.mark.asyncio
+    async def test_kwargs(self):  # noqa: D102
+        executor = Executor(thread_pool_size=1)
+
+        assert await executor.run_thread(int, "10", base=2) == 2
+        executor.shutdown()
+
+
+class TestBuildExecutor:
+    """Unit tests for build_executor function."""
+
+    def test_same_instance(self):  # noqa: D102
+        executor = build_executor(1, 0)
+
+        assert executor is build_executor(1, 0)
+
+        shutdown_executors()
+
+        assert executor is not build_executor(1, 0)
+        shutdown_executors()
@@ -0,0 +1,111 @@
+"""Unit tests for the extraction module."""
+import fitz
+
+from app.document import PDF
+from app.extraction import ArticleExtractor, join_lines
+
+
+def build_pdf(blocks: list[tuple[str, float, bool]]) -> bytes:
+    """Create PDF with a block of text per line, separated by blank space."""
+    with fitz.open() as pdf:
+        page = pdf.new_page()
+        y = 72
+        for text, size, bold in blocks:
+            if y > page.rect.height - 72:
+                page = pdf.new_page()
+                y = 72
+            page.insert_text(
+                (72, y), text, fontsize=size, fontname="hebo" if bold else "helv"
+            )
+            y += 3 * size
+        return pdf.tobytes()
+
+
+def test_join_lines():
+    """Hyphens are only removed when a word continues on the next line."""
+    assert join_lines(["a hyphen-", "ated word", "non-", "Linear"]) == (
+        "a hyphenated word non- Linear"
+    )
+
+
+class TestArticleExtractor:
+    """Unit tests for ArticleExtractor class."""
+
+    upload = build_pdf(
+        [
+            ("A Study of Extraction", 20, False),
+            ("Jane Doe", 10, False),
+            ("Abstract", 11, True),
+            ("We extract articles without GROBID.", 10, False),
+            ("Keywords: layout, fonts; PDF", 10, False),
+            ("1 Introduction", 11, True),
+            ("Headings are larger than the body text.", 10, False),
+            ("Paragraphs are blocks of text.", 10, False),
+            ("2. Method", 14, False),
+            ("Blocks are grouped by heading.", 10, False),
+            ("References", 11, True),
+            (
+                "[1] J. Doe. First paper. 2020. [2] J. Doe. Second paper. 2021.",
+                10,
+                False,
+            ),
+        ]
+    )
+
+    def test_article(self):  # noqa: D102
+        with PDF(self.upload) as pdf:
+            article = ArticleExtractor(pdf).article()
+
+        assert article.bibliography.title == "A Study of Extraction"
+        assert article.abstract is not None
+        assert article.abstract.to_str() == "We extract articles without GROBID."
+        assert article.keywords == {"layout", "fonts", "PDF"}
+        assert [section.title for section in article.sections] == [
+            "Introduction",
+            "Method",
+        ]
+        assert len(article.sections[0].paragraphs) == 2
+        assert [citation.title for citation in article.citations.values()] == [
+            "[1] J. Doe. First paper. 2020.",
+            "[2] J. Doe. Second paper. 2021.",
+        ]
+
+    def test_inline_abstract(self):
+        """Abstract heading is part of the first paragraph."""
+        upload = build_pdf(
+            [
+                ("Title", 20, False),
+                ("Abstract. Inline abstract.", 10, False),
+                ("Introduction", 14, False),
+                ("Body text.", 10, False),
+            ]
+        )
+        with PDF(upload) as pdf:
+            article = ArticleExtractor(pdf).article()
+
+        assert article.abstract is not None
+        assert article.abstract.to_str() == "Inline abstract."
+
+    def test_no_headings(self):
+        """Text is a single section when there aren't any headings."""
+        upload = build_pdf([("Only body text.", 10, False)])
+        with PDF(upload) as pdf:
+            article = ArticleExtractor(pdf).article()
+
+        assert article.bibliography.title == ""
+        assert article.sections[0].to_str() == "Only body text."
+
+    def test_running_headers(self):
+        """Page numbers and text repeated on many pages are removed."""
+        with fitz.open() as doc:
+            for number in range(1, 4):
+                page = doc.new_page()
+                page.insert_text((72, 36), "Journal of Tests")
+                page.insert_text((72, 200), f"Text of page {number}.")
+                page.insert_text((300, 800), str(number))
+            upload = doc.tobytes()
+
+        with PDF(upload) as pdf:
+            texts = [block.text for block in ArticleExtractor(pdf).blocks]
+
+        assert texts == [f"Text of page {number}." for number in range(1, 4)]
@@ -3,7 +3,7 @@ import httpx
 import pytest
 import respx
 
-from app.grobid.client import Client, GrobidClientError
+from app.grobid.client import Client, Endpoint, GrobidClientError
 from app.grobid.models.form import File, Form
 
 
@@ -108,14 +108,35 @@ class TestClient:
         with pytest.raises(
             GrobidClientError,
             match="Service not available",
-        ):
+        ) as exc_info:
             await c.asyncio_request()
+        assert exc_info.value.status_code == 503
+        assert exc_info.value.retryable
 
         # 200
         respx.mock.post(api_url).mock(return_value=httpx.Response(200))
         r = await c.asyncio_request()
         assert r.status_code == 200
 
+    @respx.mock
+    @pytest.mark.asyncio
+    async def test_asyncio_endpoint(self):
+        """Header and references services are requested."""
+        api_url = "http://validurl:8070"
+        route = respx.mock.post(f"{api_url}/api/processHeaderDocument").mock(
+            return_value=httpx.Response(200)
+        )
+        c = Client(
+            api_url=api_url,
+            form=self.form,
+            timeout=self.timeout,
+            endpoint=Endpoint.header,
+        )
+
+        await c.asyncio_request()
+
+        assert route.called
+
     @pytest.mark.asyncio
     async def test_asyncio_invalid_request(self):
         """Test invalid URL asynchronously."""
@@ -123,5 +144,21 @@ class TestClient:
         c = Client(api_url=api_url, form=self.form, timeout=self.timeout)
         with pytest.raises(
             GrobidClientError, match=r"An error occurred while requesting .*"
-        ):
+        ) as exc_info:
             await c.asyncio_request()
+        assert exc_info.value.status_code is None
+
+    @respx.mock
+    @pytest.mark.asyncio
+    async def test_asyncio_shared_client(self):
+        """Shared client is used and isn't closed after the request."""
+        api_url = "http://validurl:8070"
+        async with httpx.AsyncClient() as client:
+            c = Client(
+                api_url=api_url, form=self.form, timeout=self.timeout, client=client
+            )
+            respx.mock.post(api_url).mock(return_value=httpx.Response(200))
+            r = await c.asyncio_request()
+
+            assert r.status_code == 200
+            assert not client.is_closed
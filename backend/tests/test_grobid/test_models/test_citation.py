@@ -1,5 +1,5 @@
 """Unit tests for the citation module."""
-from app.grobid.models import PersonName
+from app.grobid.models import PersonName, Scope
 
 
 class TestPersonName:
@@ -15,3 +15,12 @@ class TestPersonName:
 
         person_name.first_name = self.first_name
         assert person_name.to_string() == f"{self.first_name} {self.surname}"
+
+
+class TestScope:
+    """Unit tests for Scope class."""
+
+    def test_is_empty(self):  # noqa: D102
+        assert Scope().is_empty()
+        assert not Scope(volume=1).is_empty()
+        assert not hasattr(Scope(), "__dict__")
@@ -0,0 +1,65 @@
+"""Unit tests for the encoder module."""
+import dataclasses
+import json
+
+import pytest
+
+from app.grobid.models import (
+    Article,
+    Citation,
+    Marker,
+    Ref,
+    RefText,
+    Section,
+    dumps,
+    to_dict,
+)
+from app.grobid.models.encoder import to_jsonable
+
+
+class TestEncoder:
+    """Unit tests for to_dict and dumps functions."""
+
+    article = Article(
+        bibliography=Citation(title="Title"),
+        keywords={"foo"},
+        citations={"b0": Citation(title="Cited")},
+        sections=[
+            Section("Introduction", [RefText("Foo [1]", [Ref(4, 7, Marker.bibr)])])
+        ],
+        tables={},
+    )
+
+    def test_to_dict(self):
+        """Same as dataclasses.asdict, except for JSON types."""
+        article = to_dict(self.article)
+
+        assert article["keywords"] == ["foo"]
+        assert article["citations"]["b0"] == dataclasses.asdict(Citation("Cited"))
+        assert article["sections"][0]["paragraphs"][0]["refs"] == [
+            dict(start=4, end=7, marker="bibr", target=None)
+        ]
+
+    def test_private_fields(self):
+        """Cached plain text isn't serialised."""
+        ref_text = RefText("Foo")
+        ref_text.plain_text
+
+        assert to_dict(ref_text) == dict(text="Foo", refs=[])
+
+    def test_dumps(self):  # noqa: D102
+        content = dumps(dict(article=self.article, summary=["é"]))
+
+        assert json.loads(content) == dict(article=to_dict(self.article), summary=["é"])
+
+    def test_columnar(self):
+        """Refs are columns, including refs which were already converted."""
+        paragraph = RefText("Foo [1]", [Ref(4, 7, Marker.bibr, "#b0")])
+        columns = dict(start=[4], end=[7], marker=["bibr"], target=["#b0"])
+
+        assert to_jsonable(paragraph, columnar=True)["refs"] == columns
+        assert to_jsonable(to_dict(paragraph), columnar=True)["refs"] == columns
+
+    def test_invalid_type(self):  # noqa: D102
+        with pytest.raises(TypeError, match="not JSON serialisable"):
+            to_jsonable(object())
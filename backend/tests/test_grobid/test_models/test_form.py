@@ -59,6 +59,11 @@ class TestForm:
             input=self.file.to_tuple(), teiCoordinates=tei_coordinates
         )
 
+    def test_page_range_params(self):  # noqa: D102
+        form: Form = Form(self.file, start=1, end=2)
+
+        assert form.to_dict() == dict(input=self.file.to_tuple(), start="1", end="2")
+
 
 class TestFile:
     """Unit tests for File class."""
@@ -0,0 +1,74 @@
+"""Unit tests for the section module."""
+import pickle
+
+from app.grobid.models import Marker, Ref, Refs, RefText, Section, to_dict
+
+
+class TestRefs:
+    """Unit tests for Refs class."""
+
+    refs = [Ref(0, 3, Marker.bibr, "#b0"), Ref(5, 8)]
+
+    def test_columns(self):
+        """Refs are stored in columns and read as Ref objects."""
+        refs = Refs(self.refs)
+
+        assert list(refs.starts) == [0, 5]
+        assert list(refs.ends) == [3, 8]
+        assert refs[0] == self.refs[0]
+        assert refs[-1] == self.refs[1]
+        assert refs[1:] == self.refs[1:]
+        assert refs == self.refs
+
+    def test_interned_target(self):  # noqa: D102
+        refs = Refs()
+        refs.add(0, 3, target="".join(["#", "b0"]))
+        refs.add(5, 8, target="".join(["#", "b0"]))
+
+        assert refs.targets[0] is refs.targets[1]
+
+    def test_pickle(self):  # noqa: D102
+        refs = Refs(self.refs)
+
+        assert pickle.loads(pickle.dumps(refs)) == refs
+
+
+class TestRefText:
+    """Unit tests for RefText class."""
+
+    def test_plain_text(self):
+        """Refs are removed."""
+        ref_text = RefText("Foo [1] bar [2].", [Ref(4, 7), Ref(12, 15)])
+
+        assert ref_text.plain_text == "Foo bar."
+        assert list(ref_text.ref_offsets) == [3, 7]
+
+    def test_plain_text_cached(self):
+        """Plain text is built once, unless the text or refs change."""
+        ref_text = RefText("Foo [1] bar", [Ref(4, 7)])
+
+        assert ref_text.plain_text is ref_text.plain_text
+
+        ref_text.refs.add(8, 11)
+        assert ref_text.plain_text == "Foo"
+        ref_text.text = "Bar"
+        assert ref_text.plain_text == "Bar"
+
+    def test_to_dict(self):
+        """Refs are converted like a list of Ref objects."""
+        ref_text = RefText("Foo [1]", [Ref(4, 7, Marker.bibr, "#b0")])
+
+        assert to_dict(ref_text) == dict(
+            text="Foo [1]",
+            refs=[dict(start=4, end=7, marker=Marker.bibr, target="#b0")],
+        )
+
+
+class TestSection:
+    """Unit tests for Section class."""
+
+    def test_to_str(self):
+        """Plain text of the paragraphs is joined."""
+        section = Section("Title", [RefText("Foo [1]", [Ref(4, 7)]), RefText(" bar")])
+
+        assert section.to_str() == "Foo bar"
@@ -0,0 +1,237 @@
+"""Unit tests for the service module."""
+import asyncio
+import time
+
+import httpx
+import pytest
+import respx
+
+from app.config import Settings
+from app.grobid.client import GrobidClientError
+from app.grobid.models.form import File, Form
+from app.grobid.service import (
+    CircuitBreaker,
+    CircuitOpenError,
+    CircuitState,
+    GrobidInstance,
+    GrobidPool,
+    RetryPolicy,
+    build_grobid,
+)
+
+API_URL = "http://validurl:8070"
+FORM = Form(file=File(payload=b"%PDF", file_name="Test", mime_type="application/pdf"))
+
+
+def test_retry_delay():
+    """Delay is jittered up to the capped exponential backoff."""
+    retry = RetryPolicy(retries=3, backoff=1, max_backoff=3)
+
+    assert 0 <= retry.delay(0) <= 1
+    assert all(0 <= retry.delay(5) <= 3 for _ in range(10))
+
+
+class TestCircuitBreaker:
+    """Unit tests for CircuitBreaker class."""
+
+    def test_open(self):
+        """Circuit opens after consecutive failures."""
+        breaker = CircuitBreaker(failure_threshold=2, reset_timeout=60)
+        breaker.record_failure()
+        breaker.record_success()
+        breaker.record_failure()
+        assert breaker.allow()
+
+        breaker.record_failure()
+        assert breaker.state is CircuitState.opened
+        assert not breaker.allow()
+
+    def test_half_open(self):
+        """A single trial request is sent after the reset timeout."""
+        breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0.05)
+        breaker.record_failure()
+        assert not breaker.allow()
+
+        time.sleep(0.05)
+        assert breaker.state is CircuitState.half_open
+        assert breaker.allow()
+        assert not breaker.allow()
+
+        breaker.record_success()
+        assert breaker.state is CircuitState.closed
+
+
+class TestGrobidInstance:
+    """Unit tests for GrobidInstance class."""
+
+    @respx.mock
+    @pytest.mark.asyncio
+    async def test_retry_busy(self):
+        """Requests are retried while GROBID responds with 503."""
+        route = respx.mock.post(f"{API_URL}/api/processFulltextDocument").mock(
+            side_effect=[httpx.Response(503), httpx.Response(503), httpx.Response(200)]
+        )
+        grobid = GrobidPool(
+            [GrobidInstance(API_URL, 15)], RetryPolicy(retries=2, backoff=0)
+        )
+
+        response = await grobid.request(FORM)
+
+        assert response.status_code == 200
+        assert route.call_count == 3
+
+    @respx.mock
+    @pytest.mark.asyncio
+    async def test_retries_exhausted(self):  # noqa: D102
+        respx.mock.post(f"{API_URL}/api/processFulltextDocument").mock(
+            return_value=httpx.Response(503)
+        )
+        grobid = GrobidPool(
+            [GrobidInstance(API_URL, 15)], RetryPolicy(retries=1, backoff=0)
+        )
+
+        with pytest.raises(GrobidClientError, match="Service not available"):
+            await grobid.request(FORM)
+
+    @respx.mock
+    @pytest.mark.asyncio
+    async def test_no_retry(self):
+        """Errors which aren't caused by load aren't retried."""
+        route = respx.mock.post(f"{API_URL}/api/processFulltextDocument").mock(
+            return_value=httpx.Response(500)
+        )
+        grobid = GrobidPool(
+            [GrobidInstance(API_URL, 15)], RetryPolicy(retries=3, backoff=0)
+        )
+
+        with pytest.raises(GrobidClientError, match="Internal service error"):
+            await grobid.request(FORM)
+        assert route.call_count == 1
+
+    @respx.mock
+    @pytest.mark.asyncio
+    async def test_circuit_open(self):
+        """Connection errors open the circuit, then requests fail fast."""
+        route = respx.mock.post(f"{API_URL}/api/processFulltextDocument").mock(
+            side_effect=httpx.ConnectError
+        )
+        instance = GrobidInstance(
+            API_URL, 15, breaker=CircuitBreaker(failure_threshold=2, reset_timeout=60)
+        )
+        grobid = GrobidPool([instance], RetryPolicy(retries=5, backoff=0))
+
+        with pytest.raises(CircuitOpenError):
+            await grobid.request(FORM)
+        assert route.call_count == 2
+
+    @respx.mock
+    @pytest.mark.asyncio
+    async def test_concurrency(self):
+        """Requests are limited to GROBID's concurrency."""
+        running = 0
+        max_running = 0
+
+        async def respond(request):
+            nonlocal running, max_running
+            running += 1
+            max_running = max(max_running, running)
+            await asyncio.sleep(0.01)
+            running -= 1
+            return httpx.Response(200)
+
+        respx.mock.post(f"{API_URL}/api/processFulltextDocument").mock(
+            side_effect=respond
+        )
+        grobid = GrobidInstance(API_URL, 15, concurrency=2)
+
+        await asyncio.gather(*(grobid.send(FORM) for _ in range(5)))
+
+        assert max_running == 2
+
+    @respx.mock
+    @pytest.mark.asyncio
+    async def test_check_health(self):  # noqa: D102
+        grobid = GrobidInstance(API_URL, 15)
+        route = respx.mock.get(f"{API_URL}/api/isalive")
+
+        async with httpx.AsyncClient() as client:
+            route.mock(return_value=httpx.Response(200, text="true"))
+            assert await grobid.check_health(client)
+            route.mock(side_effect=httpx.ConnectError)
+            assert not await grobid.check_health(client)
+            assert not grobid.healthy
+
+    @respx.mock
+    @pytest.mark.asyncio
+    async def test_check_version(self):
+        """Version is only requested until it's known."""
+        grobid = GrobidInstance(API_URL, 15)
+        route = respx.mock.get(f"{API_URL}/api/version").mock(
+            side_effect=[httpx.ConnectError, httpx.Response(200, text="0.7.1\n")]
+        )
+
+        assert await grobid.check_version() is None
+        assert await grobid.check_version() == "0.7.1"
+        assert await GrobidPool([grobid]).version() == "0.7.1"
+        assert route.call_count == 2
+
+
+class TestGrobidPool:
+    """Unit tests for GrobidPool class."""
+
+    def test_choose(self):
+        """Healthy instance with the fewest outstanding requests is chosen."""
+        first, second, third = (GrobidInstance(url, 15) for url in "abc")
+        first.outstanding = 2
+        second.outstanding = 1
+        pool = GrobidPool([first, second, third])
+
+        assert pool.choose() is third
+        third.healthy = False
+        assert pool.choose() is second
+        second.breaker.failure_threshold = 1
+        second.breaker.record_failure()
+        assert pool.choose() is first
+
+    def test_choose_unhealthy(self):
+        """Unhealthy instances are used if every instance is unhealthy."""
+        instance = GrobidInstance(API_URL, 15)
+        instance.healthy = False
+
+        assert GrobidPool([instance]).choose() is instance
+
+        instance.breaker.failure_threshold = 1
+        instance.breaker.record_failure()
+        with pytest.raises(CircuitOpenError):
+            GrobidPool([instance]).choose()
+
+    @respx.mock
+    @pytest.mark.asyncio
+    async def test_retry_other_instance(self):
+        """Busy instance is retried on another instance."""
+        busy = GrobidInstance("http://busy:8070", 15)
+        busy.outstanding = -1  # chosen first
+        respx.mock.post("http://busy:8070/api/processFulltextDocument").mock(
+            return_value=httpx.Response(503)
+        )
+        respx.mock.post(f"{API_URL}/api/processFulltextDocument").mock(
+            return_value=httpx.Response(200)
+        )
+        pool = GrobidPool(
+            [busy, GrobidInstance(API_URL, 15)], RetryPolicy(retries=1, backoff=0)
+        )
+
+        response = await pool.request(FORM)
+
+        assert response.status_code == 200
+
+    def test_build_grobid(self):
+        """An instance is created per comma separated URL."""
+        settings = Settings(grobid_api_url="http://a:8070, http://b:8070")
+
+        pool = build_grobid(settings)
+
+        assert [instance.api_url for instance in pool.instances] == [
+            "http://a:8070",
+            "http://b:8070",
+        ]
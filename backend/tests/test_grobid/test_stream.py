@@ -0,0 +1,175 @@
+"""Unit tests for the StreamingTEI class.
+
+Parsed objects are compared against the BeautifulSoup based TEI class.
+"""
+import en_core_web_sm
+import pytest
+
+from app.grobid.models import (
+    Affiliation,
+    Article,
+    Author,
+    Citation,
+    CitationIDs,
+    Marker,
+    PageRange,
+    PersonName,
+    Ref,
+    RefText,
+    Scope,
+    Section,
+    Table,
+)
+from app.grobid.stream import StreamingTEI
+from app.grobid.tei import TEI, GrobidParserError
+from app.nlp.models import ModelManager
+from tests.test_grobid import test_tei
+
+model = ModelManager(en_core_web_sm.load()).textrank
+
+TEI_NS = b'xmlns="http://www.tei-c.org/ns/1.0"'
+
+
+def both(xml: bytes) -> tuple[Article, Article]:
+    """Parse XML with both parsers."""
+    return TEI(xml, model).parse(), StreamingTEI(xml, model).parse()
+
+
+class TestConstructor:
+    """Unit tests for StreamingTEI class constructor."""
+
+    def test_missing_pipeline(self):
+        """Parser pipeline is required for noun chunking."""
+        from spacy.lang.en import English
+
+        with pytest.raises(
+            GrobidParserError, match="Language models require parser pipeline"
+        ):
+            StreamingTEI(b"", English())
+
+
+class TestParse:
+    """Unit tests for parse function."""
+
+    article = Article(
+        bibliography=Citation(
+            title="Test",
+            authors=[
+                Author(
+                    PersonName("Doe", "John"),
+                    email="john@doe.org",
+                    affiliations=[Affiliation(institution="University")],
+                )
+            ],
+            ids=CitationIDs(DOI="10.1000/182"),
+            target="http://citationtarget.org",
+            publisher="FooBar",
+            journal="Baz",
+            scope=Scope(volume=1, pages=PageRange(1, 2)),
+        ),
+        keywords=set(),
+        tables=dict(
+            first=Table(heading="Test", description="Lorem Ipsum", rows=[["Foo"]]),
+            second=Table(heading="Test2", rows=[["Foo", "Bar"], ["Baz", "Qux"]]),
+        ),
+        sections=[
+            Section("Introduction", [RefText("Lorem Ipsum")]),
+            Section(
+                "Method",
+                [
+                    RefText(
+                        "Lorem ipsum [1]",
+                        refs=[Ref(12, 15, marker=Marker.bibr, target="#b0")],
+                    ),
+                    RefText(
+                        "Dolor [2] sit amet",
+                        refs=[Ref(6, 9, marker=Marker.table, target="#first")],
+                    ),
+                ],
+            ),
+        ],
+        citations=dict(
+            b0=Citation(title="Test2", authors=[Author(PersonName("Doe", "Jane"))]),
+            b1=Citation(title="Test3", ids=CitationIDs(arXiv="arxivID")),
+        ),
+    )
+
+    @pytest.mark.parametrize(
+        "xml",
+        [
+            b"",
+            b"<TEI></TEI>",
+            b"<TEI><body></body></TEI>",
+            b"<TEI><sourceDesc></sourceDesc><body></body></TEI>",
+            b"<TEI><sourceDesc><biblStruct/></sourceDesc><body></body></TEI>",
+        ],
+    )
+    def test_missing_tags(self, xml: bytes):
+        """Same errors are raised as TEI class."""
+        with pytest.raises(GrobidParserError) as tei_exc:
+            TEI(xml, model).parse()
+
+        with pytest.raises(GrobidParserError, match=str(tei_exc.value)):
+            StreamingTEI(xml, model).parse()
+
+    @pytest.mark.parametrize(
+        "xml",
+        [
+            b"<TEI></TEI>",
+            b"<TEI><sourceDesc><biblStruct><title>T</title></biblStruct></sourceDesc>"
+            b"<abstract><div><p>Foo</p></div></abstract></TEI>",
+            b"<TEI><back><listBibl><biblStruct xml:id='b0'><title>T</title>"
+            b"</biblStruct></listBibl></back></TEI>",
+        ],
+    )
+    def test_partial(self, xml: bytes):
+        """Header or references only TEI is parsed like TEI class."""
+        assert StreamingTEI(xml, model).parse(strict=False) == TEI(xml, model).parse(
+            strict=False
+        )
+
+    def test_valid_article(self):  # noqa: D102
+        xml = test_tei.TestParse.build_xml(self.article)
+        tei_article, stream_article = both(xml)
+
+        assert stream_article == tei_article
+        assert stream_article.citations == self.article.citations
+        assert stream_article.tables == self.article.tables
+
+    def test_namespace(self):
+        """GROBID uses the TEI namespace."""
+        xml = test_tei.TestParse.build_xml(self.article).replace(
+            b"<TEI>", b"<TEI " + TEI_NS + b">", 1
+        )
+        tei_article, stream_article = both(xml)
+
+        assert stream_article == tei_article
+        assert stream_article.sections == self.article.sections
+
+    def test_abstract_and_nested_divs(self):
+        """Nested divs are returned in document order."""
+        xml = b"""
+        <TEI>
+        <teiHeader>
+            <sourceDesc><biblStruct><title type='main'>T</title></biblStruct>
+            </sourceDesc>
+            <abstract><div><p>Foo <ref type='bibr'>[1]</ref> bar</p></div></abstract>
+        </teiHeader>
+        <text>
+            <body>
+                <div><head n='1'>OUTER</head><p>A</p>
+                    <div><head>inner</head><p>B<!-- comment --> C</p></div>
+                </div>
+                <figure type='table'><head>No id</head></figure>
+                <div><p>No head</p></div>
+            </body>
+            <back><div><head>Acknowledgement</head></div><listBibl/></back>
+        </text>
+        </TEI>
+        """
+        tei_article, stream_article = both(xml)
+
+        assert stream_article == tei_article
+        assert [s.title for s in stream_article.sections] == ["Outer", "Inner"]
+        assert stream_article.abstract is not None
+        assert stream_article.abstract.to_str() == "Foo bar"
@@ -1,4 +1,6 @@
 """Unit tests for the TEI class."""
+from dataclasses import fields
+
 import en_core_web_sm
 import pytest
 
@@ -19,8 +21,9 @@ from app.grobid.models import (
     Table,
 )
 from app.grobid.tei import TEI, GrobidParserError
+from app.nlp.models import ModelManager
 
-model = en_core_web_sm.load()
+model = ModelManager(en_core_web_sm.load()).textrank
 
 
 class TestConstructor:
@@ -121,6 +124,23 @@ class TestParse:
 
         assert tei.parse() == article
 
+    def test_partial(self):
+        """Header only TEI is parsed if parsing isn't strict."""
+        xml = b"""
+        <TEI><sourceDesc><biblStruct><title type='main'>Test</title></biblStruct>
+        </sourceDesc><abstract><div><p>Lorem Ipsum</p></div></abstract></TEI>
+        """
+
+        article = TEI(xml, model).parse(strict=False)
+
+        assert article.bibliography.title == "Test"
+        assert article.abstract == Section("Abstract", [RefText("Lorem Ipsum")])
+        assert article.sections == []
+        assert article.citations == {}
+        assert TEI(b"<TEI></TEI>", model).parse(strict=False).bibliography == Citation(
+            title=""
+        )
+
 
 class TestTitle:
     """Unit tests for the title function."""
@@ -301,7 +321,9 @@ class TestCitation:
         bibl_tags.append(TestAuthors.build_xml(citation.authors))
 
         if citation.ids is not None:
-            for k, v in citation.ids.__dict__.items():
+            for k, v in (
+                (f.name, getattr(citation.ids, f.name)) for f in fields(citation.ids)
+            ):
                 if v is None:
                     continue
                 bibl_tags.append(
@@ -309,7 +331,10 @@ class TestCitation:
                 )
 
         if citation.scope is not None:
-            for k, v in citation.scope.__dict__.items():
+            for k, v in (
+                (f.name, getattr(citation.scope, f.name))
+                for f in fields(citation.scope)
+            ):
                 if v is None:
                     continue
                 bibl_tags.append(
@@ -454,7 +479,9 @@ class TestAuthors:
 
             author_tags.append(b"<affiliation>")
             for affiliation in author.affiliations:
-                for k, v in affiliation.__dict__.items():
+                for k, v in (
+                    (f.name, getattr(affiliation, f.name)) for f in fields(affiliation)
+                ):
                     if v is None:
                         continue
                     author_tags.append(
@@ -0,0 +1,143 @@
+"""Unit tests for the ingest module."""
+import json
+
+import pytest
+
+from app.archive import TEIArchive
+from app.ingest import (
+    PARQUET_SUPPORTED,
+    find_inputs,
+    main,
+    read_checkpoint,
+    truncate_partial_line,
+    write_parquet,
+)
+from tests.conftest import API_URL
+
+
+def read_lines(path):
+    """Read the results of a run by input path."""
+    with path.open(encoding="utf-8") as file:
+        return {line["path"]: line for line in map(json.loads, file)}
+
+
+def test_find_inputs(tmp_path):
+    """Inputs of subdirectories are found, other files are ignored."""
+    (tmp_path / "nested").mkdir()
+    for name in ["b.pdf", "a.XML", "nested/c.pdf", "notes.txt"]:
+        (tmp_path / name).write_bytes(b"")
+
+    paths = [path.relative_to(tmp_path).as_posix() for path in find_inputs(tmp_path)]
+    assert paths == ["a.XML", "b.pdf", "nested/c.pdf"]
+
+
+def test_read_checkpoint(tmp_path):
+    """Failed inputs and interrupted lines aren't skipped, and are removed."""
+    output = tmp_path / "output.jsonl"
+    output.write_text(
+        '{"path": "a.xml", "key": "a"}\n'
+        '{"path": "b.xml", "status_code": 400, "detail": "Missing body"}\n'
+        '{"path": "c.x'
+    )
+
+    assert read_checkpoint(output) == {"a.xml"}
+    assert output.read_text() == '{"path": "a.xml", "key": "a"}\n'
+    assert read_checkpoint(tmp_path / "missing.jsonl") == set()
+
+
+def test_truncate_partial_line(tmp_path):
+    """Line which was being written is removed, even inside a character."""
+    output = tmp_path / "output.jsonl"
+    line = '{"path": "a.xml"}\n'.encode() * 1000
+    output.write_bytes(line + '{"path": "é'.encode()[:-1])
+
+    truncate_partial_line(output)
+    assert output.read_bytes() == line
+    truncate_partial_line(output)
+    assert output.read_bytes() == line
+
+    output.write_bytes(b'{"path"')
+    truncate_partial_line(output)
+    assert output.read_bytes() == b""
+
+
+@pytest.mark.skipif(not PARQUET_SUPPORTED, reason="pyarrow isn't installed")
+def test_write_parquet(tmp_path):
+    """Only the last result of each input is written."""
+    import pyarrow.parquet
+
+    output = tmp_path / "output.jsonl"
+    output.write_text(
+        '{"path": "a.xml", "status_code": 400, "detail": "Missing body"}\n'
+        '{"path": "a.xml", "key": "a", "sentences": ["Test."]}\n'
+    )
+
+    write_parquet(output, tmp_path / "output.parquet")
+
+    rows = pyarrow.parquet.read_table(tmp_path / "output.parquet").to_pylist()
+    assert [(row["path"], row["sentences"]) for row in rows] == [("a.xml", '["Test."]')]
+
+
+class TestMain:
+    """Unit tests for main function."""
+
+    def test_tei(self, tmp_path, grobid_xml):
+        """TEI files are parsed without GROBID, only failed inputs are retried."""
+        inputs = tmp_path / "inputs"
+        inputs.mkdir()
+        (inputs / "valid.xml").write_bytes(grobid_xml)
+        (inputs / "invalid.xml").write_bytes(b"<TEI></TEI>")
+        output = tmp_path / "output.jsonl"
+        argv = [str(inputs), "--output", str(output), "--workers", "0"]
+        argv += ["--grobid-url", API_URL]
+
+        assert main(argv) == 1
+        lines = read_lines(output)
+        assert lines["valid.xml"]["article"]["bibliography"]["title"] == "Test"
+        assert "sentences" in lines["valid.xml"]
+        assert lines["invalid.xml"]["status_code"] == 400
+        assert "Missing body" in lines["invalid.xml"]["detail"]
+
+        # Fix the input of the interrupted run
+        (inputs / "invalid.xml").write_bytes(grobid_xml)
+        with output.open("ab") as file:
+            file.write('{"path": "invalid.xml", "detail": "é'.encode()[:-1])
+
+        assert main(argv) == 0
+        with output.open(encoding="utf-8") as file:
+            paths = [json.loads(line)["path"] for line in file]
+        assert sorted(paths) == ["invalid.xml", "valid.xml"]
+        assert "article" in read_lines(output)["invalid.xml"]
+
+    def test_pdf(self, tmp_path, grobid, build_pdf):
+        """TEI of each PDF is requested from GROBID and archived."""
+        inputs = tmp_path / "inputs"
+        inputs.mkdir()
+        (inputs / "paper.pdf").write_bytes(build_pdf())
+        (inputs / "broken.pdf").write_bytes(b"")
+        output = tmp_path / "output.jsonl"
+        archive_path = str(tmp_path / "tei.sqlite3")
+
+        code = main(
+            [str(inputs), "--output", str(output), "--workers", "0"]
+            + ["--grobid-url", API_URL, "--archive", archive_path]
+        )
+
+        assert code == 1
+        lines = read_lines(output)
+        assert lines["paper.pdf"]["article"]["bibliography"]["title"] == "Test"
+        assert lines["broken.pdf"]["status_code"] == 415
+        archive = TEIArchive(archive_path)
+        archived = archive.get(lines["paper.pdf"]["key"])
+        assert archived.grobid_version == "0.7.1"
+        assert archived.filename == "paper.pdf"
+        archive.close()
+
+    @pytest.mark.skipif(PARQUET_SUPPORTED, reason="pyarrow is installed")
+    def test_parquet_unsupported(self, tmp_path):
+        """Parquet output requires pyarrow."""
+        with pytest.raises(SystemExit):
+            main(
+                [str(tmp_path), "--output", str(tmp_path / "output.jsonl")]
+                + ["--parquet", str(tmp_path / "output.parquet")]
+            )
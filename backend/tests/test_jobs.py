@@ -0,0 +1,114 @@
+"""Unit tests for the jobs module."""
+import asyncio
+
+import pytest
+
+from app.jobs import JobQueue, JobQueueFull, JobStatus
+from app.processor import Engine, Event, ProcessingError
+
+
+class FakeProcessor:
+    """Yields results of the upload, waiting to be released before the summary."""
+
+    def __init__(self) -> None:  # noqa: D107
+        self.release = asyncio.Event()
+
+    async def process(
+        self, upload: bytes, filename: str | None = None, engine: Engine = Engine.grobid
+    ):
+        """Yield the article, then the summary once released."""
+        if upload == b"invalid":
+            raise ProcessingError(415, "PDF file could not be read")
+        if upload == b"error":
+            raise KeyError("unexpected")
+        yield Event.article, {"title": filename}
+        await self.release.wait()
+        yield Event.summary, ["summary"]
+
+
+class TestJobQueue:
+    """Unit tests for JobQueue class."""
+
+    @pytest.mark.asyncio
+    async def test_partial_results(self):
+        """Results of finished stages are available while the job is running."""
+        jobs = JobQueue(maxsize=1, workers=1)
+        await jobs.start()
+        processor = FakeProcessor()
+
+        job = jobs.submit(processor, b"pdf", "paper.pdf")
+        assert job.status is JobStatus.queued
+        await asyncio.sleep(0.01)
+
+        assert job.status is JobStatus.running
+        assert job.results == {"article": {"title": "paper.pdf"}}
+
+        processor.release.set()
+        await jobs.join()
+
+        assert job.status is JobStatus.done
+        assert job.results["summary"] == ["summary"]
+        assert jobs.get(job.job_id) is job
+        await jobs.stop()
+
+    @pytest.mark.asyncio
+    async def test_failed_jobs(self):
+        """Errors are stored and the worker keeps running."""
+        jobs = JobQueue(maxsize=2, workers=1)
+        await jobs.start()
+
+        invalid = jobs.submit(FakeProcessor(), b"invalid")
+        error = jobs.submit(FakeProcessor(), b"error")
+        await jobs.join()
+
+        assert invalid.status is JobStatus.failed
+        assert invalid.error == dict(
+            status_code=415, detail="PDF file could not be read"
+        )
+        assert error.status is JobStatus.failed
+        assert error.error["status_code"] == 500
+        await jobs.stop()
+
+    @pytest.mark.asyncio
+    async def test_queue_full(self):  # noqa: D102
+        jobs = JobQueue(maxsize=1, workers=1)
+        with pytest.raises(JobQueueFull, match="isn't running"):
+            jobs.submit(FakeProcessor(), b"pdf")
+
+        await jobs.start()
+        processor = FakeProcessor()
+        jobs.submit(processor, b"pdf")
+        await asyncio.sleep(0.01)
+        jobs.submit(processor, b"pdf")
+        with pytest.raises(JobQueueFull, match="is full"):
+            jobs.submit(processor, b"pdf")
+
+        await jobs.stop()
+
+    @pytest.mark.asyncio
+    async def test_stop(self):
+        """Unfinished jobs are marked as failed."""
+        jobs = JobQueue(maxsize=1, workers=1)
+        await jobs.start()
+        job = jobs.submit(FakeProcessor(), b"pdf")
+        await asyncio.sleep(0.01)
+        await jobs.stop()
+
+        assert job.status is JobStatus.failed
+        assert job.error["status_code"] == 503
+
+    @pytest.mark.asyncio
+    async def test_max_jobs(self):
+        """Oldest finished jobs are removed."""
+        jobs = JobQueue(maxsize=3, workers=1, max_jobs=1)
+        await jobs.start()
+        processor = FakeProcessor()
+        processor.release.set()
+
+        first = jobs.submit(processor, b"pdf")
+        await jobs.join()
+        second = jobs.submit(processor, b"pdf")
+
+        assert jobs.get(first.job_id) is None
+        assert jobs.get(second.job_id) is second
+        await jobs.stop()
@@ -0,0 +1,98 @@
+"""Unit tests for the analysis module."""
+import en_core_web_sm
+from pytest import raises
+from spacy.lang.en import English
+
+from app.nlp.analysis import Analysis
+from app.nlp.models import ModelManager
+from app.nlp.summary import TextRank
+from app.nlp.techniques import Word
+
+
+class TestAnalysis:
+    """Unit tests for Analysis class."""
+
+    models = ModelManager(en_core_web_sm.load())
+    sections = [
+        "The cat sat on the mat. The cat was happy. The mat was red.",
+        "",
+        "Dogs chase cats around the garden. The garden belongs to the dogs.",
+    ]
+
+    def test_skip_empty_sections(self):
+        """Empty sections aren't parsed."""
+        analysis = Analysis(self.sections, self.models)
+
+        assert len(analysis.section_docs) == 2
+        assert analysis.abstract_doc is None
+
+    def test_full_text(self):
+        """Full text is assembled from the section Docs."""
+        analysis = Analysis(self.sections, self.models)
+
+        assert analysis.doc.text == " ".join(s for s in self.sections if s)
+
+    def test_no_sections(self):
+        """Full text is empty if there are no sections."""
+        analysis = Analysis([""], self.models)
+
+        assert analysis.doc.text == ""
+        assert analysis.sentences == []
+
+    def test_model_unchanged(self):
+        """Rank pipelines aren't added to the model."""
+        analysis = Analysis(self.sections, self.models, abstract="A short abstract.")
+        analysis.sentences
+        analysis.phrase_ranks
+
+        assert not self.models.base.model.has_pipe("textrank")
+        assert not self.models.base.model.has_pipe("positionrank")
+
+    def test_sentences(self):
+        """Sentences are ranked the same as parsing each section."""
+        analysis = Analysis(self.sections, self.models)
+
+        expected: list[str] = []
+        for section in self.sections:
+            if section:
+                expected += TextRank(section, self.models.textrank).sentences
+
+        assert analysis.sentences == expected
+
+    def test_common_words(self):
+        """Words are counted the same as parsing the full text."""
+        analysis = Analysis(self.sections, self.models)
+        text = " ".join(s for s in self.sections if s)
+
+        assert analysis.common_words(2) == Word(
+            text, self.models.base
+        ).words_threshold_n(2)
+
+    def test_common_words_missing_lemmatizer(self):  # noqa: D102
+        analysis = Analysis(self.sections, ModelManager(English()))
+
+        with raises(RuntimeError, match="requires lemmatizer pipeline"):
+            analysis.common_words(2)
+
+    def test_split_sentences(self):
+        """Sentences are split the same as running the full model."""
+        text = "The cat sat. The dog ran."
+        sentences = Analysis.split_sentences(text, self.models)
+
+        assert sentences == [sentence.text for sentence in self.models.base(text).sents]
+
+    def test_pipe(self):
+        """Articles analysed together are the same as analysed separately."""
+        articles = [
+            (self.sections, "A short abstract."),
+            ([""], None),
+            (self.sections[::-1], None),
+        ]
+        analyses = Analysis.pipe(articles, self.models, batch_size=2)
+
+        assert len(analyses) == len(articles)
+        for analysis, (sections, abstract) in zip(analyses, articles):
+            expected = Analysis(sections, self.models, abstract=abstract)
+            assert analysis.doc.text == expected.doc.text
+            assert analysis.sentences == expected.sentences
+            assert analysis.phrase_ranks == expected.phrase_ranks
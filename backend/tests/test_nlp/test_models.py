@@ -0,0 +1,85 @@
+"""Unit tests for the models module."""
+import en_core_web_sm
+from pytest import raises
+
+from app.nlp.models import ModelManager
+
+
+class TestModelManager:
+    """Unit tests for ModelManager class."""
+
+    model = en_core_web_sm.load()
+    models = ModelManager(model)
+
+    def test_shared_model(self):
+        """Pipelines share the same spaCy model."""
+        assert self.models.textrank.model is self.model
+        assert self.models.positionrank.model is self.model
+        assert self.models.base.model is self.model
+
+    def test_model_unchanged(self):
+        """Rank components aren't added to the model."""
+        self.models.textrank("The cat sat on the mat.")
+        self.models.positionrank("The cat sat on the mat.")
+
+        assert not self.model.has_pipe("textrank")
+        assert not self.model.has_pipe("positionrank")
+
+    def test_pipe_names(self):  # noqa: D102
+        assert not self.models.base.has_pipe("textrank")
+        assert self.models.textrank.has_pipe("textrank")
+        assert not self.models.textrank.has_pipe("positionrank")
+        assert self.models.positionrank.has_pipe("positionrank")
+        assert self.models.textrank.pipe_names[-1] == "textrank"
+
+    def test_rank_existing_doc(self):
+        """Ranking an existing Doc is the same as running the pipeline."""
+        text = "The cat sat on the mat. The dog sat on the cat."
+        doc = self.models.textrank.rank(self.models.base(text))
+
+        assert [p.text for p in doc._.phrases] == [
+            p.text for p in self.models.textrank(text)._.phrases
+        ]
+
+    def test_existing_rank_pipes_skipped(self):
+        """Rank components added to the model itself are never run."""
+        model = en_core_web_sm.load()
+        model.add_pipe("positionrank")
+        models = ModelManager(model)
+
+        assert not models.textrank.has_pipe("positionrank")
+        assert models.textrank.pipe_names.count("textrank") == 1
+
+
+class TestPipeline:
+    """Unit tests for Pipeline class."""
+
+    models = ModelManager(en_core_web_sm.load())
+
+    def test_select_disable(self):  # noqa: D102
+        pipeline = self.models.textrank.select_pipes(disable=["textrank"])
+
+        assert not pipeline.has_pipe("textrank")
+        assert self.models.textrank.has_pipe("textrank")
+        assert pipeline("The cat sat on the mat.")._.phrases == []
+
+    def test_select_enable(self):  # noqa: D102
+        pipeline = self.models.base.select_pipes(enable=["parser"])
+
+        assert pipeline.pipe_names == ["parser"]
+
+    def test_select_invalid(self):  # noqa: D102
+        with raises(ValueError, match="Either enable or disable"):
+            self.models.base.select_pipes()
+        with raises(ValueError, match="Either enable or disable"):
+            self.models.base.select_pipes(enable=[], disable=[])
+
+    def test_pipe(self):
+        """Batched texts give the same Docs as individual texts."""
+        texts = ["The cat sat on the mat.", "The dog sat on the cat."]
+        docs = list(self.models.textrank.pipe(texts, batch_size=1))
+
+        assert [d.text for d in docs] == texts
+        assert [[p.text for p in d._.phrases] for d in docs] == [
+            [p.text for p in self.models.textrank(t)._.phrases] for t in texts
+        ]
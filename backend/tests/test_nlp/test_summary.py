@@ -1,21 +1,32 @@
 """Unit tests for the summary module."""
-
+import json
 
 import en_core_web_sm
 from pytest import raises
+from transformers.models.bart.tokenization_bart import BartTokenizer
+from transformers.models.bart.tokenization_bart_fast import BartTokenizerFast
+from transformers.models.gpt2.tokenization_gpt2 import bytes_to_unicode
+from transformers.tokenization_utils_base import PreTrainedTokenizerBase
 
+from app.nlp.models import ModelManager
 from app.nlp.summary import Bart, TextRank
 
 
 class TestTextRank:
     """Unit tests for TextRank class."""
 
-    model = en_core_web_sm.load()
+    models = ModelManager(en_core_web_sm.load())
+    model = models.textrank
+
+    def test_missing_pipe(self):
+        """Pipeline needs to contain textrank component."""
+        with raises(RuntimeError, match="requires textrank component"):
+            TextRank("test", self.models.base)
 
-    def test_add_missing_pipe(self):
-        """Constructor adds textrank pipeline if missing."""
+    def test_model_unchanged(self):
+        """Constructor doesn't add textrank pipeline to the model."""
         TextRank("test", self.model)
-        assert self.model.has_pipe("textrank") is True
+        assert self.model.model.has_pipe("textrank") is False
 
     def test_empty_text(self):
         """Text must not be an empty string."""
@@ -35,3 +46,52 @@ class TestBart:
         """Text must not be an empty string."""
         with raises(RuntimeError, match="Text cannot be empty"):
             Bart("test", "", 0)
+
+
+class TestTruncate:
+    """Unit tests for Bart.truncate method.
+
+    Uses a byte level BART tokenizer without merges, so each character is a token.
+    """
+
+    @staticmethod
+    def build_tokenizers(path) -> list[PreTrainedTokenizerBase]:
+        """Create slow and fast tokenizer from vocab files."""
+        vocab = {"<s>": 0, "<pad>": 1, "</s>": 2, "<unk>": 3}
+        for char in bytes_to_unicode().values():
+            vocab[char] = len(vocab)
+        vocab["<mask>"] = len(vocab)
+        vocab_file = path / "vocab.json"
+        vocab_file.write_text(json.dumps(vocab))
+        merges_file = path / "merges.txt"
+        merges_file.write_text("#version: 0.2\n")
+
+        return [
+            BartTokenizer(str(vocab_file), str(merges_file)),
+            BartTokenizerFast(str(vocab_file), str(merges_file)),
+        ]
+
+    def test_truncate(self, tmp_path):  # noqa: D102
+        text = "abcdefghij" * 100
+        for tokenizer in self.build_tokenizers(tmp_path):
+            assert Bart.truncate(text, tokenizer, 25) == text[:25]
+
+    def test_short_text(self, tmp_path):
+        """Text within the limit is returned as is."""
+        text = "The cat sat on the mat."
+        for tokenizer in self.build_tokenizers(tmp_path):
+            assert Bart.truncate(text, tokenizer, 100) is text
+
+    def test_grow_prefix(self, tmp_path, monkeypatch):
+        """Prefix grows until it contains enough tokens."""
+        monkeypatch.setattr(Bart, "CHARS_PER_TOKEN", 1)
+        text = "abcdefghij" * 100
+        for tokenizer in self.build_tokenizers(tmp_path):
+            assert Bart.truncate(text, tokenizer, 25) == text[:25]
+
+    def test_multibyte_text(self, tmp_path):
+        """Characters may be more than one token."""
+        # Each character is three bytes, so three tokens
+        text = "語" * 1000
+        for tokenizer in self.build_tokenizers(tmp_path):
+            assert Bart.truncate(text, tokenizer, 300) == text[:100]
@@ -1,9 +1,9 @@
 """Unit tests for the properties and methods in Techniques."""
 import en_core_web_sm
-import pytextrank  # noqa: F401
 from pytest import raises
 from spacy.lang.en import English
 
+from app.nlp.models import ModelManager
 from app.nlp.techniques import Phrase, Word
 
 
@@ -40,8 +40,8 @@ class TestTechniques:
     avoid worse pains
     """
 
-    model = en_core_web_sm.load()
-    model.add_pipe("textrank")
+    models = ModelManager(en_core_web_sm.load())
+    model = models.base
 
     def test_noun_frequency(self):
         """Test dictionary contain nouns in their lemma form."""
@@ -74,9 +74,16 @@ class TestTechniques:
         assert sorted(result) == sorted([("pineapple", 5), ("biscuit", 7)])
 
     def test_invalid_pipeline_phrase(self):
+        """Pipeline needs to contain positionrank component."""
+        with raises(RuntimeError, match="requires positionrank component"):
+            Phrase(self.empty_string, self.model)
+
+    def test_phrase_model_unchanged(self):
         """Ensure phrase pipeline works when model fed in twice."""
-        Phrase(self.empty_string, self.model)
-        Phrase(self.empty_string, self.model)
+        Phrase(self.empty_string, self.models.positionrank)
+        Phrase(self.empty_string, self.models.positionrank)
+
+        assert not self.models.base.model.has_pipe("positionrank")
 
     text_test_phrase = """
     But I must explain to you how all this mistaken idea of denouncing pleasure and praising pain was born and I will give you a complete account of the system, and expound the actual teachings of the great explorer of the truth, the master-builder of human happiness. No one rejects, dislikes, or avoids pleasure itself, because it is pleasure, but because those who do not know how to pursue pleasure rationally encounter consequences that are extremely painful. Nor again is there anyone who loves or pursues or desires to obtain pain of itself, because it is pain, but because occasionally circumstances occur in which toil and pain can procure him some great pleasure. To take a trivial example, which of us ever undertakes laborious physical exercise, except to obtain some advantage from it? But who has any right to find fault with a man who chooses to enjoy a pleasure that has no annoying consequences, or one who avoids a pain that produces no resultant pleasure?
@@ -84,7 +91,7 @@ class TestTechniques:
 
     def test_phrase_count(self):
         """Ensure that the counting of phrases is correct."""
-        phrase_techniques = Phrase(self.text_test_phrase, self.model)
+        phrase_techniques = Phrase(self.text_test_phrase, self.models.positionrank)
         result = phrase_techniques.counts
         assert result == {
             "human happiness": 1,
@@ -102,7 +109,7 @@ class TestTechniques:
 
     def test_phrase_rank(self):
         """Ensure that the normalised ranking of phrase is correct."""
-        phrase_techniques = Phrase(self.text_test_phrase, self.model)
+        phrase_techniques = Phrase(self.text_test_phrase, self.models.positionrank)
         result = phrase_techniques.ranks
         assert result == [
             ("human happiness", 12),
@@ -117,3 +124,11 @@ class TestTechniques:
             ("laborious physical exercise", 4),
             ("trivial example", 2),
         ]
+
+    def test_word_from_doc(self):
+        """Existing Doc gives the same frequencies as text."""
+        doc = self.model(self.test_string)
+
+        assert (
+            Word.from_doc(doc).noun_freq == Word(self.test_string, self.model).noun_freq
+        )
@@ -0,0 +1,84 @@
+"""Unit tests for the pipeline module."""
+import io
+import zipfile
+
+import fitz
+import pytest
+
+from app.grobid.tei import GrobidParserError
+from app.pipeline import (
+    analyse,
+    analyse_many,
+    extract_article,
+    parse_article,
+    read_pdf,
+    read_zip,
+)
+
+
+class TestReadPDF:
+    """Unit tests for read_pdf function."""
+
+    def test_valid_pdf(self):  # noqa: D102
+        with fitz.open() as pdf:
+            pdf.new_page()
+            upload = pdf.tobytes()
+        contents, uid = read_pdf(upload)
+
+        assert contents is upload
+        assert uid is None
+
+    def test_invalid_pdf(self):  # noqa: D102
+        with pytest.raises(RuntimeError, match="PDF file could not be read"):
+            read_pdf(b"")
+
+
+class TestReadZip:
+    """Unit tests for read_zip function."""
+
+    def test_valid_zip(self):
+        """Only PDFs are read."""
+        buffer = io.BytesIO()
+        with zipfile.ZipFile(buffer, "w") as archive:
+            archive.writestr("papers/a.pdf", b"a")
+            archive.writestr("B.PDF", b"b")
+            archive.writestr("notes.txt", b"c")
+
+        assert read_zip(buffer.getvalue()) == [(b"a", "papers/a.pdf"), (b"b", "B.PDF")]
+
+    def test_invalid_zip(self):  # noqa: D102
+        with pytest.raises(RuntimeError, match="Zip file could not be read"):
+            read_zip(b"")
+
+
+class TestParseArticle:
+    """Unit tests for parse_article function."""
+
+    def test_invalid_xml(self):  # noqa: D102
+        with pytest.raises(GrobidParserError, match="Missing body"):
+            parse_article(b"<TEI></TEI>")
+
+
+class TestExtractArticle:
+    """Unit tests for extract_article function."""
+
+    def test_invalid_pdf(self):  # noqa: D102
+        with pytest.raises(RuntimeError, match="PDF file could not be read"):
+            extract_article(b"")
+
+
+class TestAnalyse:
+    """Unit tests for analyse function."""
+
+    def test_empty_sections(self):
+        """Empty sections are skipped."""
+        result = analyse(["", ""])
+
+        assert result.sentences == []
+        assert result.common_words == []
+
+    def test_many(self):
+        """Articles analysed together are the same as analysed separately."""
+        articles = [(["The cat sat on the mat. It was happy."], None), ([""], None)]
+
+        assert analyse_many(articles) == [analyse(*article) for article in articles]
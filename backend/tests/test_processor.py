@@ -0,0 +1,91 @@
+"""Unit tests for the processor module."""
+import asyncio
+
+import pytest
+
+from app.archive import ArchivedTEI, TEIArchive
+from app.cache import MemoryCache, ResultCache
+from app.config import Settings
+from app.executor import Executor
+from app.grobid.models import Article, Citation, RefText, Section
+from app.grobid.service import build_grobid
+from app.pipeline import NLPResult
+from app.processor import AnalysisBatcher, Processor
+from app.summariser import NullSummariser
+from tests.conftest import API_URL
+
+
+class FakeExecutor:
+    """Records the articles of each batch, waiting to be released."""
+
+    def __init__(self) -> None:  # noqa: D107
+        self.batches: list[list] = []
+        self.release = asyncio.Event()
+
+    async def run_process(self, func, articles, *args):  # noqa: D102
+        await self.release.wait()
+        self.batches.append(articles)
+        return [NLPResult(sentences=sections) for sections, _ in articles]
+
+
+def build_article(text: str) -> Article:
+    """Create article with a single section."""
+    return Article(
+        bibliography=Citation(title=text),
+        keywords=set(),
+        tables={},
+        sections=[Section("Introduction", [RefText(text)])],
+        citations={},
+    )
+
+
+class TestAnalysisBatcher:
+    """Unit tests for AnalysisBatcher class."""
+
+    @pytest.mark.asyncio
+    async def test_batch_waiting_articles(self):
+        """Articles waiting while a batch is running are analysed together."""
+        executor = FakeExecutor()
+        batcher = AnalysisBatcher(executor, max_articles=2)
+
+        tasks = [
+            asyncio.create_task(batcher.analyse(build_article(text)))
+            for text in ["a", "b", "c", "d"]
+        ]
+        await asyncio.sleep(0.01)
+        executor.release.set()
+        results = await asyncio.gather(*tasks)
+
+        assert [result.sentences for result in results] == [["a"], ["b"], ["c"], ["d"]]
+        assert list(map(len, executor.batches)) == [2, 2]
+
+
+class TestProcessor:
+    """Unit tests for Processor class."""
+
+    @pytest.mark.asyncio
+    async def test_archived_tei_unparsable(self, tmp_path, grobid, grobid_xml):
+        """Archived TEI which can't be parsed is replaced by GROBID's TEI."""
+        settings = Settings(grobid_api_url=API_URL)
+        archive = TEIArchive(str(tmp_path / "tei.sqlite3"))
+        archive.put(ArchivedTEI("foo", b"<TEI></TEI>"))
+        executor = Executor(1)
+        processor = Processor(
+            settings,
+            ResultCache(MemoryCache()),
+            executor,
+            build_grobid(settings),
+            None,
+            NullSummariser(),
+            archive,
+        )
+        article = await processor.article("foo", b"%PDF", "paper.pdf")
+
+        assert article.bibliography.title == "Test"
+        assert grobid["fulltext"].call_count == 1
+        archived = archive.get("foo")
+        assert archived.content == grobid_xml
+        assert archived.grobid_version == "0.7.1"
+        assert archived.parse_error is None
+        executor.shutdown()
+        archive.close()
@@ -0,0 +1,83 @@
+"""Unit tests for the reparse module."""
+import io
+import json
+
+from app.archive import ArchivedTEI, TEIArchive
+from app.cache import SQLiteCache
+from app.config import Settings
+from app.reparse import main
+
+
+class TestMain:
+    """Unit tests for main function."""
+
+    def test_reparse(self, tmp_path, grobid_xml):
+        """Archived TEI is parsed, replacing cached articles and responses."""
+        archive_path = str(tmp_path / "tei.sqlite3")
+        cache_path = str(tmp_path / "cache.sqlite3")
+        archive = TEIArchive(archive_path)
+        archive.put(ArchivedTEI("valid", grobid_xml))
+        archive.put(ArchivedTEI("invalid", b"<TEI></TEI>"))
+        archive.close()
+        cache = SQLiteCache(cache_path)
+        cache.put("response:valid", "stale")
+        cache.close()
+
+        output = io.StringIO()
+        code = main(
+            [archive_path, "--workers", "0", "--cache", cache_path]
+            + ["--cache-size", "4"],
+            output,
+        )
+
+        lines = [json.loads(line) for line in output.getvalue().splitlines()]
+        assert code == 1
+        assert [line["key"] for line in lines] == ["valid", "invalid"]
+        assert lines[0]["article"]["bibliography"]["title"] == "Test"
+        assert "sentences" in lines[0]
+        assert "Missing body" in lines[1]["detail"]
+
+        archive = TEIArchive(archive_path)
+        assert archive.get("valid").parse_error is None
+        assert "Missing body" in archive.get("invalid").parse_error
+        archive.close()
+        cache = SQLiteCache(cache_path)
+        assert cache.get("article:valid").bibliography.title == "Test"
+        assert cache.get("response:valid") is None
+        cache.close()
+
+    def test_keys(self, tmp_path, grobid_xml):
+        """Only the given keys are parsed."""
+        archive_path = str(tmp_path / "tei.sqlite3")
+        archive = TEIArchive(archive_path)
+        archive.put(ArchivedTEI("valid", grobid_xml))
+        archive.put(ArchivedTEI("invalid", b"<TEI></TEI>"))
+        archive.close()
+
+        output = io.StringIO()
+
+        assert main([archive_path, "valid", "--workers", "0"], output) == 0
+        assert len(output.getvalue().splitlines()) == 1
+
+    def test_cache_size(self, tmp_path, monkeypatch, grobid_xml):
+        """Cache is evicted using the size of the app's cache."""
+        archive_path = str(tmp_path / "tei.sqlite3")
+        cache_path = str(tmp_path / "cache.sqlite3")
+        archive = TEIArchive(archive_path)
+        archive.put(ArchivedTEI("valid", grobid_xml))
+        archive.close()
+        cache = SQLiteCache(cache_path)
+        for index in range(3):
+            cache.put(f"response:{index}", "response")
+        cache.close()
+        monkeypatch.setattr(
+            "app.reparse.get_settings",
+            lambda: Settings(grobid_api_url="http://localhost", cache_size=3),
+        )
+
+        main([archive_path, "--workers", "0", "--cache", cache_path], io.StringIO())
+
+        cache = SQLiteCache(cache_path)
+        assert len(cache) == 3
+        assert cache.get("article:valid") is not None
+        cache.close()
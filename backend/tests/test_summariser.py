@@ -0,0 +1,154 @@
+"""Unit tests for the summariser module."""
+import asyncio
+import sys
+import threading
+from types import SimpleNamespace
+
+import pytest
+
+from app.config import Settings
+from app.executor import Executor
+from app.summariser import (
+    TORCH_SUPPORTED,
+    APISummariser,
+    LocalSummariser,
+    NullSummariser,
+    build_summariser,
+)
+
+
+class EchoSummariser(LocalSummariser):
+    """Local summariser which upper cases text instead of running a model."""
+
+    batches: list[list[str]]
+    release: threading.Event
+
+    def __init__(self, *args, **kwargs) -> None:  # noqa: D107
+        super().__init__("test", *args, **kwargs)
+        self.batches = []
+        self.release = threading.Event()
+
+    def load(self):  # noqa: D102
+        return None, None
+
+    def generate(self, texts: list[str]) -> list[str]:  # noqa: D102
+        self.release.wait()
+        if "fail" in texts:
+            raise ValueError("Generation failed")
+        self.batches.append(texts)
+        return [text.upper() if text != "empty" else "" for text in texts]
+
+
+class TestNullSummariser:
+    """Unit tests for NullSummariser class."""
+
+    @pytest.mark.asyncio
+    async def test_disabled(self):  # noqa: D102
+        with pytest.raises(RuntimeError, match="Summarisation is disabled"):
+            await NullSummariser().summarise("test")
+
+
+class TestAPISummariser:
+    """Unit tests for APISummariser class."""
+
+    @pytest.mark.asyncio
+    async def test_missing_api_token(self):  # noqa: D102
+        executor = Executor(thread_pool_size=1)
+        summariser = APISummariser("", 0, executor)
+
+        with pytest.raises(RuntimeError, match="API token is missing"):
+            await summariser.summarise("test")
+        executor.shutdown()
+
+
+class TestLocalSummariser:
+    """Unit tests for LocalSummariser class."""
+
+    @pytest.mark.asyncio
+    async def test_summarise(self):  # noqa: D102
+        summariser = EchoSummariser()
+        summariser.release.set()
+
+        assert await summariser.summarise("foo") == "FOO"
+        summariser.shutdown()
+
+    @pytest.mark.asyncio
+    async def test_batch_waiting_requests(self):
+        """Requests waiting for the worker are generated together."""
+        summariser = EchoSummariser(workers=1, batch_size=2)
+        summariser.start()
+
+        tasks = [
+            asyncio.create_task(summariser.summarise(text)) for text in ["a", "b", "c"]
+        ]
+        await asyncio.sleep(0.1)
+        summariser.release.set()
+
+        assert await asyncio.gather(*tasks) == ["A", "B", "C"]
+        assert sorted(map(len, summariser.batches)) == [1, 2]
+        summariser.shutdown()
+
+    @pytest.mark.asyncio
+    async def test_empty_summary(self):  # noqa: D102
+        summariser = EchoSummariser()
+        summariser.release.set()
+
+        with pytest.raises(RuntimeError, match="Summary is empty"):
+            await summariser.summarise("empty")
+        with pytest.raises(RuntimeError, match="Text cannot be empty"):
+            await summariser.summarise("")
+        summariser.shutdown()
+
+    @pytest.mark.asyncio
+    async def test_generate_error(self):
+        """Errors of the model are raised as RuntimeError."""
+        summariser = EchoSummariser()
+        summariser.release.set()
+
+        with pytest.raises(RuntimeError, match="Generation failed"):
+            await summariser.summarise("fail")
+        assert await summariser.summarise("foo") == "FOO"
+        summariser.shutdown()
+
+    @pytest.mark.asyncio
+    async def test_failed_load(self, monkeypatch):
+        """Model which can't be loaded is raised as RuntimeError, and not retried."""
+        loads = []
+
+        def from_pretrained(model_id):
+            loads.append(model_id)
+            raise OSError(f"{model_id} is not a valid model identifier")
+
+        auto_model = SimpleNamespace(from_pretrained=from_pretrained)
+        transformers = SimpleNamespace(
+            AutoModelForSeq2SeqLM=auto_model, AutoTokenizer=auto_model
+        )
+        monkeypatch.setattr("app.summariser.TORCH_SUPPORTED", True)
+        monkeypatch.setitem(sys.modules, "torch", SimpleNamespace())
+        monkeypatch.setitem(sys.modules, "transformers", transformers)
+        summariser = LocalSummariser("missing")
+
+        for _ in range(2):
+            with pytest.raises(RuntimeError, match="not a valid model identifier"):
+                await summariser.summarise("foo")
+        assert loads == ["missing"]
+
+    @pytest.mark.skipif(TORCH_SUPPORTED, reason="torch is installed")
+    def test_missing_torch(self):  # noqa: D102
+        with pytest.raises(RuntimeError, match="requires torch"):
+            LocalSummariser("test").start()
+
+
+class TestBuildSummariser:
+    """Unit tests for build_summariser function."""
+
+    def test_backends(self):  # noqa: D102
+        executor = Executor(thread_pool_size=1)
+        for backend, cls in [
+            ("huggingface", APISummariser),
+            ("local", LocalSummariser),
+            ("none", NullSummariser),
+        ]:
+            settings = Settings(grobid_api_url="http://localhost", summariser=backend)
+            assert isinstance(build_summariser(settings, executor), cls)
+        executor.shutdown()